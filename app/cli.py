@@ -0,0 +1,91 @@
+"""
+Generate scenarios or pytest files from JSONL without starting the API.
+
+Usage:
+    python -m app.cli scenarios endpoints.jsonl -o results.jsonl --checkpoint run.ckpt
+    python -m app.cli pytest requests.jsonl --out-dir tests/generated
+    cat endpoints.jsonl | python -m app.cli scenarios > results.jsonl
+
+Each input line is an EndpointRequest (scenarios) or a PytestGenerationRequest
+(pytest), as accepted by the API. Results are written as JSONL in completion
+order, tagged with their input line number, and with --out-dir also as one
+file per item, as soon as each item finishes. With --checkpoint, finished
+items are recorded and skipped when the command is rerun, so an interrupted
+run resumes where it stopped; items that failed are retried. The exit status
+is 1 if any item failed or was invalid.
+
+Nothing from the app is imported until the arguments are parsed, and the
+FastAPI app itself is never loaded.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# Keep stderr readable; set LOG_LEVEL to see per-item logs
+CLI_DEFAULTS = {
+    "LOG_LEVEL": "WARNING"
+}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, record in (("scenarios", "EndpointRequest"), ("pytest", "PytestGenerationRequest")):
+        command = commands.add_parser(name, help=f"Process {record} records")
+        command.add_argument("input", nargs="?", default="-", help="JSONL file, or - for stdin (default)")
+        command.add_argument("-o", "--output", default="-", help="JSONL results file, or - for stdout (default)")
+        command.add_argument("--out-dir", type=Path, help="Also write each result to a file in this directory")
+        command.add_argument("--checkpoint", type=Path, help="Record finished items here and skip them on rerun")
+        command.add_argument("--concurrency", type=int, help="Items generated at once (default BATCH_CONCURRENCY)")
+        command.add_argument("--bypass-cache", action="store_true", help="Skip the response cache and regenerate")
+        if name == "scenarios":
+            command.add_argument(
+                "--window", type=int, default=500,
+                help="Endpoints read ahead and packed into shared prompts together (default 500)"
+            )
+    args = parser.parse_args(argv)
+
+    for key, value in CLI_DEFAULTS.items():
+        os.environ.setdefault(key, value)
+
+    import asyncio
+    from app.services.batch_runner import BatchRunner, Checkpoint, ResultWriter
+    from app.utils.logger import shutdown_logging
+
+    checkpoint = Checkpoint(args.checkpoint)
+    # A resumed run adds to the results of the earlier one
+    writer = ResultWriter(args.output, args.out_dir, append=bool(checkpoint.done))
+    runner = BatchRunner(
+        args.command,
+        writer,
+        checkpoint,
+        concurrency=args.concurrency,
+        bypass_cache=args.bypass_cache,
+        window=getattr(args, "window", 500)
+    )
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    started = time.perf_counter()
+    try:
+        counts = asyncio.run(runner.run(source))
+    except KeyboardInterrupt:
+        hint = " with the same --checkpoint to resume" if args.checkpoint else ""
+        print(f"Interrupted after {runner.counts['succeeded']} item(s); rerun{hint}", file=sys.stderr)
+        return 130
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        writer.close()
+        checkpoint.close()
+        shutdown_logging()
+
+    print(
+        f"{counts['succeeded']} succeeded, {counts['failed']} failed, {counts['invalid']} invalid, "
+        f"{counts['skipped']} skipped (already done) in {time.perf_counter() - started:.1f}s",
+        file=sys.stderr
+    )
+    return 1 if counts["failed"] or counts["invalid"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
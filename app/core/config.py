@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -11,14 +11,120 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str
     GEMINI_MODEL: str = "gemini-2.0-flash"
     MAX_BATCH_SIZE: int = 5
+    LLM_MAX_CONCURRENCY: int = 8  # Max in-flight Gemini calls per process
+    LLM_USE_NATIVE_ASYNC: bool = True  # Fall back to a thread pool when False
+    LLM_COALESCE_REQUESTS: bool = True  # Share one upstream call among identical concurrent calls
+    BATCH_CONCURRENCY: int = 5  # Max endpoints generated in parallel per batch
+    
+    # LLM Scheduler Settings
+    LLM_REQUESTS_PER_MINUTE: int = 60
+    LLM_TOKENS_PER_MINUTE: int = 1_000_000
+    LLM_EXPECTED_OUTPUT_TOKENS: int = 2048  # Completion estimate when max_tokens isn't set
+    LLM_MAX_RETRIES: int = 3
+    LLM_BACKOFF_BASE_SECONDS: float = 1.0
+    LLM_BACKOFF_MAX_SECONDS: float = 30.0
+    LLM_ATTEMPT_TIMEOUT_SECONDS: float = 60.0  # Per upstream attempt
+    LLM_DEADLINE_SECONDS: float = 120.0  # Per call, including queueing and retries
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+    LLM_RATE_LIMIT_BACKEND: str = "memory"  # "memory" (quota split across WORKERS) or "sqlite" (shared by all workers)
+    LLM_RATE_LIMIT_DB_PATH: Path = Path("data") / "ratelimit.db"
+    LLM_WARMUP_ON_STARTUP: bool = True  # Load the Gemini client in the background at startup
+    
+    # Model Routing Settings
+    LLM_MODEL_TIERS: List[str] = []  # Models cheapest first, e.g. ["gemini-2.0-flash-lite", "gemini-2.0-flash"]; empty uses GEMINI_MODEL alone
+    LLM_PYTEST_TIER: int = -1  # Tier pytest generation starts at (-1 is the strongest); other prompts start at the cheapest
+    LLM_ESCALATE_ON_INVALID: bool = True  # Retry on the next tier when an answer fails validation
+    LLM_HEDGE_ENABLED: bool = False  # Send a backup call when a call outlasts the model's observed LLM_HEDGE_QUANTILE latency
+    LLM_HEDGE_QUANTILE: float = 0.9
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # Latencies observed per model before hedging starts
+    LLM_HEDGE_WINDOW: int = 500  # Recent latencies per model the quantile is taken over
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 0.05
+    LLM_HEDGE_MAX_RATIO: float = 0.1  # Max fraction of calls hedged; backups count against the rate limits
+    
+    # Serving Settings
+    WORKERS: int = 1  # Server processes sharing this configuration (set by app.serve)
+    
+    # Prompt Budget Settings
+    PROMPT_MAX_TOKENS: int = 8000  # Estimated input tokens per pytest prompt; large JSON examples are compacted to fit
+    PROMPT_SAMPLE_ITEMS: int = 3  # Array elements kept when sampling a large example
+    PROMPT_MAX_STRING_CHARS: int = 200  # Longer strings in a large example are cut
+    
+    # Pytest Post-processing Settings
+    PYTEST_REPAIR_ENABLED: bool = True  # Send a targeted repair prompt when local fixes aren't enough
+    PYTEST_SHARED_SESSION: bool = True  # Rewrite requests.<method>() calls to use a session-scoped requests.Session fixture
+    
+    # Test Runner Settings
+    TEST_RUNNER_ENABLED: bool = False  # Opt-in: lets /runner/run execute submitted code on this host; trusted deployments only
+    TEST_RUNNER_WORKERS: int = 4  # pytest processes per run, also the limit across concurrent runs
+    TEST_RUNNER_TIMEOUT_SECONDS: float = 300.0  # Per run; unfinished tests are reported as errors
+    TEST_RUNNER_MAX_FILES: int = 50  # Test files accepted per run
+    TEST_RUNNER_MESSAGE_MAX_CHARS: int = 2000  # Failure details kept per test
+    
+    # Synthetic Dataset Settings
+    DATASET_MAX_ROWS: int = 10_000_000  # Max records per /datasets/generate request
+    DATASET_CHUNK_ROWS: int = 10_000  # Records generated and written per chunk; bounds memory
+    
+    # Cache Settings
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_TTL_SECONDS: int = 24 * 60 * 60  # 24 hours
+    CACHE_DB_PATH: Optional[Path] = None  # SQLite file for a persistent tier, e.g. "cache/llm_cache.db"
+    CACHE_DB_MAX_ENTRIES: int = 100_000  # Oldest rows of the persistent tier are pruned beyond this
+    
+    # Job Settings
+    MAX_JOB_SIZE: int = 5000  # Max endpoints accepted by a single job
+    JOB_WORKER_CONCURRENCY: int = 8  # Endpoints processed in parallel across all jobs
+    JOB_STORE_BACKEND: str = "memory"  # "memory" or "sqlite" (app.serve uses sqlite)
+    JOB_DB_PATH: Path = Path("data") / "jobs.db"
+    JOB_LEASE_SECONDS: float = 30.0  # A job whose worker stops renewing this long is taken over
+    
+    # Incremental Regeneration Settings
+    FINGERPRINT_STORE_BACKEND: str = "memory"  # "memory" or "sqlite" (app.serve uses sqlite)
+    FINGERPRINT_DB_PATH: Path = Path("data") / "fingerprints.db"
+    
+    # Chat Session Settings
+    SESSION_STORE_BACKEND: str = "memory"  # "memory" or "sqlite"
+    SESSION_DB_PATH: Path = Path("data") / "sessions.db"
+    SESSION_MAX_SESSIONS: int = 10000  # Least recently used sessions are evicted beyond this
+    SESSION_TTL_SECONDS: int = 60 * 60  # Idle sessions expire after this
+    SESSION_MAX_TURNS: int = 8  # Recent turns kept verbatim
+    SESSION_TURN_MAX_CHARS: int = 2000
+    SESSION_DIGEST_CHARS: int = 160  # Older turns are reduced to a digest of this length
+    SESSION_SUMMARY_MAX_CHARS: int = 1200  # Oldest digests are dropped beyond this
+    
+    # Intent Classification Settings
+    INTENT_LLM_ENABLED: bool = True  # Ask the LLM when the local classifier isn't confident
+    INTENT_MIN_SCORE: float = 2.0  # Keyword score the local answer needs
+    INTENT_MIN_MARGIN: float = 1.0  # Lead over the runner-up intent the local answer needs
+    
+    # Local Data Generator Settings
+    LOCAL_GENERATION_ENABLED: bool = True  # Build POSITIVE/NEGATIVE/EDGE_CASE locally when a schema or example is given
+    LOCAL_GENERATOR_SEED: int = 42
+    LOCAL_MAX_SCENARIOS_PER_TYPE: int = 15
+    LOCAL_OVERSIZED_STRING_LENGTH: int = 1024
+    
+    # OpenAPI Import Settings
+    OPENAPI_CONTEXT_MAX_CHARS: int = 4000  # Schema context embedded per operation
+    
+    # Scenario Packing Settings
+    SCENARIO_PACK_ENABLED: bool = True  # Combine several endpoints into one scenario prompt
+    SCENARIO_PACK_MAX_ENDPOINTS: int = 8  # Max endpoints sharing one prompt
+    SCENARIO_PACK_MAX_TOKENS: int = 8000  # Estimated prompt plus completion tokens per packed prompt
+    SCENARIO_PACK_TOKENS_PER_TYPE: int = 300  # Expected completion tokens per requested scenario type
     
     # Logging Settings
     LOG_LEVEL: str = "INFO"
-    LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOG_FORMAT: str = "{time:YYYY-MM-DD HH:mm:ss.SSS} - {extra[name]} - {level} - {message}"
     LOG_DIR: Path = Path("logs")
     LOG_FILE: Path = LOG_DIR / "app.log"
     LOG_MAX_SIZE: int = 10 * 1024 * 1024  # 10MB
     LOG_BACKUP_COUNT: int = 5
+    LOG_ASYNC: bool = True  # Write logs from a background thread instead of the request path
+    LOG_QUEUE_SIZE: int = 10000  # Records buffered before DEBUG/INFO are dropped
+    LOG_QUEUE_BLOCK_SECONDS: float = 0.1  # How long WARNING+ records wait for queue space
+    LOG_LLM_PAYLOAD_MAX_CHARS: int = 2000  # Prompts/responses in llm.log are cut to this
+    LOG_LLM_PAYLOAD_SAMPLE_RATE: float = 1.0  # Fraction of prompts/responses written to llm.log
     
     # Test Settings
     TEST_SCENARIO_TYPES: List[str] = [
@@ -33,14 +139,16 @@ class Settings(BaseSettings):
     BASE_DIR: Path = Path(__file__).parent.parent.parent
     STATIC_DIR: Path = BASE_DIR / "static"
     TESTS_DIR: Path = BASE_DIR / "tests"
+    GENERATED_DIR: Path = TESTS_DIR / "generated"  # Artifacts of incremental spec regeneration
     
     class Config:
         env_file = ".env"
         case_sensitive = True
+    
+    def ensure_directories(self) -> None:
+        """Create the directories the application writes to."""
+        self.LOG_DIR.mkdir(exist_ok=True)
+        self.STATIC_DIR.mkdir(exist_ok=True)
+        self.TESTS_DIR.mkdir(exist_ok=True)
 
-settings = Settings()
-
-# Create necessary directories
-settings.LOG_DIR.mkdir(exist_ok=True)
-settings.STATIC_DIR.mkdir(exist_ok=True)
-settings.TESTS_DIR.mkdir(exist_ok=True) 
\ No newline at end of file
+settings = Settings() 
\ No newline at end of file
@@ -1,8 +1,18 @@
+import asyncio
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
-from app.utils.logger import get_logger
+from app.services.cache import response_cache
+from app.services.intent_classifier import intent_classifier
+from app.services.job_manager import job_manager
+from app.services.llm_service import llm_service
+from app.services.model_router import model_router
+from app.services.scheduler import llm_scheduler
+from app.services.session_manager import session_manager
+from app.utils.logger import get_logger, log_stats, shutdown_logging
+from app.utils.metrics import registry
 
 logger = get_logger("main")
 
@@ -21,6 +31,7 @@ app.add_middleware(
 )
 
 # Mount static files
+settings.ensure_directories()
 app.mount("/static", StaticFiles(directory=settings.STATIC_DIR), name="static")
 
 @app.get("/")
@@ -38,8 +49,47 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: request and stage latency, token usage, cache hits, retries and errors."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Response cache hit/miss counters."""
+    return response_cache.stats()
+
+@app.get("/intent/stats")
+async def intent_stats():
+    """How often chat intents were answered locally vs. by the LLM."""
+    return intent_classifier.stats()
+
+@app.get("/sessions/stats")
+async def session_stats():
+    """Chat session count and eviction counters."""
+    return session_manager.stats()
+
+@app.get("/logging/stats")
+async def logging_stats():
+    """Log queue depth, dropped records and per-record enqueue overhead."""
+    return log_stats()
+
+@app.get("/scheduler/stats")
+async def scheduler_stats():
+    """LLM queue depth, wait times, retries, coalescing and circuit breaker state."""
+    return {
+        **await llm_scheduler.stats(),
+        "inflight_calls": len(llm_service._inflight),
+        "coalesced_calls": llm_service.coalesced_calls
+    }
+
+@app.get("/routing/stats")
+async def routing_stats():
+    """Model tiers with their hit rates and observed latency, plus hedged call counts."""
+    return model_router.stats()
+
 # Import and include routers
-from app.routers import playground, chatbot
+from app.routers import playground, chatbot, jobs, datasets, runner
 
 app.include_router(
     playground.router,
@@ -53,12 +103,36 @@ app.include_router(
     tags=["chatbot"]
 )
 
+app.include_router(
+    jobs.router,
+    prefix=f"{settings.API_V1_STR}/jobs",
+    tags=["jobs"]
+)
+
+app.include_router(
+    datasets.router,
+    prefix=f"{settings.API_V1_STR}/datasets",
+    tags=["datasets"]
+)
+
+app.include_router(
+    runner.router,
+    prefix=f"{settings.API_V1_STR}/runner",
+    tags=["runner"]
+)
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup."""
     logger.info("Application starting up...")
+    if settings.LLM_WARMUP_ON_STARTUP:
+        # Off the event loop so the worker accepts requests while the client loads
+        asyncio.get_running_loop().run_in_executor(None, llm_service.warm_up)
+    await job_manager.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
-    logger.info("Application shutting down...") 
\ No newline at end of file
+    logger.info("Application shutting down...")
+    await job_manager.stop()
+    shutdown_logging() 
\ No newline at end of file
@@ -1,4 +1,7 @@
+import json
+from typing import AsyncIterator
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.schemas.chatbot import (
     ChatMessage,
     ChatResponse,
@@ -6,11 +9,42 @@ from app.schemas.chatbot import (
     PytestGenerationRequest,
     PytestGenerationResponse
 )
+from app.schemas.playground import HTTPMethod
+from app.services.intent_classifier import intent_classifier
 from app.services.llm_service import llm_service
+from app.services.pytest_service import pytest_service
+from app.services.scheduler import LLMUnavailableError
+from app.services.session_manager import session_manager
 from app.utils.logger import get_logger
+from app.utils.metrics import InstrumentedRoute
+from app.utils.pytest_utils import suggest_filename, validate_pytest
 
 logger = get_logger("chatbot_router")
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a server-sent event frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _reply(intent: IntentClassification) -> str:
+    """Pick the assistant's answer for a classified message."""
+    if intent.intent == "greeting":
+        return "Hi! Tell me which API endpoint you'd like tests for, e.g. \"generate tests for POST /users\"."
+    if intent.intent == "help":
+        return (
+            "I generate pytest code and test scenarios for API endpoints. "
+            "Name an endpoint and method (e.g. \"write tests for GET /orders/{id}\") and fill in the API details."
+        )
+    if intent.intent in ("generate_tests", "generate_scenarios"):
+        if intent.endpoint and intent.method:
+            return (
+                f"Got it: {intent.method.value} {intent.endpoint}. "
+                "Please provide the API details (base URL, headers, example request and response)."
+            )
+        if intent.endpoint:
+            return f"Which HTTP method does {intent.endpoint} use? Please also provide the API details."
+        return "I understand you want to generate API tests. Could you please provide more details about the API endpoint?"
+    return "I can help generate API tests. Which endpoint would you like to test?"
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(message: ChatMessage):
@@ -29,14 +63,32 @@ async def chat(message: ChatMessage):
             extra={"session_id": message.session_id}
         )
         
-        # TODO: Implement intent classification using LLM
-        # For now, return a placeholder response
+        session = session_manager.get_or_create(message.session_id)
+        history = session_manager.prompt_context(session)
+        intent, tier = await intent_classifier.classify(
+            message.message, session["context"], history
+        )
+        
+        # Follow-ups like "now do the PUT" keep the endpoint from earlier turns
+        known = session["context"]
+        if intent.requires_details:
+            intent.endpoint = intent.endpoint or known.get("endpoint")
+            if intent.method is None and known.get("method") and intent.endpoint == known.get("endpoint"):
+                intent.method = HTTPMethod(known["method"])
+        
+        reply = _reply(intent)
+        session_manager.add_turn(session, "user", message.message, {
+            "intent": intent.intent,
+            "endpoint": intent.endpoint,
+            "method": intent.method.value if intent.method else None
+        })
+        session_manager.add_turn(session, "assistant", reply)
+        logger.info(f"Classified chat message as {intent.intent} ({tier} tier)")
+        
         return ChatResponse(
-            message="I understand you want to generate API tests. Could you please provide more details about the API endpoint?",
-            intent=IntentClassification(
-                intent="generate_tests",
-                requires_details=True
-            )
+            message=reply,
+            session_id=session["session_id"],
+            intent=intent
         )
         
     except Exception as e:
@@ -66,32 +118,97 @@ async def generate_pytest(request: PytestGenerationRequest):
             }
         )
         
-        code = await llm_service.generate_pytest_code(
+        code, validation = await pytest_service.generate(
             endpoint=request.intent_data.endpoint or "",
             method=request.intent_data.method or "GET",
             base_url=request.api_details.base_url,
             headers=request.api_details.headers,
             request_body=request.api_details.request_body,
             success_status_code=request.api_details.success_status_code,
-            example_response=request.api_details.example_response
+            example_response=request.api_details.example_response,
+            bypass_cache=request.bypass_cache
         )
         
-        # Generate filename based on endpoint
-        endpoint_name = request.intent_data.endpoint or "unknown"
-        filename = f"test_{endpoint_name.replace('/', '_').strip('_')}.py"
-        
-        # Count test cases (rough estimate based on number of test functions)
-        test_count = code.count("def test_")
+        filename = suggest_filename(request.intent_data.endpoint)
         
         return PytestGenerationResponse(
             code=code,
             filename=filename,
-            test_count=test_count
+            test_count=validation.test_count,
+            validation=validation
         )
         
+    except LLMUnavailableError as e:
+        logger.error(f"LLM unavailable for pytest generation: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"LLM temporarily unavailable: {str(e)}"
+        )
     except Exception as e:
         logger.error(f"Error generating pytest code: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate pytest code: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.post("/generate-pytest/stream")
+async def generate_pytest_stream(request: PytestGenerationRequest):
+    """
+    Stream pytest code generation as server-sent events.
+    
+    Emits a "chunk" event for each piece of code as the model produces it,
+    then a "done" event carrying the filename and test_count (or an "error"
+    event if generation fails part-way).
+    
+    Args:
+        request: PytestGenerationRequest containing intent data and API details
+        
+    Returns:
+        StreamingResponse of text/event-stream frames
+    """
+    logger.info(
+        "Streaming pytest code",
+        extra={
+            "endpoint": request.intent_data.endpoint,
+            "method": request.intent_data.method
+        }
+    )
+    
+    async def event_stream() -> AsyncIterator[str]:
+        chunks = []
+        try:
+            async for chunk in llm_service.stream_pytest_code(
+                endpoint=request.intent_data.endpoint or "",
+                method=request.intent_data.method or "GET",
+                base_url=request.api_details.base_url,
+                headers=request.api_details.headers,
+                request_body=request.api_details.request_body,
+                success_status_code=request.api_details.success_status_code,
+                example_response=request.api_details.example_response,
+                bypass_cache=request.bypass_cache
+            ):
+                chunks.append(chunk)
+                yield _sse_event("chunk", {"text": chunk})
+            
+            # Already-sent code can't be repaired by the LLM, but local fixes are
+            # returned in full so the client can replace what it received
+            raw = "".join(chunks)
+            code, validation = validate_pytest(raw)
+            done = {
+                "filename": suggest_filename(request.intent_data.endpoint),
+                "test_count": validation.test_count,
+                "validation": validation.model_dump()
+            }
+            if validation.fixes:
+                done["code"] = code
+            yield _sse_event("done", done)
+            
+        except Exception as e:
+            logger.error(f"Error streaming pytest code: {str(e)}")
+            yield _sse_event("error", {"detail": f"Failed to generate pytest code: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.schemas.dataset import DatasetRequest, DatasetSpecRequest, DatasetSpecResponse
+from app.services.dataset_engine import MEDIA_TYPES, check_format, stream_dataset
+from app.services.dataset_service import dataset_service
+from app.utils.logger import get_logger
+from app.utils.metrics import InstrumentedRoute
+
+logger = get_logger("datasets_router")
+router = APIRouter(route_class=InstrumentedRoute)
+
+@router.post("/spec", response_model=DatasetSpecResponse)
+async def design_spec(request: DatasetSpecRequest):
+    """
+    Design a generator spec for an endpoint's records.
+
+    The spec can be edited and passed back to /generate, which then
+    doesn't call the LLM at all.
+
+    Args:
+        request: DatasetSpecRequest with the endpoint and an example record
+
+    Returns:
+        DatasetSpecResponse with the spec and where it came from
+    """
+    try:
+        spec, source = await dataset_service.design_spec(request)
+        return DatasetSpecResponse(spec=spec, source=source)
+
+    except Exception as e:
+        logger.error(f"Error designing dataset spec: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to design dataset spec: {str(e)}"
+        )
+
+@router.post("/generate")
+async def generate_dataset(request: DatasetRequest):
+    """
+    Generate a synthetic dataset and stream it as JSONL, CSV or Parquet.
+
+    The LLM designs the generator once (skipped when a spec is supplied);
+    the records are then produced locally in chunks of DATASET_CHUNK_ROWS,
+    so memory stays flat up to DATASET_MAX_ROWS records. The same spec,
+    seed and row count always produce the same file. The X-Dataset-Spec-Source
+    header says whether the spec came from the request, the LLM or the
+    example record.
+
+    Args:
+        request: DatasetRequest with the endpoint (or spec), row count and format
+
+    Returns:
+        StreamingResponse of the encoded records
+    """
+    try:
+        check_format(request.format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        if request.spec is not None:
+            spec, source = request.spec, "request"
+        else:
+            spec, source = await dataset_service.design_spec(request)
+
+    except Exception as e:
+        logger.error(f"Error designing dataset spec: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to design dataset spec: {str(e)}"
+        )
+
+    return StreamingResponse(
+        stream_dataset(spec, request.rows, request.format, request.seed),
+        media_type=MEDIA_TYPES[request.format],
+        headers={
+            "Content-Disposition": f'attachment; filename="dataset.{request.format.value}"',
+            "X-Dataset-Spec-Source": source,
+            "X-Accel-Buffering": "no"
+        }
+    )
\ No newline at end of file
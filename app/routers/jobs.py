@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import Any, Dict
+from fastapi import APIRouter, HTTPException, Query
+from app.schemas.jobs import (
+    JobInfo,
+    JobRequest,
+    JobResult,
+    JobResultsResponse,
+    JobStatus
+)
+from app.services.job_manager import job_manager
+from app.utils.logger import get_logger
+from app.utils.metrics import InstrumentedRoute
+
+logger = get_logger("jobs_router")
+router = APIRouter(route_class=InstrumentedRoute)
+
+def _job_info(job: Dict[str, Any]) -> JobInfo:
+    return JobInfo(
+        job_id=job["job_id"],
+        status=job["status"],
+        total=job["total"],
+        completed=job["completed"],
+        failed=job["failed"],
+        created_at=datetime.fromtimestamp(job["created_at"]),
+        updated_at=datetime.fromtimestamp(job["updated_at"])
+    )
+
+def _get_job_or_404(job_id: str) -> Dict[str, Any]:
+    job = job_manager.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+@router.post("", response_model=JobInfo, status_code=202)
+async def create_job(request: JobRequest):
+    """
+    Submit a large batch of endpoints for background scenario generation.
+    
+    Args:
+        request: JobRequest containing the endpoints to process
+        
+    Returns:
+        JobInfo for the newly created job
+    """
+    try:
+        job_id = job_manager.submit(request)
+        return _job_info(job_manager.get_job(job_id))
+        
+    except Exception as e:
+        logger.error(f"Error creating job: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to create job: {str(e)}"
+        )
+
+@router.get("/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str):
+    """
+    Get the status and progress of a job.
+    
+    Args:
+        job_id: Job identifier
+        
+    Returns:
+        JobInfo with progress counters
+    """
+    return _job_info(_get_job_or_404(job_id))
+
+@router.get("/{job_id}/results", response_model=JobResultsResponse)
+async def get_job_results(
+    job_id: str,
+    since: int = Query(0, ge=0, description="Only return results completed after this cursor"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results to return")
+):
+    """
+    Fetch results of a job incrementally, in completion order.
+    
+    Args:
+        job_id: Job identifier
+        since: Cursor returned as next_since by the previous call
+        limit: Maximum number of results to return
+        
+    Returns:
+        JobResultsResponse with the new results and the next cursor
+    """
+    job = _get_job_or_404(job_id)
+    rows = job_manager.get_results(job_id, since, limit)
+    next_since = rows[-1][0] if rows else since
+    finished = job["status"] in (JobStatus.COMPLETED.value, JobStatus.CANCELLED.value, JobStatus.FAILED.value)
+    
+    return JobResultsResponse(
+        job_id=job_id,
+        status=job["status"],
+        results=[JobResult(seq=seq, index=index, result=result) for seq, index, result in rows],
+        next_since=next_since,
+        done=finished and len(rows) < limit
+    )
+
+@router.delete("/{job_id}", response_model=JobInfo)
+async def cancel_job(job_id: str):
+    """
+    Cancel a running job. Results completed so far remain available.
+    
+    Args:
+        job_id: Job identifier
+        
+    Returns:
+        JobInfo for the cancelled job
+    """
+    _get_job_or_404(job_id)
+    await job_manager.cancel(job_id)
+    return _job_info(job_manager.get_job(job_id))
\ No newline at end of file
@@ -1,22 +1,31 @@
+import json
+from typing import AsyncIterator
 from fastapi import APIRouter, HTTPException
-from typing import List
-from app.schemas.playground import (
-    BatchRequest,
-    BatchResponse,
-    EndpointResponse,
-    TestScenario
-)
-from app.services.llm_service import llm_service
+from fastapi.responses import StreamingResponse
+from app.schemas.playground import BatchRequest, BatchResponse, StreamBatchRequest
+from app.schemas.openapi import SpecRequest, SpecResponse
+from app.services.scenario_service import ScenarioBatch, generate_scenarios_packed
+from app.services.spec_service import spec_service
 from app.utils.logger import get_logger
+from app.utils.metrics import InstrumentedRoute
 
 logger = get_logger("playground_router")
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
+
+def _ndjson_line(data: dict) -> str:
+    """Format one newline-delimited JSON record."""
+    return json.dumps(data) + "\n"
 
 @router.post("/generate-scenarios", response_model=BatchResponse)
 async def generate_scenarios(request: BatchRequest):
     """
     Generate test scenarios for multiple API endpoints.
     
+    Endpoints that need the LLM are packed several to a prompt (up to
+    SCENARIO_PACK_MAX_TOKENS), prompts run concurrently (up to
+    BATCH_CONCURRENCY at a time), and results are returned in the same
+    order as the request.
+    
     Args:
         request: BatchRequest containing list of endpoints
         
@@ -24,49 +33,79 @@ async def generate_scenarios(request: BatchRequest):
         BatchResponse containing generated scenarios for each endpoint
     """
     try:
-        results = []
-        
-        for endpoint_request in request.endpoints:
-            logger.info(
-                f"Generating scenarios for endpoint: {endpoint_request.endpoint}",
-                extra={
-                    "endpoint": endpoint_request.endpoint,
-                    "method": endpoint_request.method,
-                    "scenario_types": endpoint_request.scenario_types
-                }
-            )
-            
-            scenarios = await llm_service.generate_test_scenarios(
-                endpoint=endpoint_request.endpoint,
-                method=endpoint_request.method,
-                description=endpoint_request.description,
-                scenario_types=[t.value for t in endpoint_request.scenario_types]
-            )
+        results, llm_calls = await generate_scenarios_packed(request.endpoints, request.bypass_cache)
             
-            # Convert scenarios to TestScenario objects
-            test_scenarios = [
-                TestScenario(
-                    type=scenario["type"],
-                    description=scenario["description"],
-                    input=scenario["input"],
-                    expected_output=scenario["expected_output"]
-                )
-                for scenario in scenarios
-            ]
-            
-            results.append(
-                EndpointResponse(
-                    endpoint=endpoint_request.endpoint,
-                    method=endpoint_request.method,
-                    scenarios=test_scenarios
-                )
-            )
-            
-        return BatchResponse(results=results)
+        return BatchResponse(results=results, llm_calls=llm_calls)
         
     except Exception as e:
         logger.error(f"Error generating scenarios: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate test scenarios: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/generate-scenarios/stream")
+async def generate_scenarios_stream(request: StreamBatchRequest):
+    """
+    Stream test scenarios as newline-delimited JSON, one line per endpoint.
+    
+    Lines are written in completion order as {"index": <position in the
+    request>, "result": <EndpointResponse>}, followed by a final
+    {"done": true, "count": ..., "llm_calls": ...} line (or an
+    {"error": ...} line if generation fails part-way). Results are not
+    kept after they are sent, so batches can be much larger than
+    MAX_BATCH_SIZE.
+    
+    Args:
+        request: StreamBatchRequest containing list of endpoints
+        
+    Returns:
+        StreamingResponse of application/x-ndjson lines
+    """
+    logger.info(f"Streaming scenarios for {len(request.endpoints)} endpoints")
+    
+    async def ndjson_stream() -> AsyncIterator[str]:
+        batch = ScenarioBatch(request.endpoints, request.bypass_cache)
+        count = 0
+        try:
+            async for index, result in batch:
+                count += 1
+                yield _ndjson_line({"index": index, "result": result.model_dump(mode="json")})
+            yield _ndjson_line({"done": True, "count": count, "llm_calls": batch.llm_calls})
+            
+        except Exception as e:
+            logger.error(f"Error streaming scenarios: {str(e)}")
+            yield _ndjson_line({"error": f"Failed to generate test scenarios: {str(e)}"})
+    
+    return StreamingResponse(
+        ndjson_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/generate-from-spec", response_model=SpecResponse)
+async def generate_from_spec(request: SpecRequest):
+    """
+    Generate test scenarios for every operation in an OpenAPI/Swagger spec.
+    
+    Request and response schemas ground each prompt, and small operations
+    are packed several to a prompt to cut LLM round-trips.
+    
+    Args:
+        request: SpecRequest containing the spec document and options
+        
+    Returns:
+        SpecResponse with scenarios (and optional pytest code) per operation
+    """
+    try:
+        return await spec_service.generate(request)
+        
+    except ValueError as e:
+        logger.error(f"Invalid spec: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Invalid spec: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error generating scenarios from spec: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate scenarios from spec: {str(e)}"
+        )
\ No newline at end of file
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException
+from app.core.config import settings
+from app.schemas.runner import RunRequest, RunResponse
+from app.services.test_runner import pytest_runner
+from app.utils.logger import get_logger
+from app.utils.metrics import InstrumentedRoute
+
+logger = get_logger("runner_router")
+router = APIRouter(route_class=InstrumentedRoute)
+
+@router.post("/run", response_model=RunResponse)
+async def run_tests(request: RunRequest):
+    """
+    Run generated pytest files against an API and report per-test results.
+
+    Tests are spread over up to TEST_RUNNER_WORKERS pytest processes, and
+    each process reuses one HTTP session for all its tests. The tests read
+    their target from API_BASE_URL, which is set to `base_url`.
+
+    Args:
+        request: RunRequest with the test files and target base_url
+
+    Returns:
+        RunResponse with counts, timings and a result per test
+    """
+    if not settings.TEST_RUNNER_ENABLED:
+        raise HTTPException(status_code=403, detail="The test runner is disabled; set TEST_RUNNER_ENABLED=true to enable it")
+
+    try:
+        return await pytest_runner.run(request)
+
+    except Exception as e:
+        logger.error(f"Error running tests: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to run tests: {str(e)}"
+        )
\ No newline at end of file
@@ -22,13 +22,25 @@ class ApiDetails(BaseModel):
 class PytestGenerationRequest(BaseModel):
     intent_data: IntentClassification
     api_details: ApiDetails
+    bypass_cache: bool = Field(False, description="Skip the response cache and regenerate")
+
+class PytestValidation(BaseModel):
+    valid: bool = Field(..., description="Whether the code parses and no problems were found")
+    test_count: int = Field(..., description="Number of test functions")
+    markers: List[str] = Field(default_factory=list, description="pytest markers used by the tests")
+    fixtures: List[str] = Field(default_factory=list, description="Fixtures defined in the file")
+    fixes: List[str] = Field(default_factory=list, description="Mechanical fixes applied locally")
+    issues: List[str] = Field(default_factory=list, description="Problems that remain")
+    llm_repaired: bool = Field(False, description="Whether a repair prompt was needed")
 
 class PytestGenerationResponse(BaseModel):
     code: str = Field(..., description="Generated pytest code")
     filename: str = Field(..., description="Suggested filename for the test file")
     test_count: int = Field(..., description="Number of test cases generated")
+    validation: Optional[PytestValidation] = Field(None, description="Static checks and fixes applied to the code")
 
 class ChatResponse(BaseModel):
     message: str = Field(..., description="Response message")
+    session_id: Optional[str] = Field(None, description="Session ID to send with follow-up messages")
     intent: Optional[IntentClassification] = Field(None, description="Classified intent if applicable")
     pytest_code: Optional[PytestGenerationResponse] = Field(None, description="Generated pytest code if applicable") 
\ No newline at end of file
@@ -0,0 +1,146 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, model_validator
+from app.core.config import settings
+from .playground import HTTPMethod
+
+class FieldType(str, Enum):
+    INTEGER = "integer"
+    NUMBER = "number"
+    BOOLEAN = "boolean"
+    STRING = "string"
+    TEXT = "text"
+    ENUM = "enum"
+    EMAIL = "email"
+    UUID = "uuid"
+    DATE = "date"
+    DATETIME = "datetime"
+    SEQUENCE = "sequence"
+    ARRAY = "array"
+
+class Distribution(str, Enum):
+    UNIFORM = "uniform"
+    NORMAL = "normal"
+    LOGNORMAL = "lognormal"
+
+class ConstraintType(str, Enum):
+    ORDERED = "ordered"
+    NULL_UNLESS = "null_unless"
+
+# Field types whose values can be ordered against each other
+_ORDERED_TYPE_GROUPS = (
+    frozenset({FieldType.INTEGER, FieldType.NUMBER, FieldType.SEQUENCE}),
+    frozenset({FieldType.DATE, FieldType.DATETIME})
+)
+
+class DatasetFormat(str, Enum):
+    JSONL = "jsonl"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+class FieldSpec(BaseModel):
+    name: str = Field(..., description="Field name; dots nest it (e.g. address.city)")
+    type: FieldType
+    minimum: Optional[float] = Field(None, description="Lower bound for numbers; first value of a sequence")
+    maximum: Optional[float] = Field(None, description="Upper bound for numbers")
+    distribution: Distribution = Distribution.UNIFORM
+    mean: Optional[float] = Field(None, description="Mean for normal/lognormal numbers")
+    stddev: Optional[float] = Field(None, description="Standard deviation for normal/lognormal numbers")
+    decimals: int = Field(2, ge=0, le=10, description="Rounding for numbers")
+    values: Optional[List[Any]] = Field(None, description="Choices for enum fields and array items")
+    weights: Optional[List[float]] = Field(None, description="Relative frequency of each value")
+    min_length: int = Field(1, ge=0, description="Characters for strings, words for text, items for arrays")
+    max_length: int = Field(12, ge=0, description="Characters for strings, words for text, items for arrays")
+    prefix: str = Field("", description="Prepended to generated strings")
+    start: str = Field("2020-01-01", description="Earliest ISO date/datetime for date and datetime fields")
+    end: str = Field("2025-12-31", description="Latest ISO date/datetime for date and datetime fields")
+    probability: float = Field(0.5, ge=0, le=1, description="Chance of true for booleans")
+    null_rate: float = Field(0.0, ge=0, le=1, description="Fraction of rows where the field is null")
+
+    @model_validator(mode="after")
+    def check_choices(self) -> "FieldSpec":
+        if self.type in (FieldType.ENUM, FieldType.ARRAY) and not self.values:
+            raise ValueError(f"Field '{self.name}' of type {self.type.value} needs values")
+        if self.weights is not None and len(self.weights) != len(self.values or []):
+            raise ValueError(f"Field '{self.name}' has {len(self.weights)} weights for {len(self.values or [])} values")
+        if self.weights is not None and sum(self.weights) <= 0:
+            raise ValueError(f"Field '{self.name}' weights must sum to more than zero")
+        if self.max_length < self.min_length:
+            self.max_length = self.min_length
+        if self.minimum is not None and self.maximum is not None and self.maximum < self.minimum:
+            raise ValueError(f"Field '{self.name}' has maximum below minimum")
+        if self.type in (FieldType.DATE, FieldType.DATETIME):
+            try:
+                start, end = datetime.fromisoformat(self.start), datetime.fromisoformat(self.end)
+            except ValueError as e:
+                raise ValueError(f"Field '{self.name}' has an invalid start/end: {str(e)}")
+            if end.replace(tzinfo=None) < start.replace(tzinfo=None):
+                raise ValueError(f"Field '{self.name}' ends before it starts")
+        return self
+
+class ConstraintSpec(BaseModel):
+    type: ConstraintType
+    fields: List[str] = Field(
+        ...,
+        min_length=1,
+        description="ordered: fields whose values must not decrease in this order; null_unless: the fields made null"
+    )
+    when_field: Optional[str] = Field(None, description="null_unless: field to test")
+    when_values: List[Any] = Field(default_factory=list, description="null_unless: values of when_field that keep the fields")
+
+class GeneratorSpec(BaseModel):
+    fields: List[FieldSpec] = Field(..., min_length=1)
+    constraints: List[ConstraintSpec] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def check_references(self) -> "GeneratorSpec":
+        types = {field.name: field.type for field in self.fields}
+        names = set(types)
+        if len(names) < len(self.fields):
+            raise ValueError("Field names must be unique")
+        for name in names:
+            parts = name.split(".")
+            parents = [".".join(parts[:i]) for i in range(1, len(parts))]
+            clashes = [parent for parent in parents if parent in names]
+            if clashes:
+                raise ValueError(f"Field '{name}' nests inside non-object field '{clashes[0]}'")
+        for constraint in self.constraints:
+            referenced = constraint.fields + ([constraint.when_field] if constraint.when_field else [])
+            unknown = [name for name in referenced if name not in names]
+            if unknown:
+                raise ValueError(f"Constraint {constraint.type.value} refers to unknown fields: {unknown}")
+            if constraint.type == ConstraintType.NULL_UNLESS and not constraint.when_field:
+                raise ValueError("null_unless constraints need when_field")
+            if constraint.type == ConstraintType.ORDERED:
+                field_types = {types[name] for name in constraint.fields}
+                if not any(field_types <= group for group in _ORDERED_TYPE_GROUPS):
+                    raise ValueError(
+                        f"ordered constraint on {constraint.fields} needs all numeric (integer, number, sequence) "
+                        f"or all date/datetime fields, got {sorted(t.value for t in field_types)}"
+                    )
+        return self
+
+class DatasetSpecRequest(BaseModel):
+    endpoint: str = Field(..., description="API endpoint path the records are for")
+    method: HTTPMethod = Field(HTTPMethod.POST, description="HTTP method")
+    description: str = Field(..., description="What the endpoint does and what the records represent")
+    request_body: Optional[Dict[str, Any]] = Field(None, description="Example record")
+    bypass_cache: bool = Field(False, description="Skip the response cache and redesign the spec")
+
+class DatasetRequest(DatasetSpecRequest):
+    description: str = Field("", description="What the endpoint does and what the records represent")
+    rows: int = Field(..., ge=1, le=settings.DATASET_MAX_ROWS, description="Number of records to generate")
+    format: DatasetFormat = DatasetFormat.JSONL
+    seed: int = Field(0, description="Same spec, seed and row count give the same file")
+    spec: Optional[GeneratorSpec] = Field(None, description="Generator spec to use instead of asking the LLM")
+
+    @model_validator(mode="after")
+    def check_source(self) -> "DatasetRequest":
+        if self.spec is None and not (self.description or self.request_body):
+            raise ValueError("Provide a spec, or a description or request_body to design one from")
+        return self
+
+class DatasetSpecResponse(BaseModel):
+    spec: GeneratorSpec
+    source: str = Field(..., description="\"llm\", or \"example\" when inferred locally from request_body")
\ No newline at end of file
@@ -0,0 +1,43 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from app.core.config import settings
+from .playground import EndpointRequest, EndpointResponse
+
+class JobStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    CANCELLED = "CANCELLED"
+    FAILED = "FAILED"
+
+class JobRequest(BaseModel):
+    endpoints: List[EndpointRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.MAX_JOB_SIZE,
+        description="List of endpoints to generate scenarios for"
+    )
+    bypass_cache: bool = Field(False, description="Skip the response cache and regenerate")
+
+class JobInfo(BaseModel):
+    job_id: str
+    status: JobStatus
+    total: int = Field(..., description="Number of endpoints in the job")
+    completed: int = Field(..., description="Number of endpoints processed so far, including failures")
+    failed: int = Field(..., description="Number of endpoints that failed")
+    created_at: datetime
+    updated_at: datetime
+
+class JobResult(BaseModel):
+    seq: int = Field(..., description="Completion sequence number; pass as 'since' to fetch newer results")
+    index: int = Field(..., description="Position of the endpoint in the original request")
+    result: EndpointResponse
+
+class JobResultsResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    results: List[JobResult]
+    next_since: int = Field(..., description="Cursor for the next incremental fetch")
+    done: bool = Field(..., description="Whether the job is finished and all results have been returned")
\ No newline at end of file
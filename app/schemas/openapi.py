@@ -0,0 +1,53 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+from .chatbot import ApiDetails, PytestGenerationResponse
+from .playground import EndpointRequest, HTTPMethod, ScenarioType, TestScenario
+
+class SpecOperation(BaseModel):
+    operation_id: str = Field(..., description="operationId, or METHOD path when the spec has none")
+    endpoint: EndpointRequest
+    api_details: ApiDetails
+    context: str = Field("", description="Compact request/response schema used to ground the prompt")
+
+class SpecRequest(BaseModel):
+    spec: Dict[str, Any] = Field(..., description="OpenAPI 3.x or Swagger 2.0 document")
+    scenario_types: List[ScenarioType] = Field(
+        default=[ScenarioType.POSITIVE, ScenarioType.NEGATIVE],
+        description="Types of scenarios to generate for every operation"
+    )
+    base_url: Optional[str] = Field(None, description="Override the base URL declared in the spec")
+    generate_pytest: bool = Field(False, description="Also generate a pytest file for every operation")
+    bypass_cache: bool = Field(False, description="Skip the response cache and regenerate")
+    incremental: bool = Field(
+        False,
+        description="Only send operations whose inputs changed since the last run to the LLM; reuse the rest from disk"
+    )
+    namespace: Optional[str] = Field(
+        None,
+        min_length=1,
+        description="Name the incremental artifacts are kept under (default: the spec title)"
+    )
+
+class SpecOperationResult(BaseModel):
+    operation_id: str
+    endpoint: str
+    method: HTTPMethod
+    scenarios: List[TestScenario] = Field(default_factory=list)
+    pytest_code: Optional[PytestGenerationResponse] = None
+    error: Optional[str] = Field(None, description="Error message if generation failed for this operation")
+    diagnostics: List[str] = Field(default_factory=list, description="Malformed LLM output that was discarded")
+
+class SpecChanges(BaseModel):
+    namespace: str
+    added: List[str] = Field(default_factory=list, description="METHOD path of operations generated for the first time")
+    changed: List[str] = Field(default_factory=list, description="METHOD path of operations regenerated because their inputs changed")
+    unchanged: List[str] = Field(default_factory=list, description="METHOD path of operations served entirely from disk")
+    removed: List[str] = Field(default_factory=list, description="METHOD path of operations no longer in the spec; their artifacts were deleted")
+    reused: int = Field(0, description="Artifacts (scenario sets and pytest files) loaded instead of generated")
+
+class SpecResponse(BaseModel):
+    title: str
+    operation_count: int
+    llm_calls: int = Field(..., description="Number of scenario prompts sent after packing small operations")
+    results: List[SpecOperationResult]
+    changes: Optional[SpecChanges] = Field(None, description="Diff against the previous run (incremental mode only)")
\ No newline at end of file
@@ -1,6 +1,7 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field, HttpUrl
 from enum import Enum
+from app.core.config import settings
 
 class HTTPMethod(str, Enum):
     GET = "GET"
@@ -24,13 +25,31 @@ class EndpointRequest(BaseModel):
         default=[ScenarioType.POSITIVE, ScenarioType.NEGATIVE],
         description="Types of scenarios to generate"
     )
+    request_schema: Optional[Dict[str, Any]] = Field(
+        None,
+        description="JSON schema of the request body; enables local generation of structured scenarios"
+    )
+    request_body: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Example request body; used to infer a schema when request_schema is not given"
+    )
+    seed: Optional[int] = Field(None, description="Seed for reproducible locally generated scenarios")
 
 class BatchRequest(BaseModel):
     endpoints: List[EndpointRequest] = Field(
         ...,
-        max_items=5,
+        max_length=settings.MAX_BATCH_SIZE,
         description="List of endpoints to generate scenarios for"
     )
+    bypass_cache: bool = Field(False, description="Skip the response cache and regenerate")
+
+class StreamBatchRequest(BaseModel):
+    endpoints: List[EndpointRequest] = Field(
+        ...,
+        max_length=settings.MAX_JOB_SIZE,
+        description="List of endpoints to generate scenarios for; results are streamed as they complete"
+    )
+    bypass_cache: bool = Field(False, description="Skip the response cache and regenerate")
 
 class TestScenario(BaseModel):
     type: ScenarioType
@@ -40,8 +59,11 @@ class TestScenario(BaseModel):
 
 class EndpointResponse(BaseModel):
     endpoint: str
-    method: HTTPMethod
-    scenarios: List[TestScenario]
+    method: Optional[HTTPMethod] = Field(None, description="None only if the endpoint request itself could not be read")
+    scenarios: List[TestScenario] = Field(default_factory=list)
+    error: Optional[str] = Field(None, description="Error message if generation failed for this endpoint")
+    diagnostics: List[str] = Field(default_factory=list, description="Malformed LLM output that was discarded")
 
 class BatchResponse(BaseModel):
-    results: List[EndpointResponse] 
\ No newline at end of file
+    results: List[EndpointResponse]
+    llm_calls: int = Field(0, description="Number of scenario prompts sent after packing endpoints together") 
\ No newline at end of file
@@ -0,0 +1,57 @@
+from enum import Enum
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from app.core.config import settings
+
+class Distribution(str, Enum):
+    TEST = "test"
+    FILE = "file"
+
+class TestOutcome(str, Enum):
+    PASSED = "passed"
+    FAILED = "failed"
+    ERROR = "error"
+    SKIPPED = "skipped"
+
+class TestFile(BaseModel):
+    filename: str = Field(..., description="File name, e.g. test_users.py (renamed to test_*.py if needed)")
+    code: str = Field(..., min_length=1, description="pytest code, e.g. from /chatbot/generate-pytest")
+
+class RunRequest(BaseModel):
+    base_url: str = Field(..., description="API the tests run against; exported to them as API_BASE_URL")
+    files: List[TestFile] = Field(..., min_length=1, max_length=settings.TEST_RUNNER_MAX_FILES)
+    workers: Optional[int] = Field(
+        None,
+        ge=1,
+        le=settings.TEST_RUNNER_WORKERS,
+        description="pytest processes to spread the tests over (default TEST_RUNNER_WORKERS)"
+    )
+    distribution: Distribution = Field(
+        Distribution.TEST,
+        description="\"test\" splits every file across workers; \"file\" keeps each file's tests in one worker, in order"
+    )
+    timeout_seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        le=settings.TEST_RUNNER_TIMEOUT_SECONDS,
+        description="Wall-clock limit for the run (default TEST_RUNNER_TIMEOUT_SECONDS)"
+    )
+
+class TestCaseResult(BaseModel):
+    nodeid: str = Field(..., description="pytest node id, e.g. test_users.py::test_create_user")
+    file: str
+    name: str
+    outcome: TestOutcome
+    duration: float = Field(..., description="Seconds, including setup and teardown")
+    message: Optional[str] = Field(None, description="Failure, error or skip details")
+
+class RunResponse(BaseModel):
+    total: int
+    passed: int
+    failed: int
+    errors: int
+    skipped: int
+    duration: float = Field(..., description="Wall-clock seconds for the whole run")
+    workers: int = Field(..., description="pytest processes used")
+    timed_out: bool = False
+    results: List[TestCaseResult]
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Run the API with several worker processes that share state.
+
+Usage:
+    python -m app.serve --workers 4 --host 0.0.0.0 --port 8000
+
+Every worker is a separate uvicorn process, so process-local state would
+diverge between them. Unless already set in the environment, the launcher
+points the response cache, chat sessions, job store and LLM rate limits at
+SQLite files under data/, so all workers see the same cache, sessions and
+jobs and draw from one Gemini quota.
+"""
+import argparse
+import os
+from typing import List, Optional
+
+# Settings are read when the workers import the app, so these must be set first
+SHARED_STATE_DEFAULTS = {
+    "CACHE_DB_PATH": "data/cache.db",
+    "SESSION_STORE_BACKEND": "sqlite",
+    "JOB_STORE_BACKEND": "sqlite",
+    "FINGERPRINT_STORE_BACKEND": "sqlite",
+    "LLM_RATE_LIMIT_BACKEND": "sqlite"
+}
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", default="info", help="uvicorn's own log level")
+    args = parser.parse_args(argv)
+
+    os.environ["WORKERS"] = str(args.workers)
+    for key, value in SHARED_STATE_DEFAULTS.items():
+        os.environ.setdefault(key, value)
+
+    import uvicorn
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level
+    )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from app.core.config import settings
+from app.schemas.chatbot import PytestGenerationResponse
+from app.schemas.openapi import SpecOperation
+from app.schemas.playground import EndpointResponse
+from app.services.fingerprint_store import FingerprintStore, create_fingerprint_store
+from app.services.llm_service import PYTEST_PROMPT_VERSION, SCENARIO_PROMPT_VERSION
+from app.services.model_router import model_router
+from app.utils.logger import get_logger
+from app.utils.pytest_utils import suggest_filename, validate_pytest
+
+logger = get_logger("artifact_service")
+
+SCENARIOS = "scenarios"
+PYTEST = "pytest"
+
+class ArtifactService:
+    """
+    Keeps what was generated for each spec operation, keyed on its inputs.
+
+    Every artifact is written under GENERATED_DIR/<namespace>/ (scenario
+    sets as scenarios/<name>.json, pytest files as test_<name>.py) and
+    recorded with a fingerprint of everything its prompt was built from:
+    the endpoint, method, description and schemas (or ApiDetails for
+    pytest), the model tiers and the prompt version. An artifact is reused only
+    while its fingerprint still matches.
+    """
+
+    def __init__(self, store: FingerprintStore, root: Path):
+        self.store = store
+        self.root = root
+
+    @staticmethod
+    def key(operation: SpecOperation) -> str:
+        """Identity of an operation across runs: METHOD path."""
+        return f"{operation.endpoint.method.value} {operation.endpoint.endpoint}"
+
+    @staticmethod
+    def fingerprint(kind: str, operation: SpecOperation) -> str:
+        """Hash of the inputs the artifact of this kind is generated from."""
+        endpoint = operation.endpoint
+        if kind == SCENARIOS:
+            inputs: Dict[str, Any] = {
+                "endpoint": endpoint.model_dump(mode="json"),
+                "context": operation.context,
+                "version": SCENARIO_PROMPT_VERSION
+            }
+        else:
+            inputs = {
+                "endpoint": endpoint.endpoint,
+                "method": endpoint.method.value,
+                "description": endpoint.description,
+                "api_details": operation.api_details.model_dump(mode="json"),
+                "version": PYTEST_PROMPT_VERSION
+            }
+        # The kinds double as routing task names
+        inputs["model"] = model_router.route(kind)
+        canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def known(self, namespace: str, operation: SpecOperation) -> bool:
+        """Whether anything was generated for this operation before."""
+        key = self.key(operation)
+        return any(self.store.get(namespace, kind, key) for kind in (SCENARIOS, PYTEST))
+
+    def load_scenarios(self, namespace: str, operation: SpecOperation) -> Optional[EndpointResponse]:
+        """The stored scenarios, or None if they are missing or stale."""
+        text = self._load(namespace, SCENARIOS, operation)
+        if text is None:
+            return None
+        try:
+            return EndpointResponse.model_validate_json(text)
+        except ValueError as e:
+            logger.warning(f"Unreadable scenario artifact for {self.key(operation)}: {str(e)}")
+            return None
+
+    def save_scenarios(self, namespace: str, operation: SpecOperation, response: EndpointResponse) -> None:
+        self._save(namespace, SCENARIOS, operation, response.model_dump_json(indent=2))
+
+    def load_pytest(self, namespace: str, operation: SpecOperation) -> Optional[PytestGenerationResponse]:
+        """The stored pytest file, or None if it is missing or stale."""
+        code = self._load(namespace, PYTEST, operation)
+        if code is None:
+            return None
+        # Only the code is stored; the static checks are cheap to redo
+        code, validation = validate_pytest(code)
+        return PytestGenerationResponse(
+            code=code,
+            filename=Path(self.store.get(namespace, PYTEST, self.key(operation))["path"]).name,
+            test_count=validation.test_count,
+            validation=validation
+        )
+
+    def save_pytest(self, namespace: str, operation: SpecOperation, pytest_code: PytestGenerationResponse) -> None:
+        self._save(namespace, PYTEST, operation, pytest_code.code)
+
+    def prune(self, namespace: str, keep: Iterable[str]) -> List[str]:
+        """
+        Delete the artifacts of operations that are no longer in the spec.
+
+        Args:
+            namespace: Namespace to clean up
+            keep: Keys of the operations still present
+
+        Returns:
+            Sorted keys of the removed operations
+        """
+        keep = set(keep)
+        removed = set()
+        for record in self.store.list(namespace):
+            if record["key"] in keep:
+                continue
+            Path(record["path"]).unlink(missing_ok=True)
+            self.store.delete(namespace, record["kind"], record["key"])
+            removed.add(record["key"])
+        if removed:
+            logger.info(f"Removed artifacts of {len(removed)} operation(s) no longer in {namespace}")
+        return sorted(removed)
+
+    def _load(self, namespace: str, kind: str, operation: SpecOperation) -> Optional[str]:
+        record = self.store.get(namespace, kind, self.key(operation))
+        if record is None or record["fingerprint"] != self.fingerprint(kind, operation):
+            return None
+        try:
+            return Path(record["path"]).read_text(encoding="utf-8")
+        except OSError:
+            # Deleted or moved by hand; regenerate it
+            return None
+
+    def _save(self, namespace: str, kind: str, operation: SpecOperation, content: str) -> None:
+        key = self.key(operation)
+        record = self.store.get(namespace, kind, key)
+        path = Path(record["path"]) if record else self._path(namespace, kind, operation)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so readers never see a partial file
+        temporary = path.with_name(f".{path.name}.tmp")
+        temporary.write_text(content, encoding="utf-8")
+        os.replace(temporary, path)
+        self.store.put({
+            "namespace": namespace,
+            "kind": kind,
+            "key": key,
+            "fingerprint": self.fingerprint(kind, operation),
+            "path": str(path),
+            "updated_at": time.time()
+        })
+
+    def _path(self, namespace: str, kind: str, operation: SpecOperation) -> Path:
+        """A new artifact path; paths already taken by other operations get a hash suffix."""
+        directory = self.root / _slug(namespace)
+        stem = Path(suggest_filename(f"{operation.endpoint.method.value.lower()}{operation.endpoint.endpoint}")).stem
+        if kind == SCENARIOS:
+            directory, stem = directory / "scenarios", stem[len("test_"):]
+        suffix = ".json" if kind == SCENARIOS else ".py"
+        path = directory / f"{stem}{suffix}"
+        taken = {record["path"] for record in self.store.list(namespace) if record["kind"] == kind}
+        if str(path) in taken:
+            digest = hashlib.sha256(self.key(operation).encode("utf-8")).hexdigest()[:8]
+            path = directory / f"{stem}_{digest}{suffix}"
+        return path
+
+def _slug(namespace: str) -> str:
+    """Directory name for a namespace; a hash keeps e.g. "Pet Store" and "pet-store" apart."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", namespace).strip("_").lower() or "default"
+    if slug != namespace:
+        slug = f"{slug}_{hashlib.sha256(namespace.encode('utf-8')).hexdigest()[:8]}"
+    return slug
+
+artifact_service = ArtifactService(create_fingerprint_store(), settings.GENERATED_DIR)
\ No newline at end of file
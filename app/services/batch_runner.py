@@ -0,0 +1,281 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+from itertools import islice
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, TextIO, Tuple
+from app.core.config import settings
+from app.schemas.chatbot import PytestGenerationRequest, PytestGenerationResponse
+from app.schemas.playground import EndpointRequest, EndpointResponse
+from app.services.pytest_service import pytest_service
+from app.services.scenario_service import ScenarioBatch
+from app.utils.logger import get_logger
+
+logger = get_logger("batch_runner")
+
+SCENARIOS = "scenarios"
+PYTEST = "pytest"
+
+# Input lines read per blocking read; keeps stdin off the event loop without a thread hop per line
+_READ_LINES = 256
+
+class Checkpoint:
+    """
+    Append-only record of finished input lines.
+
+    Each entry is the line number plus a hash of the line's content, so an
+    edited input line is processed again on resume.
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.done: Set[Tuple[int, str]] = set()
+        self._file: Optional[TextIO] = None
+        if path is None:
+            return
+
+        torn = False
+        if path.exists():
+            with path.open(encoding="utf-8") as existing:
+                for text in existing:
+                    torn = not text.endswith("\n")
+                    try:
+                        entry = json.loads(text)
+                        self.done.add((int(entry["line"]), str(entry["sha"])))
+                    except (ValueError, KeyError, TypeError):
+                        # A run killed mid-write leaves a partial last entry
+                        continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("a", encoding="utf-8")
+        if torn:
+            self._file.write("\n")
+
+    def __contains__(self, item: Tuple[int, str]) -> bool:
+        return item in self.done
+
+    def add(self, line: int, sha: str) -> None:
+        self.done.add((line, sha))
+        if self._file is not None:
+            self._file.write(json.dumps({"line": line, "sha": sha}) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+class ResultWriter:
+    """Writes result records as JSONL and, optionally, each result as a file."""
+
+    def __init__(self, output: str, out_dir: Optional[Path], append: bool = False):
+        self._stream = sys.stdout if output == "-" else open(output, "a" if append else "w", encoding="utf-8")
+        self.out_dir = out_dir
+        # File name -> input line that owns it in this run
+        self._names: Dict[str, int] = {}
+        if out_dir is not None:
+            out_dir.mkdir(parents=True, exist_ok=True)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._stream.write(json.dumps(record) + "\n")
+        self._stream.flush()
+
+    def write_file(self, line: int, name: str, content: str) -> str:
+        """Write a result file atomically; returns its path. Names clashing with another line get a _<line> suffix."""
+        owner = self._names.setdefault(name, line)
+        if owner != line:
+            stem, dot, suffix = name.rpartition(".")
+            name = f"{stem}_{line}{dot}{suffix}"
+        path = self.out_dir / name
+        temporary = path.with_name(f".{path.name}.tmp")
+        temporary.write_text(content, encoding="utf-8")
+        os.replace(temporary, path)
+        return str(path)
+
+    def close(self) -> None:
+        if self._stream is not sys.stdout:
+            self._stream.close()
+
+class BatchRunner:
+    """
+    Processes JSONL records of EndpointRequest or PytestGenerationRequest.
+
+    Input is read lazily and at most `concurrency` items are generated at
+    once, so memory doesn't grow with the input. Each result is written
+    as soon as it completes and then checkpointed; a crash between the two
+    repeats that item on resume rather than losing it. Items whose input
+    is invalid count as finished; items that failed to generate don't, so
+    a rerun retries them.
+
+    Scenario requests are read in windows of `window` items and each
+    window goes through ScenarioBatch, so small endpoints are still packed
+    several to a prompt.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        writer: ResultWriter,
+        checkpoint: Checkpoint,
+        concurrency: Optional[int] = None,
+        bypass_cache: bool = False,
+        window: int = 500
+    ):
+        self.kind = kind
+        self.writer = writer
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency or settings.BATCH_CONCURRENCY
+        self.bypass_cache = bypass_cache
+        self.window = window
+        self.counts = {"succeeded": 0, "failed": 0, "invalid": 0, "skipped": 0}
+
+    async def run(self, stream: TextIO) -> Dict[str, int]:
+        """
+        Process every record of a JSONL stream.
+
+        Args:
+            stream: Input, one JSON object per line; blank lines are ignored
+
+        Returns:
+            Counts of succeeded, failed, invalid and skipped (already checkpointed) items
+        """
+        if self.kind == SCENARIOS:
+            await self._run_scenarios(stream)
+        else:
+            await self._run_pytest(stream)
+        return self.counts
+
+    async def _lines(self, stream: TextIO) -> AsyncIterator[Tuple[int, str, str]]:
+        """(line number, text, content hash) of each pending line."""
+        number = 0
+        while True:
+            chunk = await asyncio.to_thread(lambda: list(islice(stream, _READ_LINES)))
+            if not chunk:
+                return
+            for text in chunk:
+                number += 1
+                text = text.strip()
+                if not text:
+                    continue
+                sha = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+                if (number, sha) in self.checkpoint:
+                    self.counts["skipped"] += 1
+                    continue
+                yield number, text, sha
+
+    def _finish(
+        self,
+        line: int,
+        sha: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        file: Optional[str] = None,
+        invalid: bool = False
+    ) -> None:
+        record: Dict[str, Any] = {"line": line}
+        if file is not None:
+            record["file"] = file
+        if result is not None:
+            record["result"] = result
+        if error is not None:
+            record["error"] = error
+        self.writer.write(record)
+
+        if invalid:
+            self.counts["invalid"] += 1
+        elif error is not None:
+            self.counts["failed"] += 1
+            return
+        else:
+            self.counts["succeeded"] += 1
+        self.checkpoint.add(line, sha)
+
+    async def _run_scenarios(self, stream: TextIO) -> None:
+        window: List[Tuple[int, str, EndpointRequest]] = []
+        async for line, text, sha in self._lines(stream):
+            try:
+                window.append((line, sha, EndpointRequest.model_validate_json(text)))
+            except ValueError as e:
+                self._finish(line, sha, error=f"Invalid EndpointRequest: {str(e)}", invalid=True)
+                continue
+            if len(window) >= self.window:
+                await self._scenario_window(window)
+                window = []
+        if window:
+            await self._scenario_window(window)
+
+    async def _scenario_window(self, window: List[Tuple[int, str, EndpointRequest]]) -> None:
+        batch = ScenarioBatch(
+            [request for _, _, request in window],
+            self.bypass_cache,
+            concurrency=self.concurrency
+        )
+        async for index, response in batch:
+            line, sha, _ = window[index]
+            file = None
+            if self.writer.out_dir is not None and response.error is None:
+                file = self.writer.write_file(line, _scenario_filename(response), response.model_dump_json(indent=2))
+            self._finish(line, sha, result=response.model_dump(mode="json"), error=response.error, file=file)
+
+    async def _run_pytest(self, stream: TextIO) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: Set[asyncio.Task] = set()
+
+        def release(task: asyncio.Task) -> None:
+            tasks.discard(task)
+            slots.release()
+
+        try:
+            async for line, text, sha in self._lines(stream):
+                # Read no further ahead than the free slots
+                await slots.acquire()
+                task = asyncio.create_task(self._pytest_item(line, text, sha))
+                tasks.add(task)
+                task.add_done_callback(release)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _pytest_item(self, line: int, text: str, sha: str) -> None:
+        try:
+            request = PytestGenerationRequest.model_validate_json(text)
+        except ValueError as e:
+            self._finish(line, sha, error=f"Invalid PytestGenerationRequest: {str(e)}", invalid=True)
+            return
+
+        try:
+            code, validation = await pytest_service.generate(
+                endpoint=request.intent_data.endpoint or "",
+                method=request.intent_data.method or "GET",
+                base_url=request.api_details.base_url,
+                headers=request.api_details.headers,
+                request_body=request.api_details.request_body,
+                success_status_code=request.api_details.success_status_code,
+                example_response=request.api_details.example_response,
+                bypass_cache=self.bypass_cache or request.bypass_cache
+            )
+        except Exception as e:
+            logger.error(f"Error generating pytest code for line {line}: {str(e)}")
+            self._finish(line, sha, error=f"Failed to generate pytest code: {str(e)}")
+            return
+
+        method = (request.intent_data.method or "GET").lower()
+        response = PytestGenerationResponse(
+            code=code,
+            filename=_filename(f"test_{method}_{request.intent_data.endpoint or 'unknown'}", ".py"),
+            test_count=validation.test_count,
+            validation=validation
+        )
+        file = None
+        if self.writer.out_dir is not None:
+            file = self.writer.write_file(line, response.filename, code)
+        self._finish(line, sha, result=response.model_dump(mode="json"), file=file)
+
+def _filename(name: str, suffix: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_") + suffix
+
+def _scenario_filename(response: EndpointResponse) -> str:
+    return _filename(f"{response.method.value.lower()}_{response.endpoint}", ".json")
\ No newline at end of file
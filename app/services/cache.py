@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("cache")
+
+T = TypeVar("T")
+
+# Short, so a write lock held by another worker is given up on quickly
+_BUSY_TIMEOUT_SECONDS = 0.5
+
+class ResponseCache:
+    """
+    Content-addressed cache for LLM responses.
+
+    Entries are keyed by a hash of the rendered prompt, model name and
+    generation config. Lookups go to an in-process LRU first and then to an
+    optional SQLite tier that survives restarts. SQLite I/O runs in a worker
+    thread so it never blocks the event loop; the SQLite tier holds at most
+    `max_db_entries` rows, and expired rows are pruned on write.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: int = 86400,
+        db_path: Optional[Path] = None,
+        max_db_entries: int = 100_000
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_db_entries = max_db_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if db_path is not None:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), timeout=_BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_created_at ON llm_cache (created_at)")
+            self._db.commit()
+            logger.info(f"Response cache persisted to {db_path}")
+
+    @staticmethod
+    def make_key(prompt: str, model: str, generation_config: Dict[str, Any]) -> str:
+        """
+        Build the cache key for a generation call.
+
+        Args:
+            prompt: The rendered prompt
+            model: Model name
+            generation_config: Generation parameters sent to the model
+
+        Returns:
+            Hex SHA-256 digest identifying the call
+        """
+        payload = json.dumps(
+            {"prompt": prompt, "model": model, "config": generation_config},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            The cached response, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        row = await self._run_db(self._db_get, key) if self._db is not None else None
+        with self._lock:
+            if row is not None and now - row[1] <= self.ttl_seconds:
+                self._store_local(key, row[0], row[1])
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    async def set(self, key: str, value: str) -> None:
+        """
+        Store a response in every cache tier.
+
+        Args:
+            key: Cache key from make_key
+            value: Response text to cache
+        """
+        created_at = time.time()
+        with self._lock:
+            self._store_local(key, value, created_at)
+        if self._db is not None:
+            await self._run_db(self._db_set, key, value, created_at)
+
+    async def delete(self, key: str) -> None:
+        """
+        Remove an entry from every cache tier, e.g. when it failed to parse.
+
+        Args:
+            key: Cache key from make_key
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+        if self._db is not None:
+            await self._run_db(self._db_delete, key)
+
+    def clear(self) -> None:
+        """Drop all cached entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "persistent": self._db is not None
+            }
+
+    def _store_local(self, key: str, value: str, created_at: float) -> None:
+        self._entries[key] = (created_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _run_db(self, operation: Callable[..., T], *args: Any) -> Optional[T]:
+        """
+        Run a SQLite operation in a worker thread.
+
+        The persistent tier is best effort: while another process holds the
+        write lock past the busy timeout, reads count as misses and writes
+        are skipped rather than holding up the call.
+        """
+        try:
+            return await asyncio.to_thread(operation, *args)
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            logger.warning(f"Skipped persistent cache {operation.__name__.lstrip('_')}: {str(e)}")
+            return None
+
+    def _db_get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._db_lock:
+            return self._db.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _db_set(self, key: str, value: str, created_at: float) -> None:
+        # Expired and least recently written rows are pruned as new ones come in
+        with self._db_lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, value, created_at)
+                )
+                self._db.execute(
+                    "DELETE FROM llm_cache WHERE created_at < ?", (created_at - self.ttl_seconds,)
+                )
+                self._db.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    "SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_db_entries,)
+                )
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+
+    def _db_delete(self, key: str) -> None:
+        with self._db_lock:
+            self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._db.commit()
+
+response_cache = ResponseCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CACHE_TTL_SECONDS,
+    db_path=settings.CACHE_DB_PATH,
+    max_db_entries=settings.CACHE_DB_MAX_ENTRIES
+)
@@ -0,0 +1,345 @@
+import copy
+import json
+import random
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.schemas.playground import ScenarioType, TestScenario
+from app.utils.logger import get_logger
+
+logger = get_logger("data_generator")
+
+# Scenario types the rule engine can produce without an LLM
+LOCAL_SCENARIO_TYPES = {ScenarioType.POSITIVE, ScenarioType.NEGATIVE, ScenarioType.EDGE_CASE}
+
+_FORMAT_VALUES = {
+    "email": ["user@example.com", "jane.doe@example.org", "qa+test@example.net"],
+    "date": ["2024-01-01", "2023-06-15", "2025-12-31"],
+    "date-time": ["2024-01-01T00:00:00Z", "2023-06-15T12:30:00Z"],
+    "uuid": ["123e4567-e89b-12d3-a456-426614174000", "00000000-0000-4000-8000-000000000000"],
+    "uri": ["https://example.com", "https://example.org/resource"],
+    "ipv4": ["192.168.0.1", "10.0.0.1"]
+}
+_INVALID_FORMAT_VALUES = {
+    "email": "not-an-email",
+    "date": "2024-13-45",
+    "date-time": "yesterday",
+    "uuid": "not-a-uuid",
+    "uri": "not a uri",
+    "ipv4": "999.999.999.999"
+}
+_WRONG_TYPE_VALUES = {
+    "string": 12345,
+    "integer": "not-a-number",
+    "number": "not-a-number",
+    "boolean": "not-a-boolean",
+    "array": "not-an-array",
+    "object": "not-an-object"
+}
+_EXPECT_SUCCESS = "Request succeeds with a 2xx status and the created/returned resource reflects the input"
+_EXPECT_REJECTED = "Request is rejected with a 4xx validation error identifying '{field}'"
+
+def infer_schema(example: Any) -> Dict[str, Any]:
+    """
+    Infer a JSON schema from an example value.
+
+    Every key present in an example object is treated as required.
+
+    Args:
+        example: Example request body
+
+    Returns:
+        JSON schema describing the example
+    """
+    if isinstance(example, bool):
+        return {"type": "boolean", "example": example}
+    if isinstance(example, int):
+        return {"type": "integer", "example": example}
+    if isinstance(example, float):
+        return {"type": "number", "example": example}
+    if isinstance(example, str):
+        schema: Dict[str, Any] = {"type": "string", "example": example}
+        if "@" in example and "." in example.split("@")[-1]:
+            schema["format"] = "email"
+        return schema
+    if isinstance(example, list):
+        return {"type": "array", "items": infer_schema(example[0]) if example else {}}
+    if isinstance(example, dict):
+        return {
+            "type": "object",
+            "properties": {key: infer_schema(value) for key, value in example.items()},
+            "required": list(example.keys())
+        }
+    return {}
+
+class LocalScenarioGenerator:
+    """
+    Rule-based generator for structured test data.
+
+    Produces POSITIVE, NEGATIVE and EDGE_CASE scenarios from a request-body
+    JSON schema (or an example body) without calling the LLM. Output is
+    reproducible for a given seed.
+    """
+
+    def __init__(self, schema: Dict[str, Any], seed: Optional[int] = None):
+        self.schema = schema
+        self.rng = random.Random(settings.LOCAL_GENERATOR_SEED if seed is None else seed)
+        self._base: Any = None
+
+    @classmethod
+    def from_request(
+        cls,
+        request_schema: Optional[Dict[str, Any]] = None,
+        request_body: Optional[Dict[str, Any]] = None,
+        seed: Optional[int] = None
+    ) -> Optional["LocalScenarioGenerator"]:
+        """
+        Build a generator from a schema, falling back to an example body.
+
+        Returns:
+            A generator, or None if neither a schema nor an example is given
+        """
+        if request_schema:
+            return cls(request_schema, seed)
+        if request_body:
+            return cls(infer_schema(request_body), seed)
+        return None
+
+    def generate(self, scenario_types: List[ScenarioType]) -> List[TestScenario]:
+        """
+        Generate scenarios for the locally supported types.
+
+        Args:
+            scenario_types: Requested scenario types; unsupported ones are ignored
+
+        Returns:
+            List of TestScenario objects, at most LOCAL_MAX_SCENARIOS_PER_TYPE per type
+        """
+        builders = {
+            ScenarioType.POSITIVE: self._positive,
+            ScenarioType.NEGATIVE: self._negative,
+            ScenarioType.EDGE_CASE: self._edge_cases
+        }
+        self._base = self.valid_value(self.schema)
+        scenarios = []
+        for scenario_type in scenario_types:
+            if scenario_type not in builders:
+                continue
+            cases = builders[scenario_type]()
+            if len(cases) > settings.LOCAL_MAX_SCENARIOS_PER_TYPE:
+                cases = self.rng.sample(cases, settings.LOCAL_MAX_SCENARIOS_PER_TYPE)
+            scenarios.extend(
+                TestScenario(
+                    type=scenario_type,
+                    description=description,
+                    input=json.dumps(payload),
+                    expected_output=expected
+                )
+                for description, payload, expected in cases
+            )
+        return scenarios
+
+    # Valid values
+
+    def valid_value(self, schema: Dict[str, Any], required_only: bool = False) -> Any:
+        """Generate a value that satisfies the schema."""
+        if "example" in schema:
+            return copy.deepcopy(schema["example"])
+        if "default" in schema:
+            return copy.deepcopy(schema["default"])
+        if schema.get("enum"):
+            return self.rng.choice(schema["enum"])
+
+        schema_type = self._type(schema)
+        if schema_type == "object":
+            required = set(schema.get("required", []))
+            return {
+                name: self.valid_value(prop, required_only)
+                for name, prop in schema.get("properties", {}).items()
+                if not required_only or name in required
+            }
+        if schema_type == "array":
+            count = max(schema.get("minItems", 1), 1)
+            return [self.valid_value(schema.get("items", {}), required_only) for _ in range(count)]
+        if schema_type == "integer":
+            low = schema.get("minimum", 1)
+            high = schema.get("maximum", max(low, 1) + 100)
+            return self.rng.randint(int(low), int(high))
+        if schema_type == "number":
+            low = schema.get("minimum", 0.0)
+            high = schema.get("maximum", low + 100.0)
+            return round(self.rng.uniform(low, high), 2)
+        if schema_type == "boolean":
+            return self.rng.choice([True, False])
+        if schema_type == "string":
+            if schema.get("format") in _FORMAT_VALUES:
+                return self.rng.choice(_FORMAT_VALUES[schema["format"]])
+            length = max(schema.get("minLength", 8), 1)
+            length = min(length, schema.get("maxLength", length))
+            return "".join(self.rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(length))
+        return None
+
+    # Scenario builders; each returns (description, payload, expected_output)
+
+    def _positive(self) -> List[Tuple[str, Any, str]]:
+        full = self._base
+        cases = [("Valid request with all fields populated", full, _EXPECT_SUCCESS)]
+        minimal = self.valid_value(self.schema, required_only=True)
+        if minimal != full:
+            cases.append(("Valid request with only required fields", minimal, _EXPECT_SUCCESS))
+        for path, field_schema in self._fields():
+            for value in field_schema.get("enum", [])[1:]:
+                cases.append((
+                    f"Valid request with '{path}' set to enum value {value!r}",
+                    self._with(full, path, value),
+                    _EXPECT_SUCCESS
+                ))
+        return cases
+
+    def _negative(self) -> List[Tuple[str, Any, str]]:
+        base = self._base
+        cases: List[Tuple[str, Any, str]] = []
+        # Without required fields an empty body is valid (it is the minimal positive case)
+        if self._type(self.schema) == "object" and self.schema.get("required"):
+            cases.append(("Empty request body", {}, "Request is rejected with a 4xx validation error"))
+
+        for path, field_schema in self._fields():
+            rejected = _EXPECT_REJECTED.format(field=path)
+            if field_schema.get("_required"):
+                cases.append((f"Missing required field '{path}'", self._without(base, path), rejected))
+            field_type = self._type(field_schema)
+            if field_type in _WRONG_TYPE_VALUES:
+                cases.append((
+                    f"Wrong type for '{path}' (expected {field_type})",
+                    self._with(base, path, _WRONG_TYPE_VALUES[field_type]),
+                    rejected
+                ))
+            if field_schema.get("enum"):
+                cases.append((
+                    f"Value for '{path}' outside the allowed enum",
+                    self._with(base, path, "__invalid_enum__"),
+                    rejected
+                ))
+            if field_schema.get("format") in _INVALID_FORMAT_VALUES:
+                cases.append((
+                    f"Invalid {field_schema['format']} format for '{path}'",
+                    self._with(base, path, _INVALID_FORMAT_VALUES[field_schema["format"]]),
+                    rejected
+                ))
+            if field_type == "string" and "maxLength" in field_schema:
+                cases.append((
+                    f"'{path}' one character longer than maxLength {field_schema['maxLength']}",
+                    self._with(base, path, "a" * (field_schema["maxLength"] + 1)),
+                    rejected
+                ))
+            if field_type in ("integer", "number"):
+                if "minimum" in field_schema:
+                    cases.append((
+                        f"'{path}' below minimum {field_schema['minimum']}",
+                        self._with(base, path, field_schema["minimum"] - 1),
+                        rejected
+                    ))
+                if "maximum" in field_schema:
+                    cases.append((
+                        f"'{path}' above maximum {field_schema['maximum']}",
+                        self._with(base, path, field_schema["maximum"] + 1),
+                        rejected
+                    ))
+        return cases
+
+    def _edge_cases(self) -> List[Tuple[str, Any, str]]:
+        base = self._base
+        handled = "Request is handled gracefully: accepted if the value is within constraints, otherwise rejected with a 4xx error (never a 5xx)"
+        cases: List[Tuple[str, Any, str]] = []
+
+        for path, field_schema in self._fields():
+            field_type = self._type(field_schema)
+            if field_type == "string" and not field_schema.get("enum"):
+                if "minLength" in field_schema:
+                    cases.append((
+                        f"'{path}' at minLength {field_schema['minLength']}",
+                        self._with(base, path, "a" * field_schema["minLength"]),
+                        _EXPECT_SUCCESS
+                    ))
+                if "maxLength" in field_schema:
+                    cases.append((
+                        f"'{path}' at maxLength {field_schema['maxLength']}",
+                        self._with(base, path, "a" * field_schema["maxLength"]),
+                        _EXPECT_SUCCESS
+                    ))
+                else:
+                    cases.append((
+                        f"Oversized string ({settings.LOCAL_OVERSIZED_STRING_LENGTH} chars) for '{path}'",
+                        self._with(base, path, "a" * settings.LOCAL_OVERSIZED_STRING_LENGTH),
+                        handled
+                    ))
+                cases.append((f"Empty string for '{path}'", self._with(base, path, ""), handled))
+                cases.append((f"Unicode and special characters in '{path}'", self._with(base, path, "Zoë 测试 ' \" <>&"), handled))
+            elif field_type in ("integer", "number"):
+                for bound in ("minimum", "maximum"):
+                    if bound in field_schema:
+                        cases.append((
+                            f"'{path}' at {bound} {field_schema[bound]}",
+                            self._with(base, path, field_schema[bound]),
+                            _EXPECT_SUCCESS
+                        ))
+                if "minimum" not in field_schema:
+                    cases.append((f"Zero for '{path}'", self._with(base, path, 0), handled))
+                    cases.append((f"Negative value for '{path}'", self._with(base, path, -1), handled))
+                if "maximum" not in field_schema:
+                    cases.append((f"Very large value for '{path}'", self._with(base, path, 2 ** 63), handled))
+            elif field_type == "array":
+                cases.append((f"Empty array for '{path}'", self._with(base, path, []), handled))
+            if not field_schema.get("_required"):
+                cases.append((f"Null value for optional field '{path}'", self._with(base, path, None), handled))
+        return cases
+
+    # Helpers
+
+    def _fields(self, schema: Optional[Dict[str, Any]] = None, prefix: str = "") -> List[Tuple[str, Dict[str, Any]]]:
+        """Flatten object properties into (dotted path, schema) pairs."""
+        schema = self.schema if schema is None else schema
+        if self._type(schema) != "object":
+            return []
+        required = set(schema.get("required", []))
+        fields = []
+        for name, prop in schema.get("properties", {}).items():
+            path = f"{prefix}{name}"
+            fields.append((path, dict(prop, _required=name in required)))
+            fields.extend(self._fields(prop, f"{path}."))
+        return fields
+
+    @staticmethod
+    def _type(schema: Dict[str, Any]) -> Optional[str]:
+        if "type" in schema:
+            schema_type = schema["type"]
+            if isinstance(schema_type, list):
+                # OpenAPI 3.1 lists the types, e.g. ["string", "null"]
+                return next((t for t in schema_type if t != "null"), None)
+            return schema_type
+        if "properties" in schema:
+            return "object"
+        return None
+
+    @staticmethod
+    def _with(payload: Any, path: str, value: Any) -> Any:
+        return LocalScenarioGenerator._replace(payload, path.split("."), value, remove=False)
+
+    @staticmethod
+    def _without(payload: Any, path: str) -> Any:
+        return LocalScenarioGenerator._replace(payload, path.split("."), None, remove=True)
+
+    @staticmethod
+    def _replace(payload: Any, parts: List[str], value: Any, remove: bool) -> Any:
+        # Copy only the dicts along the path; untouched branches are shared
+        if not isinstance(payload, dict):
+            return payload
+        head, rest = parts[0], parts[1:]
+        updated = dict(payload)
+        if rest:
+            if head in payload:
+                updated[head] = LocalScenarioGenerator._replace(payload[head], rest, value, remove)
+        elif remove:
+            updated.pop(head, None)
+        else:
+            updated[head] = value
+        return updated
@@ -0,0 +1,477 @@
+import csv
+import io
+import json
+import math
+import random
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from app.core.config import settings
+from app.schemas.dataset import ConstraintType, DatasetFormat, Distribution, FieldSpec, FieldType, GeneratorSpec
+from app.utils.logger import get_logger
+from app.utils.metrics import Counter, current_route
+
+logger = get_logger("dataset_engine")
+
+DATASET_ROWS = Counter(
+    "dataset_rows_total",
+    "Synthetic dataset records written",
+    ("route", "format")
+)
+
+MEDIA_TYPES = {
+    DatasetFormat.JSONL: "application/x-ndjson",
+    DatasetFormat.CSV: "text/csv",
+    DatasetFormat.PARQUET: "application/vnd.apache.parquet"
+}
+
+_ALPHABET = b"abcdefghijklmnopqrstuvwxyz0123456789"
+# Maps every byte onto the alphabet so one randbytes() call yields a chunk's characters
+_CHAR_TABLE = bytes(_ALPHABET[i % len(_ALPHABET)] for i in range(256))
+_WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+    "et dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip "
+    "ex ea commodo consequat duis aute irure in reprehenderit voluptate velit esse cillum fugiat nulla"
+).split()
+_FIRST_NAMES = (
+    "james mary john patricia robert jennifer michael linda david elizabeth william barbara richard susan "
+    "joseph jessica thomas sarah charles karen wei yuki amara diego fatima ivan priya lucas sofia omar"
+).split()
+_LAST_NAMES = (
+    "smith johnson williams brown jones garcia miller davis rodriguez martinez hernandez lopez wilson "
+    "anderson thomas taylor moore jackson martin lee perez thompson white harris clark lewis walker"
+).split()
+_EMAIL_DOMAINS = ["example.com", "example.org", "example.net", "test.example.com"]
+_UUID_VERSION = bytes((b & 0x0F) | 0x40 for b in range(256))
+_UUID_VARIANT = bytes((b & 0x3F) | 0x80 for b in range(256))
+
+class DatasetEngine:
+    """
+    Expands a generator spec into records locally, without calling the LLM.
+
+    Records are produced column by column in chunks of `chunk_rows`, so
+    memory stays bounded however many rows are requested. Every field of
+    every chunk draws from its own RNG seeded with (seed, chunk, field),
+    so the same spec, seed, row count and chunk size always give the same
+    data, and adding a field doesn't change the values of the others.
+    """
+
+    def __init__(self, spec: GeneratorSpec, seed: int = 0, chunk_rows: Optional[int] = None):
+        self.spec = spec
+        self.seed = seed
+        self.chunk_rows = max(chunk_rows or settings.DATASET_CHUNK_ROWS, 1)
+        self.names = [field.name for field in spec.fields]
+        # Fields that can hold None; the others are encoded without null checks
+        self.nullable = {field.name for field in spec.fields if field.null_rate}
+        for constraint in spec.constraints:
+            if constraint.type == ConstraintType.NULL_UNLESS:
+                self.nullable.update(constraint.fields)
+
+    def iter_chunks(self, rows: int) -> Iterator[Dict[str, List[Any]]]:
+        """Yield chunks of at most `chunk_rows` records as field name -> column of values."""
+        for index, start in enumerate(range(0, rows, self.chunk_rows)):
+            yield self.generate_chunk(index, start, min(self.chunk_rows, rows - start))
+
+    def generate_chunk(self, index: int, start: int, count: int) -> Dict[str, List[Any]]:
+        """
+        Generate one chunk of records.
+
+        Args:
+            index: Chunk number, part of every field's seed
+            start: Row number of the first record (used by sequences)
+            count: Number of records
+
+        Returns:
+            Field name -> list of `count` values
+        """
+        columns: Dict[str, List[Any]] = {}
+        for field in self.spec.fields:
+            rng = random.Random(f"{self.seed}:{index}:{field.name}")
+            columns[field.name] = _GENERATORS[field.type](field, rng, start, count)
+
+        for constraint in self.spec.constraints:
+            if constraint.type == ConstraintType.ORDERED:
+                _apply_ordered(columns, constraint.fields)
+
+        for field in self.spec.fields:
+            if field.null_rate:
+                rng = random.Random(f"{self.seed}:{index}:{field.name}:null")
+                rate = field.null_rate
+                columns[field.name] = [None if rng.random() < rate else v for v in columns[field.name]]
+
+        # After null_rate, so a nulled condition field also nulls its dependents
+        for constraint in self.spec.constraints:
+            if constraint.type == ConstraintType.NULL_UNLESS:
+                keep = [v in constraint.when_values for v in columns[constraint.when_field]]
+                for name in constraint.fields:
+                    columns[name] = [v if k else None for v, k in zip(columns[name], keep)]
+        return columns
+
+def stream_dataset(
+    spec: GeneratorSpec,
+    rows: int,
+    fmt: DatasetFormat,
+    seed: int = 0
+) -> Iterator[bytes]:
+    """
+    Generate `rows` records and serialize them chunk by chunk.
+
+    Returns a plain (sync) iterator: Starlette runs it in its threadpool,
+    so the CPU-bound work doesn't block the event loop.
+
+    Args:
+        spec: Generator spec
+        rows: Number of records
+        fmt: Output format
+        seed: RNG seed
+
+    Returns:
+        Iterator of encoded output, one piece per chunk
+    """
+    engine = DatasetEngine(spec, seed)
+    writer = {
+        DatasetFormat.JSONL: _write_jsonl,
+        DatasetFormat.CSV: _write_csv,
+        DatasetFormat.PARQUET: _write_parquet
+    }[fmt]
+    # Read now: the iterator runs in a worker thread without the request's context
+    route = current_route.get()
+
+    def pieces() -> Iterator[bytes]:
+        logger.info(f"Generating {rows} {fmt.value} records with {len(spec.fields)} fields (seed={seed})")
+        for piece, written in writer(engine, rows):
+            if written:
+                DATASET_ROWS.inc(written, route=route, format=fmt.value)
+            yield piece
+
+    return pieces()
+
+def check_format(fmt: DatasetFormat) -> None:
+    """Raise ValueError when the output format needs a library that isn't installed."""
+    if fmt == DatasetFormat.PARQUET:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet output requires the optional 'pyarrow' package")
+
+# Column generators: (field, rng, first row number, count) -> values
+
+def _bounds(field: FieldSpec, default_min: float, default_max: float):
+    low = field.minimum if field.minimum is not None else default_min
+    high = field.maximum if field.maximum is not None else max(default_max, low)
+    return low, high
+
+def _draw_numbers(field: FieldSpec, rng: random.Random, count: int, low: float, high: float) -> List[float]:
+    if field.distribution == Distribution.UNIFORM:
+        r, span = rng.random, high - low
+        return [low + r() * span for _ in range(count)]
+    mean = field.mean if field.mean is not None else (low + high) / 2
+    stddev = field.stddev if field.stddev is not None else (high - low) / 6 or 1.0
+    if field.distribution == Distribution.NORMAL:
+        gauss = rng.gauss
+        values = [gauss(mean, stddev) for _ in range(count)]
+    else:
+        # mean/stddev describe the values themselves, not their logarithm
+        mean = mean if mean > 0 else 1.0
+        sigma = math.sqrt(math.log(1 + (stddev / mean) ** 2))
+        mu = math.log(mean) - sigma ** 2 / 2
+        exp, gauss = math.exp, rng.gauss
+        values = [exp(gauss(mu, sigma)) for _ in range(count)]
+    if field.minimum is not None or field.maximum is not None:
+        lo = field.minimum if field.minimum is not None else -math.inf
+        hi = field.maximum if field.maximum is not None else math.inf
+        values = [lo if v < lo else hi if v > hi else v for v in values]
+    return values
+
+def _integers(field: FieldSpec, rng: random.Random, start: int, count: int) -> List[int]:
+    low, high = _bounds(field, 0, 1000)
+    low, high = math.ceil(low), math.floor(high)
+    if field.distribution == Distribution.UNIFORM:
+        # Draw over [low, high + 1) and truncate for an even spread over the integers
+        r, span = rng.random, high - low + 1
+        return [int(low + r() * span) for _ in range(count)]
+    return [int(round(v)) for v in _draw_numbers(field, rng, count, low, high)]
+
+def _numbers(field: FieldSpec, rng: random.Random, start: int, count: int) -> List[float]:
+    low, high = _bounds(field, 0.0, 1000.0)
+    decimals = field.decimals
+    return [round(v, decimals) for v in _draw_numbers(field, rng, count, low, high)]
+
+def _booleans(field: FieldSpec, rng: random.Random, start: int, count: int) -> List[bool]:
+    r, p = rng.random, field.probability
+    return [r() < p for _ in range(count)]
+
+def _choices(field: FieldSpec, rng: random.Random, start: int, count: int) -> List[Any]:
+    return rng.choices(field.values, weights=field.weights, k=count)
+
+def _lengths(field: FieldSpec, rng: random.Random, count: int) -> List[int]:
+    low, high = field.min_length, field.max_length
+    if low == high:
+        return [low] * count
+    r, span = rng.random, high - low + 1
+    return [int(low + r() * span) for _ in range(count)]
+
+def _strings(field: FieldSpec, rng: random.Random, start: int, count: int) -> List[str]:
+    lengths = _lengths(field, rng, count)
+    chars = rng.randbytes(sum(lengths)).translate(_CHAR_TABLE).decode("ascii")
+    values, offset, prefix = [], 0, field.prefix
+    for length in lengths:
+        values.append(prefix + chars[offset:offset + length])
+        offset += length
+    return values
+
+def _texts(field: FieldSpec, rng: random.Random, start: int, count: int) -> List[str]:
+    lengths = _lengths(field, rng, count)
+    words = rng.choices(_WORDS, k=sum(lengths))
+    values, offset, prefix = [], 0, field.prefix
+    for length in lengths:
+        values.append(prefix + " ".join(words[offset:offset + length]))
+        offset += length
+    return values
+
+def _emails(field: FieldSpec, rng: random.Random, start: int, count: int) -> List[str]:
+    first = rng.choices(_FIRST_NAMES, k=count)
+    last = rng.choices(_LAST_NAMES, k=count)
+    domains = rng.choices(field.values or _EMAIL_DOMAINS, weights=field.weights, k=count)
+    r = rng.random
+    return [f"{f}.{l}{int(r() * 1000)}@{d}" for f, l, d in zip(first, last, domains)]
+
+def _uuids(field: FieldSpec, rng: random.Random, start: int, count: int) -> List[str]:
+    data = bytearray(rng.randbytes(16 * count))
+    # Version 4, RFC 4122 variant, set for every value at once
+    data[6::16] = data[6::16].translate(_UUID_VERSION)
+    data[8::16] = data[8::16].translate(_UUID_VARIANT)
+    digits = data.hex()
+    return [
+        f"{digits[i:i + 8]}-{digits[i + 8:i + 12]}-{digits[i + 12:i + 16]}-{digits[i + 16:i + 20]}-{digits[i + 20:i + 32]}"
+        for i in range(0, 32 * count, 32)
+    ]
+
+def _time_range(field: FieldSpec):
+    start, end = datetime.fromisoformat(field.start), datetime.fromisoformat(field.end)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    return start, end
+
+def _dates(field: FieldSpec, rng: random.Random, start: int, count: int) -> List[str]:
+    first, last = (moment.date().toordinal() for moment in _time_range(field))
+    r, span = rng.random, last - first + 1
+    ordinals = [int(first + r() * span) for _ in range(count)]
+    names = {ordinal: date.fromordinal(ordinal).isoformat() for ordinal in set(ordinals)}
+    return [names[ordinal] for ordinal in ordinals]
+
+def _datetimes(field: FieldSpec, rng: random.Random, start: int, count: int) -> List[str]:
+    first, last = (int(moment.timestamp()) for moment in _time_range(field))
+    r, span = rng.random, last - first + 1
+    seconds = [int(first + r() * span) for _ in range(count)]
+    # Strings are assembled from cached day, hour and minute:second parts;
+    # formatting a datetime per value is several times slower
+    days: Dict[int, str] = {}
+    hours, minutes_seconds = _clock_parts()
+    values = []
+    for second in seconds:
+        day, rest = divmod(second, 86400)
+        name = days.get(day)
+        if name is None:
+            name = days[day] = date.fromordinal(day + 719163).isoformat() + "T"  # 719163 = 1970-01-01
+        hour, rest = divmod(rest, 3600)
+        values.append(name + hours[hour] + minutes_seconds[rest])
+    return values
+
+@lru_cache(maxsize=1)
+def _clock_parts():
+    """("HH:" for each hour, "MM:SSZ" for each second of an hour)."""
+    return (
+        [f"{hour:02d}:" for hour in range(24)],
+        [f"{second // 60:02d}:{second % 60:02d}Z" for second in range(3600)]
+    )
+
+def _sequences(field: FieldSpec, rng: random.Random, start: int, count: int) -> List[int]:
+    first = int(field.minimum if field.minimum is not None else 1) + start
+    return list(range(first, first + count))
+
+def _arrays(field: FieldSpec, rng: random.Random, start: int, count: int) -> List[List[Any]]:
+    lengths = _lengths(field, rng, count)
+    items = rng.choices(field.values, weights=field.weights, k=sum(lengths))
+    values, offset = [], 0
+    for length in lengths:
+        values.append(items[offset:offset + length])
+        offset += length
+    return values
+
+_GENERATORS: Dict[FieldType, Callable[[FieldSpec, random.Random, int, int], List[Any]]] = {
+    FieldType.INTEGER: _integers,
+    FieldType.NUMBER: _numbers,
+    FieldType.BOOLEAN: _booleans,
+    FieldType.ENUM: _choices,
+    FieldType.STRING: _strings,
+    FieldType.TEXT: _texts,
+    FieldType.EMAIL: _emails,
+    FieldType.UUID: _uuids,
+    FieldType.DATE: _dates,
+    FieldType.DATETIME: _datetimes,
+    FieldType.SEQUENCE: _sequences,
+    FieldType.ARRAY: _arrays
+}
+
+def _apply_ordered(columns: Dict[str, List[Any]], names: List[str]) -> None:
+    """Sort each row's values across `names`, e.g. so created_at <= updated_at."""
+    rows = [sorted(values) for values in zip(*(columns[name] for name in names))]
+    for position, name in enumerate(names):
+        columns[name] = [row[position] for row in rows]
+
+# Writers: yield (encoded piece, records it contains)
+
+def _json_layout(names: List[str]) -> Tuple[List[int], List[str]]:
+    """
+    Plan the JSONL record: the order fields are written in and the literal text around them.
+
+    Dotted names become nested objects, with fields sharing a parent written
+    together: ["id", "address.city"] -> ([0, 1], ['{"id":', ',"address":{"city":', '}}\\n']).
+
+    Returns:
+        Tuple of (field positions in write order, fragments); fragment i
+        precedes the i-th written field and the last one closes the record
+    """
+    tree: Dict[str, Any] = {}
+    for position, name in enumerate(names):
+        node = tree
+        parts = name.split(".")
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = position
+
+    order: List[int] = []
+    fragments: List[str] = []
+    pending = "{"
+
+    def walk(node: Dict[str, Any]) -> None:
+        nonlocal pending
+        for number, (key, value) in enumerate(node.items()):
+            pending += ("," if number else "") + json.dumps(key) + ":"
+            if isinstance(value, dict):
+                pending += "{"
+                walk(value)
+                pending += "}"
+            else:
+                fragments.append(pending)
+                order.append(value)
+                pending = ""
+
+    walk(tree)
+    fragments.append(pending + "}\n")
+    return order, fragments
+
+def _json_column(field: FieldSpec, values: List[Any], nullable: bool) -> List[str]:
+    """Encode a column of values as JSON text, using the cheapest encoder for its type."""
+    if field.type in (FieldType.ENUM, FieldType.ARRAY):
+        try:
+            # Each choice is encoded once and looked up
+            encoded = {value: _dumps(value) for value in field.values}
+            encoded[None] = "null"
+            if field.type == FieldType.ENUM:
+                return [encoded[v] for v in values]
+            return ["null" if v is None else "[" + ",".join([encoded[i] for i in v]) + "]" for v in values]
+        except TypeError:  # Unhashable choices (objects or lists)
+            return [_dumps(v) for v in values]
+    if field.type == FieldType.BOOLEAN:
+        return ["null" if v is None else "true" if v else "false" for v in values]
+    encode = {
+        FieldType.INTEGER: str,
+        FieldType.SEQUENCE: str,
+        FieldType.NUMBER: repr
+    }.get(field.type, encode_basestring_ascii)
+    if not nullable:
+        return list(map(encode, values))
+    return ["null" if v is None else encode(v) for v in values]
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+def _write_jsonl(engine: DatasetEngine, rows: int) -> Iterator[tuple]:
+    order, fragments = _json_layout(engine.names)
+    fields = [engine.spec.fields[position] for position in order]
+    width = 2 * len(fields) + 1
+    for chunk in engine.iter_chunks(rows):
+        count = len(chunk[engine.names[0]])
+        # Interleave fragments and encoded columns with slice assignment, which
+        # runs in C, then join the whole chunk at once
+        parts: List[str] = [""] * (count * width)
+        for slot, field in enumerate(fields):
+            parts[2 * slot::width] = [fragments[slot]] * count
+            parts[2 * slot + 1::width] = _json_column(
+                field, chunk[field.name], field.name in engine.nullable
+            )
+        parts[width - 1::width] = [fragments[-1]] * count
+        yield "".join(parts).encode("utf-8"), count
+
+def _csv_column(field: FieldSpec, values: List[Any]) -> List[Any]:
+    if field.type == FieldType.BOOLEAN:
+        return ["" if v is None else "true" if v else "false" for v in values]
+    if field.type == FieldType.ARRAY or (field.type == FieldType.ENUM and not all(
+        isinstance(v, (str, int, float)) for v in field.values
+    )):
+        return [None if v is None else _dumps(v) for v in values]
+    return values
+
+def _write_csv(engine: DatasetEngine, rows: int) -> Iterator[tuple]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(engine.names)
+    for chunk in engine.iter_chunks(rows):
+        columns = [_csv_column(field, chunk[field.name]) for field in engine.spec.fields]
+        writer.writerows(zip(*columns))
+        yield buffer.getvalue().encode("utf-8"), len(columns[0])
+        buffer.seek(0)
+        buffer.truncate()
+
+class _ByteSink(io.RawIOBase):
+    """Write-only file object that collects bytes until drained."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+def _arrow_type(field: FieldSpec, pa: Any) -> Any:
+    if field.type in (FieldType.INTEGER, FieldType.SEQUENCE):
+        return pa.int64()
+    if field.type == FieldType.NUMBER:
+        return pa.float64()
+    if field.type == FieldType.BOOLEAN:
+        return pa.bool_()
+    if field.type == FieldType.ENUM:
+        return pa.array(field.values).type
+    if field.type == FieldType.ARRAY:
+        return pa.list_(pa.array(field.values).type)
+    return pa.string()
+
+def _write_parquet(engine: DatasetEngine, rows: int) -> Iterator[tuple]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Explicit types, so a chunk whose column happens to be all null still matches
+    schema = pa.schema([(field.name, _arrow_type(field, pa)) for field in engine.spec.fields])
+    sink = _ByteSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in engine.iter_chunks(rows):
+            writer.write_table(pa.table(chunk, schema=schema))  # One row group per chunk
+            yield sink.drain(), len(chunk[engine.names[0]])
+    yield sink.drain(), 0
\ No newline at end of file
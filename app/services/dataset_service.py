@@ -0,0 +1,119 @@
+import re
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from app.schemas.dataset import DatasetSpecRequest, FieldSpec, FieldType, GeneratorSpec
+from app.services.llm_service import llm_service
+from app.utils.logger import get_logger
+
+logger = get_logger("dataset_service")
+
+_UUID_RE = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_DATETIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+
+class DatasetService:
+    """
+    Designs generator specs for the synthetic dataset engine.
+
+    The LLM is asked once per endpoint for a spec (and the answer is cached
+    like any other prompt). If it fails or returns an invalid spec, one is
+    inferred locally from the example record instead.
+    """
+
+    async def design_spec(self, request: DatasetSpecRequest) -> Tuple[GeneratorSpec, str]:
+        """
+        Get a generator spec for an endpoint.
+
+        Args:
+            request: Endpoint details and example record
+
+        Returns:
+            Tuple of (spec, source): source is "llm", or "example" when the
+            spec was inferred from request_body
+
+        Raises:
+            ValueError: If the LLM fails and there is no example to fall back on
+        """
+        try:
+            raw = await llm_service.generate_dataset_spec(
+                endpoint=request.endpoint,
+                method=request.method.value,
+                description=request.description,
+                request_body=request.request_body,
+                bypass_cache=request.bypass_cache
+            )
+            return GeneratorSpec.model_validate(raw), "llm"
+        except Exception as e:
+            if not request.request_body:
+                raise ValueError(f"Could not design a dataset spec: {str(e)}")
+            logger.warning(f"Falling back to a spec inferred from the example record: {str(e)}")
+            return self.spec_from_example(request.request_body), "example"
+
+    def spec_from_example(self, example: Dict[str, Any]) -> GeneratorSpec:
+        """
+        Infer a generator spec from an example record without the LLM.
+
+        Ranges are centred on the example values; strings that look like
+        emails, UUIDs, dates or timestamps get the matching type, and an
+        integer "id" becomes a sequence.
+        """
+        fields: List[FieldSpec] = []
+        self._collect_fields(example, "", fields)
+        if not fields:
+            raise ValueError("The example record has no fields")
+        return GeneratorSpec(fields=fields)
+
+    def _collect_fields(self, value: Dict[str, Any], prefix: str, fields: List[FieldSpec]) -> None:
+        for key, item in value.items():
+            name = f"{prefix}{key}"
+            if isinstance(item, dict) and item:
+                self._collect_fields(item, f"{name}.", fields)
+                continue
+            field = self._field_for(name, key, item)
+            if field is not None:
+                fields.append(field)
+
+    @staticmethod
+    def _field_for(name: str, key: str, value: Any) -> Optional[FieldSpec]:
+        if value is None:
+            return None
+        if isinstance(value, bool):
+            return FieldSpec(name=name, type=FieldType.BOOLEAN)
+        if isinstance(value, int):
+            if key.lower() == "id":
+                return FieldSpec(name=name, type=FieldType.SEQUENCE, minimum=1)
+            high = max(abs(value) * 2, 100)
+            return FieldSpec(name=name, type=FieldType.INTEGER, minimum=min(value, 0), maximum=high)
+        if isinstance(value, float):
+            high = max(abs(value) * 2, 100.0)
+            return FieldSpec(name=name, type=FieldType.NUMBER, minimum=min(value, 0.0), maximum=high)
+        if isinstance(value, list):
+            items = [item for item in value if item is not None]
+            if not items:
+                return None
+            return FieldSpec(name=name, type=FieldType.ARRAY, values=items, min_length=0, max_length=len(items))
+        if isinstance(value, dict):
+            return None
+        text = str(value)
+        if "@" in text and "." in text.split("@")[-1]:
+            return FieldSpec(name=name, type=FieldType.EMAIL)
+        if _UUID_RE.match(text):
+            return FieldSpec(name=name, type=FieldType.UUID)
+        if _DATE_RE.match(text) and _parses(date.fromisoformat, text):
+            return FieldSpec(name=name, type=FieldType.DATE)
+        if _DATETIME_RE.match(text) and _parses(datetime.fromisoformat, text):
+            return FieldSpec(name=name, type=FieldType.DATETIME)
+        if " " in text.strip():
+            words = len(text.split())
+            return FieldSpec(name=name, type=FieldType.TEXT, min_length=max(words // 2, 1), max_length=words * 2)
+        return FieldSpec(name=name, type=FieldType.STRING, min_length=max(len(text) // 2, 1), max_length=max(len(text), 1) * 2)
+
+def _parses(parse: Any, text: str) -> bool:
+    try:
+        parse(text)
+        return True
+    except ValueError:
+        return False
+
+dataset_service = DatasetService()
\ No newline at end of file
@@ -0,0 +1,125 @@
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("fingerprint_store")
+
+class FingerprintStore(ABC):
+    """
+    Records which inputs each generated artifact was made from.
+
+    A record is a dict with namespace (usually the API title), kind
+    ("scenarios" or "pytest"), key (e.g. "POST /users"), fingerprint (hash
+    of the generation inputs), path (where the artifact was written) and
+    updated_at.
+    """
+
+    @abstractmethod
+    def get(self, namespace: str, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        """Return the record, or None if nothing was generated for it yet."""
+
+    @abstractmethod
+    def put(self, record: Dict[str, Any]) -> None:
+        """Insert or replace a record."""
+
+    @abstractmethod
+    def delete(self, namespace: str, kind: str, key: str) -> None:
+        """Remove a record."""
+
+    @abstractmethod
+    def list(self, namespace: str) -> List[Dict[str, Any]]:
+        """All records of a namespace."""
+
+class InMemoryFingerprintStore(FingerprintStore):
+    """Process-local store; every endpoint counts as changed after a restart."""
+
+    def __init__(self):
+        self._records: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get((namespace, kind, key))
+            return dict(record) if record else None
+
+    def put(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._records[(record["namespace"], record["kind"], record["key"])] = dict(record)
+
+    def delete(self, namespace: str, kind: str, key: str) -> None:
+        with self._lock:
+            self._records.pop((namespace, kind, key), None)
+
+    def list(self, namespace: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(record) for record in self._records.values() if record["namespace"] == namespace]
+
+class SQLiteFingerprintStore(FingerprintStore):
+    """Store backed by a local SQLite file, shared by workers and kept across restarts."""
+
+    _COLUMNS = ("namespace", "kind", "key", "fingerprint", "path", "updated_at")
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                namespace TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                path TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (namespace, kind, key)
+            )
+            """
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+        logger.info(f"Fingerprint store persisted to {db_path}")
+
+    def get(self, namespace: str, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM fingerprints WHERE namespace = ? AND kind = ? AND key = ?",
+                (namespace, kind, key)
+            ).fetchone()
+        return dict(zip(self._COLUMNS, row)) if row else None
+
+    def put(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO fingerprints ({', '.join(self._COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                tuple(record[column] for column in self._COLUMNS)
+            )
+            self._db.commit()
+
+    def delete(self, namespace: str, kind: str, key: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM fingerprints WHERE namespace = ? AND kind = ? AND key = ?",
+                (namespace, kind, key)
+            )
+            self._db.commit()
+
+    def list(self, namespace: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM fingerprints WHERE namespace = ? ORDER BY kind, key",
+                (namespace,)
+            ).fetchall()
+        return [dict(zip(self._COLUMNS, row)) for row in rows]
+
+def create_fingerprint_store() -> FingerprintStore:
+    """Build the fingerprint store selected by FINGERPRINT_STORE_BACKEND."""
+    if settings.FINGERPRINT_STORE_BACKEND == "memory":
+        return InMemoryFingerprintStore()
+    if settings.FINGERPRINT_STORE_BACKEND == "sqlite":
+        return SQLiteFingerprintStore(settings.FINGERPRINT_DB_PATH)
+    raise ValueError(f"Unknown FINGERPRINT_STORE_BACKEND: {settings.FINGERPRINT_STORE_BACKEND}")
\ No newline at end of file
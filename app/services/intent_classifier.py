@@ -0,0 +1,187 @@
+import re
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.schemas.chatbot import IntentClassification
+from app.schemas.playground import HTTPMethod
+from app.services.llm_service import llm_service
+from app.utils.json_parser import extract_json
+from app.utils.logger import get_logger
+from app.utils.metrics import Counter, stage
+
+logger = get_logger("intent_classifier")
+
+INTENTS = ("generate_tests", "generate_scenarios", "help", "greeting", "other")
+# Intents that need API details before anything can be generated
+DETAIL_INTENTS = {"generate_tests", "generate_scenarios"}
+
+_METHOD_PATH_RE = re.compile(r"\b(GET|POST|PUT|DELETE|PATCH)\b\s+(/[^\s,;\"'`]*)", re.IGNORECASE)
+_METHOD_RE = re.compile(r"\b(GET|POST|PUT|DELETE|PATCH)\b")
+_PATH_RE = re.compile(r"(?<![\w/:])(/[\w\-./{}:]*[\w}])")
+_WORD_RE = re.compile(r"[a-z]+")
+
+_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "generate_tests": {
+        "test": 2, "tests": 2, "pytest": 3, "unit": 1, "integration": 1,
+        "write": 1, "generate": 1, "create": 0.5, "cover": 1, "coverage": 1, "suite": 1
+    },
+    "generate_scenarios": {
+        "scenario": 3, "scenarios": 3, "cases": 1.5, "edge": 1.5, "negative": 1.5,
+        "positive": 1, "security": 1, "performance": 1, "data": 1
+    },
+    "help": {"help": 3, "how": 1, "what": 1, "explain": 1.5, "usage": 2, "can": 0.5, "do": 0.5},
+    "greeting": {"hi": 3, "hello": 3, "hey": 3, "thanks": 2, "thank": 2, "morning": 1, "afternoon": 1}
+}
+_PHRASES: Dict[str, Tuple[str, float]] = {
+    "test cases": ("generate_scenarios", 3),
+    "test data": ("generate_scenarios", 3),
+    "what can you do": ("help", 3)
+}
+
+INTENT_CLASSIFICATIONS = Counter(
+    "intent_classifications_total", "Chat messages classified, by tier and intent", ("tier", "intent")
+)
+
+def extract_endpoint(message: str) -> Tuple[Optional[str], Optional[HTTPMethod]]:
+    """
+    Pull an endpoint path and HTTP method out of free text.
+
+    "generate tests for POST /users" -> ("/users", HTTPMethod.POST)
+    """
+    match = _METHOD_PATH_RE.search(message)
+    if match:
+        return match.group(2).rstrip("."), HTTPMethod(match.group(1).upper())
+    path = _PATH_RE.search(message)
+    method = _METHOD_RE.search(message)
+    return (
+        path.group(1) if path else None,
+        HTTPMethod(method.group(1)) if method else None
+    )
+
+class IntentClassifier:
+    """
+    Tiered intent classification for chat messages.
+
+    Tier 1 scores keywords and extracts the endpoint and method with regexes,
+    answering locally when the best intent clearly wins. Only ambiguous
+    messages go to tier 2, the LLM. If the LLM fails, the local best guess
+    is used (tier "fallback").
+    """
+
+    def __init__(self):
+        self.tier_counts: Dict[str, int] = {"local": 0, "llm": 0, "fallback": 0}
+
+    async def classify(
+        self,
+        message: str,
+        context: Optional[Dict[str, str]] = None,
+        history: str = ""
+    ) -> Tuple[IntentClassification, str]:
+        """
+        Classify a message and extract its endpoint and method.
+
+        Args:
+            message: The user's message
+            context: Details remembered from earlier turns (e.g. last intent)
+            history: Rendered conversation history for the LLM tier
+
+        Returns:
+            Tuple of (classification, tier that produced it)
+        """
+        with stage("intent_local"):
+            endpoint, method = extract_endpoint(message)
+            intent, confident = self._score(message, endpoint is not None, context or {})
+
+        tier = "local"
+        if not confident and settings.INTENT_LLM_ENABLED:
+            try:
+                with stage("intent_llm"):
+                    llm_intent, llm_endpoint, llm_method = await self._classify_with_llm(message, history)
+                intent = llm_intent
+                endpoint = endpoint or llm_endpoint
+                method = method or llm_method
+                tier = "llm"
+            except Exception as e:
+                logger.warning(f"LLM intent classification failed, using local guess: {str(e)}")
+                tier = "fallback"
+
+        self.tier_counts[tier] += 1
+        INTENT_CLASSIFICATIONS.inc(tier=tier, intent=intent)
+        return IntentClassification(
+            intent=intent,
+            endpoint=endpoint,
+            method=method,
+            requires_details=intent in DETAIL_INTENTS
+        ), tier
+
+    def stats(self) -> Dict[str, object]:
+        """How often each tier answered."""
+        total = sum(self.tier_counts.values())
+        return {
+            **self.tier_counts,
+            "total": total,
+            "local_ratio": self.tier_counts["local"] / total if total else 0.0
+        }
+
+    @staticmethod
+    def _score(message: str, has_endpoint: bool, context: Dict[str, str]) -> Tuple[str, bool]:
+        text = message.lower()
+        scores = {intent: 0.0 for intent in _KEYWORDS}
+        for word in _WORD_RE.findall(text):
+            for intent, keywords in _KEYWORDS.items():
+                scores[intent] += keywords.get(word, 0)
+        for phrase, (intent, weight) in _PHRASES.items():
+            if phrase in text:
+                scores[intent] += weight
+        if has_endpoint:
+            scores["generate_tests"] += 1
+            # A bare endpoint usually answers the assistant's request for details
+            if context.get("intent") in DETAIL_INTENTS:
+                scores[context["intent"]] += 1.5
+
+        ranked: List[Tuple[str, float]] = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        (best, top), (_, runner_up) = ranked[0], ranked[1]
+        if top == 0:
+            return "other", False
+        confident = top >= settings.INTENT_MIN_SCORE and top - runner_up >= settings.INTENT_MIN_MARGIN
+        return best, confident
+
+    async def _classify_with_llm(
+        self,
+        message: str,
+        history: str
+    ) -> Tuple[str, Optional[str], Optional[HTTPMethod]]:
+        history_section = f"\nConversation so far:\n{history}\n" if history else ""
+        prompt = f"""Classify the latest message sent to an API test generation assistant.
+{history_section}
+Latest message: {message}
+
+Intents:
+- generate_tests: wants pytest code for an API endpoint
+- generate_scenarios: wants test scenarios or test data for an API endpoint
+- help: asks what the assistant can do or how to use it
+- greeting: small talk, greetings or thanks
+- other: anything else
+
+Respond with only a JSON object:
+{{"intent": "<intent>", "endpoint": "<path or null>", "method": "<HTTP method or null>"}}"""
+
+        response = await llm_service.generate_content_async(prompt, temperature=0.0, max_tokens=100)
+        data = extract_json(response, "{")
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object")
+
+        intent = str(data.get("intent", "other")).strip().lower()
+        if intent not in INTENTS:
+            intent = "other"
+        endpoint = data.get("endpoint")
+        if not isinstance(endpoint, str) or endpoint.lower() in ("", "null", "none"):
+            endpoint = None
+        method = None
+        if data.get("method"):
+            try:
+                method = HTTPMethod(str(data["method"]).upper())
+            except ValueError:
+                pass
+        return intent, endpoint, method
+
+intent_classifier = IntentClassifier()
\ No newline at end of file
@@ -0,0 +1,182 @@
+import asyncio
+import os
+import socket
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.schemas.jobs import JobRequest, JobStatus
+from app.schemas.playground import EndpointRequest, EndpointResponse, HTTPMethod
+from app.services.job_store import JobStore, create_job_store
+from app.services.scenario_service import generate_endpoint_scenarios
+from app.utils.logger import get_logger
+
+logger = get_logger("job_manager")
+
+_UNFINISHED = (JobStatus.PENDING.value, JobStatus.RUNNING.value)
+
+class JobManager:
+    """
+    Runs large scenario-generation batches in the background.
+
+    Each job is drained by a fixed pool of worker coroutines; a process-wide
+    semaphore caps the number of endpoints in flight across all jobs. Results
+    are written to the job store as they complete, so they can be polled
+    incrementally and survive a restart when the store is persistent.
+
+    When several server processes share a store, each job is leased to one
+    of them. A background sweep renews this process's leases, stops jobs
+    cancelled from another process, and takes over jobs whose owner stopped
+    renewing (e.g. a crashed worker).
+    """
+
+    def __init__(self, store: JobStore):
+        self.store = store
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._semaphore = asyncio.Semaphore(settings.JOB_WORKER_CONCURRENCY)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def submit(self, request: JobRequest) -> str:
+        """
+        Create a job and start processing it in the background.
+
+        Args:
+            request: JobRequest with the endpoints to process
+
+        Returns:
+            The new job id
+        """
+        job_id = uuid.uuid4().hex
+        self.store.create_job(
+            job_id,
+            [endpoint.model_dump(mode="json") for endpoint in request.endpoints],
+            {"bypass_cache": request.bypass_cache}
+        )
+        logger.info(f"Created job {job_id} with {len(request.endpoints)} endpoints")
+        self.store.claim_job(job_id, self.owner, settings.JOB_LEASE_SECONDS)
+        self._start(job_id)
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job record, or None if it doesn't exist."""
+        return self.store.get_job(job_id)
+
+    def get_results(self, job_id: str, since: int = 0, limit: int = 100) -> List[Tuple[int, int, Dict[str, Any]]]:
+        """Return results completed after the given sequence cursor."""
+        return self.store.get_results(job_id, since, limit)
+
+    async def cancel(self, job_id: str) -> None:
+        """
+        Stop a job; results completed so far are kept.
+
+        A job running in another process stops taking items at once and is
+        stopped at that process's next lease renewal. Finished jobs keep
+        their status.
+        """
+        self.store.transition_status(job_id, _UNFINISHED, JobStatus.CANCELLED.value)
+        task = self._tasks.pop(job_id, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        logger.info(f"Cancelled job {job_id}")
+
+    async def start(self) -> None:
+        """Resume unowned jobs (e.g. left unfinished by a previous run) and start the lease sweep."""
+        self._claim_unowned()
+        self._sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self) -> None:
+        """Stop all workers. Unfinished jobs are released and resume on the next start."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+        job_ids = list(self._tasks)
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job_id in job_ids:
+            self.store.release_job(job_id, self.owner)
+
+    def _claim_unowned(self) -> None:
+        for job_id in self.store.unfinished_jobs():
+            if job_id not in self._tasks and self.store.claim_job(job_id, self.owner, settings.JOB_LEASE_SECONDS):
+                logger.info(f"Resuming job {job_id}")
+                self._start(job_id)
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+            try:
+                for job_id, task in list(self._tasks.items()):
+                    if not self.store.renew_lease(job_id, self.owner, settings.JOB_LEASE_SECONDS):
+                        # Cancelled elsewhere, or our lease lapsed and another worker took over
+                        logger.info(f"Stopping job {job_id}: no longer owned by this worker")
+                        self._tasks.pop(job_id, None)
+                        task.cancel()
+                self._claim_unowned()
+            except Exception as e:
+                logger.error(f"Job lease sweep failed: {str(e)}")
+
+    def _start(self, job_id: str) -> None:
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _run(self, job_id: str) -> None:
+        job = self.store.get_job(job_id)
+        bypass_cache = job["options"].get("bypass_cache", False)
+        if not self.store.transition_status(job_id, _UNFINISHED, JobStatus.RUNNING.value):
+            # Cancelled before it started
+            return
+
+        try:
+            # Workers share one iterator, so each pending item is taken exactly once
+            pending = iter(self.store.pending_items(job_id))
+
+            async def worker() -> None:
+                for index, payload in pending:
+                    if not self._running(job_id):
+                        return
+                    async with self._semaphore:
+                        result = await self._process(payload, bypass_cache)
+                    self.store.save_result(job_id, index, result, failed=result["error"] is not None)
+
+            await asyncio.gather(*(worker() for _ in range(settings.JOB_WORKER_CONCURRENCY)))
+        except Exception as e:
+            # Left RUNNING, the job would be resumed and fail again on every restart
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            self.store.transition_status(job_id, (JobStatus.RUNNING.value,), JobStatus.FAILED.value)
+            return
+
+        if self.store.transition_status(job_id, (JobStatus.RUNNING.value,), JobStatus.COMPLETED.value):
+            logger.info(f"Job {job_id} completed")
+        else:
+            logger.info(f"Job {job_id} stopped: cancelled while running")
+
+    @staticmethod
+    async def _process(payload: Dict[str, Any], bypass_cache: bool) -> Dict[str, Any]:
+        """Generate one item's result; an item that can't be processed gets an error result."""
+        try:
+            result = await generate_endpoint_scenarios(EndpointRequest(**payload), bypass_cache)
+            return result.model_dump(mode="json")
+        except Exception as e:
+            logger.error(f"Error processing job item {payload.get('endpoint')}: {str(e)}")
+            try:
+                method = HTTPMethod(payload.get("method"))
+            except ValueError:
+                method = None
+            return EndpointResponse(
+                endpoint=str(payload.get("endpoint", "")),
+                method=method,
+                error=str(e)
+            ).model_dump(mode="json")
+
+    def _running(self, job_id: str) -> bool:
+        """Whether the job is still RUNNING in the store, e.g. not cancelled from another process."""
+        job = self.store.get_job(job_id)
+        return job is not None and job["status"] == JobStatus.RUNNING.value
+
+job_manager = JobManager(create_job_store())
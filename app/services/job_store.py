@@ -0,0 +1,333 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("job_store")
+
+class JobStore(ABC):
+    """
+    Storage backend for batch jobs.
+
+    A job is a list of item payloads plus one result per item. Results are
+    numbered with a monotonically increasing sequence so clients can fetch
+    them incrementally in completion order.
+    """
+
+    @abstractmethod
+    def create_job(self, job_id: str, items: List[Dict[str, Any]], options: Dict[str, Any]) -> None:
+        """Persist a new job with its item payloads."""
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job record (status, counters, timestamps, options) or None."""
+
+    @abstractmethod
+    def transition_status(self, job_id: str, expected: Tuple[str, ...], status: str) -> bool:
+        """
+        Set a job's status only while it is one of `expected`.
+
+        The check and update are atomic, so a status written by another
+        process (e.g. a cancel) is never overwritten. Returns whether the
+        status changed.
+        """
+
+    @abstractmethod
+    def pending_items(self, job_id: str) -> List[Tuple[int, Dict[str, Any]]]:
+        """Return (index, payload) for every item that has no result yet."""
+
+    @abstractmethod
+    def save_result(self, job_id: str, index: int, result: Dict[str, Any], failed: bool) -> None:
+        """Record the result for one item."""
+
+    @abstractmethod
+    def get_results(self, job_id: str, since: int = 0, limit: int = 100) -> List[Tuple[int, int, Dict[str, Any]]]:
+        """Return (seq, index, result) for results with seq > since, oldest first."""
+
+    @abstractmethod
+    def unfinished_jobs(self) -> List[str]:
+        """Return ids of jobs that are pending or running."""
+
+    @abstractmethod
+    def claim_job(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """
+        Take ownership of an unfinished job for `lease_seconds`.
+
+        Succeeds if the job has no owner, is already owned by `owner`, or its
+        previous owner's lease has expired. Only one caller can win a claim.
+        """
+
+    @abstractmethod
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Extend `owner`'s lease; False if the job was cancelled, finished or taken over."""
+
+    @abstractmethod
+    def release_job(self, job_id: str, owner: str) -> None:
+        """Give up ownership so another worker can resume the job immediately."""
+
+class InMemoryJobStore(JobStore):
+    """Process-local job store; state is lost on restart."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._items: Dict[str, List[Dict[str, Any]]] = {}
+        self._results: Dict[str, List[Tuple[int, int, Dict[str, Any]]]] = {}
+        self._done: Dict[str, set] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def create_job(self, job_id: str, items: List[Dict[str, Any]], options: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "PENDING",
+                "total": len(items),
+                "completed": 0,
+                "failed": 0,
+                "created_at": now,
+                "updated_at": now,
+                "options": options,
+                "owner": None,
+                "lease_expires": 0.0
+            }
+            self._items[job_id] = items
+            self._results[job_id] = []
+            self._done[job_id] = set()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def transition_status(self, job_id: str, expected: Tuple[str, ...], status: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] not in expected:
+                return False
+            job["status"] = status
+            job["updated_at"] = time.time()
+            return True
+
+    def pending_items(self, job_id: str) -> List[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            done = self._done[job_id]
+            return [(i, item) for i, item in enumerate(self._items[job_id]) if i not in done]
+
+    def save_result(self, job_id: str, index: int, result: Dict[str, Any], failed: bool) -> None:
+        with self._lock:
+            if index in self._done[job_id]:
+                return
+            self._seq += 1
+            self._results[job_id].append((self._seq, index, result))
+            self._done[job_id].add(index)
+            job = self._jobs[job_id]
+            job["completed"] += 1
+            job["failed"] += int(failed)
+            job["updated_at"] = time.time()
+
+    def get_results(self, job_id: str, since: int = 0, limit: int = 100) -> List[Tuple[int, int, Dict[str, Any]]]:
+        with self._lock:
+            return [r for r in self._results.get(job_id, []) if r[0] > since][:limit]
+
+    def unfinished_jobs(self) -> List[str]:
+        with self._lock:
+            return [
+                job_id for job_id, job in self._jobs.items()
+                if job["status"] in ("PENDING", "RUNNING")
+            ]
+
+    def claim_job(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] not in ("PENDING", "RUNNING"):
+                return False
+            if job["owner"] not in (None, owner) and job["lease_expires"] >= now:
+                return False
+            job["owner"] = owner
+            job["lease_expires"] = now + lease_seconds
+            return True
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["owner"] != owner or job["status"] not in ("PENDING", "RUNNING"):
+                return False
+            job["lease_expires"] = time.time() + lease_seconds
+            return True
+
+    def release_job(self, job_id: str, owner: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job["owner"] == owner:
+                job["owner"] = None
+                job["lease_expires"] = 0.0
+
+class SQLiteJobStore(JobStore):
+    """Job store backed by a local SQLite file, so finished work survives restarts."""
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                options TEXT NOT NULL,
+                owner TEXT,
+                lease_expires REAL NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS job_items (
+                job_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (job_id, idx)
+            );
+            CREATE TABLE IF NOT EXISTS job_results (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                UNIQUE (job_id, idx)
+            );
+            """
+        )
+        # Databases created before job leases were added lack the ownership columns
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        if "owner" not in columns:
+            self._db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            self._db.execute("ALTER TABLE jobs ADD COLUMN lease_expires REAL NOT NULL DEFAULT 0")
+        self._db.commit()
+        self._lock = threading.Lock()
+        logger.info(f"Job store persisted to {db_path}")
+
+    def create_job(self, job_id: str, items: List[Dict[str, Any]], options: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (job_id, status, total, created_at, updated_at, options) "
+                "VALUES (?, 'PENDING', ?, ?, ?, ?)",
+                (job_id, len(items), now, now, json.dumps(options))
+            )
+            self._db.executemany(
+                "INSERT INTO job_items (job_id, idx, payload) VALUES (?, ?, ?)",
+                ((job_id, i, json.dumps(item)) for i, item in enumerate(items))
+            )
+            self._db.commit()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT job_id, status, total, completed, failed, created_at, updated_at, options "
+                "FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("job_id", "status", "total", "completed", "failed", "created_at", "updated_at", "options")
+        job = dict(zip(keys, row))
+        job["options"] = json.loads(job["options"])
+        return job
+
+    def transition_status(self, job_id: str, expected: Tuple[str, ...], status: str) -> bool:
+        with self._lock:
+            # A single conditional UPDATE, so a concurrent change from another process wins
+            cursor = self._db.execute(
+                f"UPDATE jobs SET status = ?, updated_at = ? "
+                f"WHERE job_id = ? AND status IN ({', '.join('?' for _ in expected)})",
+                (status, time.time(), job_id, *expected)
+            )
+            self._db.commit()
+        return cursor.rowcount > 0
+
+    def pending_items(self, job_id: str) -> List[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT i.idx, i.payload FROM job_items i "
+                "LEFT JOIN job_results r ON r.job_id = i.job_id AND r.idx = i.idx "
+                "WHERE i.job_id = ? AND r.seq IS NULL ORDER BY i.idx",
+                (job_id,)
+            ).fetchall()
+        return [(idx, json.loads(payload)) for idx, payload in rows]
+
+    def save_result(self, job_id: str, index: int, result: Dict[str, Any], failed: bool) -> None:
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO job_results (job_id, idx, result) VALUES (?, ?, ?)",
+                (job_id, index, json.dumps(result))
+            )
+            if cursor.rowcount:
+                self._db.execute(
+                    "UPDATE jobs SET completed = completed + 1, failed = failed + ?, updated_at = ? "
+                    "WHERE job_id = ?",
+                    (int(failed), time.time(), job_id)
+                )
+            self._db.commit()
+
+    def get_results(self, job_id: str, since: int = 0, limit: int = 100) -> List[Tuple[int, int, Dict[str, Any]]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, idx, result FROM job_results WHERE job_id = ? AND seq > ? "
+                "ORDER BY seq LIMIT ?",
+                (job_id, since, limit)
+            ).fetchall()
+        return [(seq, idx, json.loads(result)) for seq, idx, result in rows]
+
+    def unfinished_jobs(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT job_id FROM jobs WHERE status IN ('PENDING', 'RUNNING') ORDER BY created_at"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def claim_job(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            # A single conditional UPDATE, so two processes can't both win the claim
+            cursor = self._db.execute(
+                "UPDATE jobs SET owner = ?, lease_expires = ? "
+                "WHERE job_id = ? AND status IN ('PENDING', 'RUNNING') "
+                "AND (owner IS NULL OR owner = ? OR lease_expires < ?)",
+                (owner, now + lease_seconds, job_id, owner, now)
+            )
+            self._db.commit()
+        return cursor.rowcount > 0
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_expires = ? "
+                "WHERE job_id = ? AND owner = ? AND status IN ('PENDING', 'RUNNING')",
+                (time.time() + lease_seconds, job_id, owner)
+            )
+            self._db.commit()
+        return cursor.rowcount > 0
+
+    def release_job(self, job_id: str, owner: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET owner = NULL, lease_expires = 0 WHERE job_id = ? AND owner = ?",
+                (job_id, owner)
+            )
+            self._db.commit()
+
+def create_job_store() -> JobStore:
+    """Build the job store selected by JOB_STORE_BACKEND."""
+    if settings.JOB_STORE_BACKEND == "memory":
+        return InMemoryJobStore()
+    if settings.JOB_STORE_BACKEND == "sqlite":
+        return SQLiteJobStore(settings.JOB_DB_PATH)
+    raise ValueError(f"Unknown JOB_STORE_BACKEND: {settings.JOB_STORE_BACKEND}")
@@ -1,22 +1,83 @@
+import asyncio
 import json
-from typing import Dict, List, Optional, Union
-import google.generativeai as genai
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 from app.core.config import settings
-from app.utils.logger import get_logger
+from app.services.cache import ResponseCache, response_cache
+from app.services.model_router import model_router
+from app.services.prompt_budget import fit_sections
+from app.services.scheduler import estimate_tokens, llm_scheduler, retryable_errors
+from app.utils.json_parser import ScenarioStream, extract_json, normalize_scenario, parse_scenarios
+from app.utils.logger import get_logger, sample_llm_payload
+from app.utils.metrics import LLM_CACHE, LLM_TOKENS, current_route, stage
 
 logger = get_logger("llm_service")
 
+T = TypeVar("T")
+
+# Bump when a prompt template changes, so incremental spec runs regenerate
+SCENARIO_PROMPT_VERSION = 1
+PYTEST_PROMPT_VERSION = 1
+# Shared by the calls and forget_pytest_*, which rebuild their cache keys
+_PYTEST_TEMPERATURE = 0.3
+_PYTEST_REPAIR_TEMPERATURE = 0.0
+
 class LLMService:
     def __init__(self):
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
-        logger.info("LLM service initialized with Gemini model")
+        # The Gemini client is slow to import; clients are created on first use (or by warm_up)
+        self._clients: Dict[str, Any] = {}
+        # Set through the model setter; used for every tier instead of real clients
+        self._model: Any = None
+        self._model_lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.coalesced_calls = 0
+
+    @property
+    def model(self) -> Any:
+        """The Gemini client of the cheapest model tier, created on first access."""
+        return self.client()
+
+    @model.setter
+    def model(self, model: Any) -> None:
+        # Replaces the client of every tier (used by tests and benchmarks)
+        self._model = model
+
+    def client(self, model_name: Optional[str] = None) -> Any:
+        """
+        The Gemini client for a model, created on first use.
+
+        Args:
+            model_name: Model id; defaults to the cheapest tier
+
+        Returns:
+            A GenerativeModel (or the client set through `model`)
+        """
+        if self._model is not None:
+            return self._model
+        model_name = model_name or model_router.tiers[0]
+        client = self._clients.get(model_name)
+        if client is None:
+            with self._model_lock:
+                client = self._clients.get(model_name)
+                if client is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=settings.GEMINI_API_KEY)
+                    client = self._clients[model_name] = genai.GenerativeModel(model_name)
+                    logger.info(f"LLM service initialized with Gemini model {model_name}")
+        return client
+
+    def warm_up(self) -> None:
+        """Load the Gemini clients ahead of the first request (blocking; run it in a thread)."""
+        for model_name in model_router.tiers:
+            self.client(model_name)
 
     def generate_content(
         self,
         prompt: str,
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        model: Optional[str] = None
     ) -> str:
         """
         Generate content using the Gemini model.
@@ -25,14 +86,158 @@ class LLMService:
             prompt: The input prompt
             temperature: Controls randomness (0.0 to 1.0)
             max_tokens: Maximum number of tokens to generate
+            model: Model id; defaults to the cheapest tier
+            
+        Returns:
+            Generated text response
+        """
+        sampled = sample_llm_payload()
+        try:
+            logger.llm_payload("Prompt", prompt, sampled)
+            
+            response = self.client(model).generate_content(
+                prompt,
+                generation_config={
+                    "temperature": temperature,
+                    "max_output_tokens": max_tokens
+                }
+            )
+            
+            result = response.text
+            logger.llm_payload("Response", result, sampled)
+            self._record_usage(prompt, result, response)
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error generating content: {str(e)}", extra={"llm": True})
+            raise
+
+    async def generate_content_async(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        bypass_cache: bool = False,
+        model: Optional[str] = None
+    ) -> str:
+        """
+        Generate content without blocking the event loop.
+        
+        Uses the SDK's native async client, or a worker thread when
+        LLM_USE_NATIVE_ASYNC is disabled. At most LLM_MAX_CONCURRENCY
+        calls are in flight per process; the rest wait their turn.
+        Responses are served from the response cache when possible, and
+        concurrent identical calls share a single upstream request. Slow
+        calls are hedged when LLM_HEDGE_ENABLED is set (see ModelRouter).
+        
+        Args:
+            prompt: The input prompt
+            temperature: Controls randomness (0.0 to 1.0)
+            max_tokens: Maximum number of tokens to generate
+            bypass_cache: Skip the cache lookup and refresh the entry
+            model: Model id; defaults to the cheapest tier
             
         Returns:
             Generated text response
         """
+        model = model or model_router.tiers[0]
+        cache_key = self._cache_key(prompt, temperature, max_tokens, model)
+        if settings.CACHE_ENABLED and not bypass_cache:
+            cached = await response_cache.get(cache_key)
+            LLM_CACHE.inc(route=current_route.get(), result="miss" if cached is None else "hit")
+            if cached is not None:
+                logger.debug("Serving response from cache", extra={"llm": True})
+                return cached
+        
+        if not settings.LLM_COALESCE_REQUESTS:
+            return await self._generate_and_cache(cache_key, prompt, temperature, max_tokens, model)
+        
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._generate_and_cache(cache_key, prompt, temperature, max_tokens, model)
+            )
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda done: self._finish_inflight(cache_key, done))
+        else:
+            self.coalesced_calls += 1
+            logger.debug("Joining in-flight call for identical prompt", extra={"llm": True})
+        
+        # Shielded so one caller cancelling doesn't fail the others sharing the call
+        return await asyncio.shield(task)
+
+    async def _generate_and_cache(
+        self,
+        cache_key: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        model: str
+    ) -> str:
+        result = await self._generate_uncached(prompt, temperature, max_tokens, model)
+        if settings.CACHE_ENABLED:
+            await response_cache.set(cache_key, result)
+        return result
+
+    def _finish_inflight(self, cache_key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        # Mark the error as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def _cache_key(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        model: Optional[str] = None
+    ) -> str:
+        return ResponseCache.make_key(
+            prompt,
+            model or model_router.tiers[0],
+            {"temperature": temperature, "max_output_tokens": max_tokens}
+        )
+
+    async def _generate_uncached(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        model: str
+    ) -> str:
+        estimated_tokens = self._estimate_tokens(prompt, max_tokens)
+        # A worker thread can't be cancelled, so only native async calls are hedged.
+        # A backup runs within its call's concurrency slot; LLM_HEDGE_MAX_RATIO bounds the extra load
+        admit_backup = (lambda: llm_scheduler.admit(estimated_tokens)) if settings.LLM_USE_NATIVE_ASYNC else None
+        with stage("llm_wait"):
+            return await llm_scheduler.run(
+                lambda: model_router.call(
+                    model,
+                    lambda: self._call_model(prompt, temperature, max_tokens, model),
+                    admit_backup
+                ),
+                estimated_tokens
+            )
+
+    async def _call_model(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        model: str
+    ) -> str:
+        # One upstream attempt; the scheduler holds a concurrency slot for it
+        if not settings.LLM_USE_NATIVE_ASYNC:
+            return await asyncio.to_thread(
+                self.generate_content, prompt, temperature, max_tokens, model
+            )
+        
+        sampled = sample_llm_payload()
         try:
-            logger.debug("Generating content with prompt", extra={"llm": True, "prompt": prompt})
+            logger.llm_payload("Prompt", prompt, sampled)
             
-            response = self.model.generate_content(
+            response = await self.client(model).generate_content_async(
                 prompt,
                 generation_config={
                     "temperature": temperature,
@@ -41,19 +246,279 @@ class LLMService:
             )
             
             result = response.text
-            logger.debug("Content generated successfully", extra={"llm": True, "result": result})
+            logger.llm_payload("Response", result, sampled)
+            self._record_usage(prompt, result, response)
             return result
             
         except Exception as e:
             logger.error(f"Error generating content: {str(e)}", extra={"llm": True})
             raise
 
+    @staticmethod
+    def _estimate_tokens(prompt: str, max_tokens: Optional[int]) -> int:
+        return estimate_tokens(prompt) + (max_tokens or settings.LLM_EXPECTED_OUTPUT_TOKENS)
+
+    @staticmethod
+    def _record_usage(prompt: str, result: str, response: Any = None) -> None:
+        # Prefer the API's usage counts; older SDKs don't report them, so estimate
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", None) or estimate_tokens(prompt)
+        completion_tokens = getattr(usage, "candidates_token_count", None) or estimate_tokens(result)
+        route = current_route.get()
+        LLM_TOKENS.inc(prompt_tokens, route=route, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, route=route, kind="completion")
+
+    async def stream_content(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        bypass_cache: bool = False,
+        model: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated content as the model produces it.
+        
+        A cache hit is yielded as a single chunk. The full response is
+        cached once the stream completes. Streams are not hedged. The
+        model's output is buffered, so the concurrency slot is held only
+        until the model finishes, however slowly the caller reads.
+        
+        Args:
+            prompt: The input prompt
+            temperature: Controls randomness (0.0 to 1.0)
+            max_tokens: Maximum number of tokens to generate
+            bypass_cache: Skip the cache lookup and refresh the entry
+            model: Model id; defaults to the cheapest tier
+            
+        Yields:
+            Text chunks of the generated response
+        """
+        model = model or model_router.tiers[0]
+        cache_key = None
+        if settings.CACHE_ENABLED:
+            cache_key = self._cache_key(prompt, temperature, max_tokens, model)
+            if not bypass_cache:
+                cached = await response_cache.get(cache_key)
+                LLM_CACHE.inc(route=current_route.get(), result="miss" if cached is None else "hit")
+                if cached is not None:
+                    logger.debug("Serving response from cache", extra={"llm": True})
+                    yield cached
+                    return
+        
+        if not settings.LLM_USE_NATIVE_ASYNC:
+            # The sync client can't stream without blocking; send it in one piece
+            result = await self._generate_uncached(prompt, temperature, max_tokens, model)
+            if cache_key is not None:
+                await response_cache.set(cache_key, result)
+            yield result
+            return
+        
+        # The upstream stream is read into a buffer by its own task, so the
+        # concurrency slot is released as soon as the model finishes rather
+        # than when a slow client has read everything
+        chunks: asyncio.Queue = asyncio.Queue()
+        upstream = asyncio.ensure_future(
+            self._read_stream(prompt, temperature, max_tokens, model, cache_key, chunks)
+        )
+        try:
+            while True:
+                text = await chunks.get()
+                if text is None:
+                    break
+                yield text
+            await upstream  # Raises the upstream error, if any
+        finally:
+            # Stops reading upstream if the caller gave up early; a no-op otherwise
+            upstream.cancel()
+
+    async def _read_stream(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        model: str,
+        cache_key: Optional[str],
+        chunks: asyncio.Queue
+    ) -> None:
+        # Puts the model's text chunks on `chunks`, then None (also on failure).
+        # Streams aren't retried once output has started; admission still goes
+        # through the scheduler so the concurrency limit, rate limits and the
+        # circuit breaker apply
+        parts: List[str] = []
+        sampled = sample_llm_payload()
+        try:
+            deadline = time.monotonic() + settings.LLM_DEADLINE_SECONDS
+            await llm_scheduler.acquire_slot(deadline)
+            try:
+                await llm_scheduler.admit(self._estimate_tokens(prompt, max_tokens), deadline)
+                try:
+                    logger.llm_payload("Streamed prompt", prompt, sampled)
+                    
+                    response = await self.client(model).generate_content_async(
+                        prompt,
+                        generation_config={
+                            "temperature": temperature,
+                            "max_output_tokens": max_tokens
+                        },
+                        stream=True
+                    )
+                    
+                    async for chunk in response:
+                        text = chunk.text
+                        if text:
+                            parts.append(text)
+                            chunks.put_nowait(text)
+                    
+                    llm_scheduler.circuit.record_success()
+                    
+                except retryable_errors() as e:
+                    llm_scheduler.circuit.record_failure()
+                    logger.error(f"Error streaming content: {str(e)}", extra={"llm": True})
+                    raise
+                except asyncio.CancelledError:
+                    llm_scheduler.circuit.cancel_trial()
+                    raise
+                except Exception as e:
+                    # Non-transient errors (bad request, auth) aren't the upstream's health problem
+                    llm_scheduler.circuit.record_success()
+                    logger.error(f"Error streaming content: {str(e)}", extra={"llm": True})
+                    raise
+            finally:
+                llm_scheduler.slots.release()
+        finally:
+            chunks.put_nowait(None)
+
+        result = "".join(parts)
+        logger.llm_payload("Streamed response", result, sampled)
+        self._record_usage(prompt, result)
+        if cache_key is not None:
+            await response_cache.set(cache_key, result)
+
+    async def generate_test_scenarios_with_diagnostics(
+        self,
+        endpoint: str,
+        method: str,
+        description: str,
+        scenario_types: List[str],
+        bypass_cache: bool = False,
+        context: Optional[str] = None
+    ) -> Tuple[List[Dict[str, str]], List[str]]:
+        """
+        Generate test scenarios for an API endpoint, tolerating format drift.
+        
+        Markdown fences and surrounding prose are stripped, and entries that
+        are malformed are dropped and reported instead of failing the call.
+        
+        Args:
+            endpoint: API endpoint path
+            method: HTTP method
+            description: Endpoint description
+            scenario_types: List of scenario types to generate
+            bypass_cache: Skip the response cache for this call
+            context: Optional schema details to ground the scenarios
+            
+        Returns:
+            Tuple of (valid test scenarios, diagnostics for discarded entries)
+            
+        Raises:
+            ValueError: If the response contains no usable scenarios
+        """
+        prompt = self._build_scenario_prompt(
+            endpoint, method, description, scenario_types, context
+        )
+
+        def parse(response: str) -> Tuple[List[Dict[str, str]], List[str]]:
+            scenarios, diagnostics = parse_scenarios(response)
+            if diagnostics:
+                logger.warning(
+                    "Discarded malformed scenario output: {}",
+                    "; ".join(diagnostics),
+                    extra={"llm": True}
+                )
+            if not scenarios:
+                raise ValueError(
+                    f"LLM response contained no valid scenarios: {'; '.join(diagnostics) or 'empty array'}"
+                )
+            return scenarios, diagnostics
+
+        try:
+            scenarios, diagnostics = await self._generate_routed(
+                "scenarios", prompt, 0.7, bypass_cache, parse
+            )
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating test scenarios: {str(e)}", extra={"llm": True})
+            raise
+        
+        logger.info(f"Generated {len(scenarios)} test scenarios", extra={"llm": True})
+        return scenarios, diagnostics
+
+    async def _generate_routed(
+        self,
+        task: str,
+        prompt: str,
+        temperature: float,
+        bypass_cache: bool,
+        parse: Callable[[str], T]
+    ) -> T:
+        """
+        Generate on the task's first model tier and parse the answer.
+
+        While parsing fails, the unusable answer is evicted from the cache
+        and the prompt goes to the next tier (LLM_ESCALATE_ON_INVALID).
+
+        Args:
+            task: Task name passed to ModelRouter.route
+            prompt: The input prompt
+            temperature: Controls randomness (0.0 to 1.0)
+            bypass_cache: Skip the response cache
+            parse: Turns the answer into the result; raises ValueError if it is unusable
+
+        Returns:
+            The parsed answer of the first tier that gave a usable one
+
+        Raises:
+            ValueError: If the last tier's answer is unusable too
+        """
+        models = model_router.route(task)
+        if not settings.LLM_ESCALATE_ON_INVALID:
+            models = models[:1]
+        for position, model in enumerate(models):
+            try:
+                response = await self.generate_content_async(
+                    prompt, temperature=temperature, bypass_cache=bypass_cache, model=model
+                )
+            except Exception:
+                model_router.record(model, "error")
+                raise
+            try:
+                with stage("json_parse"):
+                    result = parse(response)
+            except ValueError as e:
+                # Don't keep serving an unusable response from the cache
+                await response_cache.delete(self._cache_key(prompt, temperature, None, model))
+                if position == len(models) - 1:
+                    model_router.record(model, "rejected")
+                    raise
+                model_router.record(model, "escalated")
+                logger.warning(
+                    f"Unusable answer from {model} ({str(e)}); retrying on {models[position + 1]}",
+                    extra={"llm": True}
+                )
+                continue
+            model_router.record(model, "accepted")
+            return result
+
     async def generate_test_scenarios(
         self,
         endpoint: str,
         method: str,
         description: str,
-        scenario_types: List[str]
+        scenario_types: List[str],
+        bypass_cache: bool = False,
+        context: Optional[str] = None
     ) -> List[Dict[str, str]]:
         """
         Generate test scenarios for an API endpoint.
@@ -63,43 +528,90 @@ class LLMService:
             method: HTTP method
             description: Endpoint description
             scenario_types: List of scenario types to generate
+            bypass_cache: Skip the response cache for this call
+            context: Optional schema details to ground the scenarios
             
         Returns:
             List of test scenarios with their types
         """
-        prompt = f"""Generate test scenarios for the following API endpoint:
-Endpoint: {endpoint}
-Method: {method}
-Description: {description}
-Scenario Types: {', '.join(scenario_types)}
+        scenarios, _ = await self.generate_test_scenarios_with_diagnostics(
+            endpoint, method, description, scenario_types, bypass_cache, context
+        )
+        return scenarios
 
-For each scenario type, provide:
-1. A clear description of the test case
-2. Expected input data
-3. Expected response/behavior
+    def stream_test_scenarios(
+        self,
+        endpoint: str,
+        method: str,
+        description: str,
+        scenario_types: List[str],
+        bypass_cache: bool = False,
+        context: Optional[str] = None
+    ) -> ScenarioStream:
+        """
+        Stream test scenarios as the model produces them.
+        
+        Takes the same arguments as generate_test_scenarios. Each scenario
+        is yielded as soon as its JSON object is complete; malformed entries
+        are collected on the stream's diagnostics.
+        
+        Returns:
+            ScenarioStream to iterate with `async for`
+        """
+        prompt = self._build_scenario_prompt(
+            endpoint, method, description, scenario_types, context
+        )
+        return ScenarioStream(
+            self.stream_content(prompt, temperature=0.7, bypass_cache=bypass_cache)
+        )
 
-Format the response as a JSON array of objects with the following structure:
-[
-    {{
-        "type": "SCENARIO_TYPE",
-        "description": "Test case description",
-        "input": "Expected input data",
-        "expected_output": "Expected response/behavior"
-    }}
-]
+    async def generate_packed_test_scenarios(
+        self,
+        operations: List[Dict[str, Any]],
+        bypass_cache: bool = False
+    ) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Generate test scenarios for several small endpoints in one call.
+        
+        Args:
+            operations: Dicts with id, endpoint, method, description,
+                scenario_types and optional context keys
+            bypass_cache: Skip the response cache for this call
+            
+        Returns:
+            Mapping of operation id to its list of test scenarios. Ids the
+            model left out are missing from the mapping.
+        """
+        prompt = self._build_packed_prompt(operations)
 
-Ensure the response is valid JSON and only contains the array of scenarios."""
+        def parse(response: str) -> Dict[str, List[Dict[str, str]]]:
+            packed = extract_json(response, "{")
+            if not isinstance(packed, dict):
+                raise ValueError("Expected a JSON object keyed by endpoint id")
+            
+            results: Dict[str, List[Dict[str, str]]] = {}
+            for key, entries in packed.items():
+                if not isinstance(entries, list):
+                    continue
+                valid = []
+                for entry in entries:
+                    try:
+                        valid.append(normalize_scenario(entry))
+                    except ValueError as e:
+                        logger.warning("Discarded packed scenario for {}: {}", key, str(e), extra={"llm": True})
+                if valid:
+                    results[str(key)] = valid
+            return results
 
         try:
-            response = self.generate_content(prompt, temperature=0.7)
-            scenarios = json.loads(response)
-            logger.info(f"Generated {len(scenarios)} test scenarios", extra={"llm": True})
-            return scenarios
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON: {str(e)}", extra={"llm": True})
-            raise
-        except Exception as e:
-            logger.error(f"Error generating test scenarios: {str(e)}", extra={"llm": True})
+            results = await self._generate_routed("scenarios", prompt, 0.7, bypass_cache, parse)
+            logger.info(
+                f"Generated packed scenarios for {len(results)}/{len(operations)} endpoints",
+                extra={"llm": True}
+            )
+            return results
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"Failed to parse packed LLM response: {str(e)}", extra={"llm": True})
             raise
 
     async def generate_pytest_code(
@@ -110,7 +622,9 @@ Ensure the response is valid JSON and only contains the array of scenarios."""
         headers: Dict[str, str],
         request_body: Optional[Dict] = None,
         success_status_code: int = 200,
-        example_response: Optional[Dict] = None
+        example_response: Optional[Dict] = None,
+        bypass_cache: bool = False,
+        model: Optional[str] = None
     ) -> str:
         """
         Generate pytest code for testing an API endpoint.
@@ -123,23 +637,259 @@ Ensure the response is valid JSON and only contains the array of scenarios."""
             request_body: Example request body
             success_status_code: Expected success status code
             example_response: Example successful response
+            bypass_cache: Skip the response cache for this call
+            model: Model id; defaults to the pytest starting tier
             
         Returns:
             Generated pytest code as a string
         """
-        prompt = f"""Generate a pytest test file for the following API endpoint:
+        prompt = self._build_pytest_prompt(
+            endpoint, method, base_url, headers,
+            request_body, success_status_code, example_response
+        )
+
+        try:
+            code = await self.generate_content_async(
+                prompt, temperature=_PYTEST_TEMPERATURE, bypass_cache=bypass_cache,
+                model=model or model_router.route("pytest")[0]
+            )
+            logger.info("Generated pytest code successfully", extra={"llm": True})
+            return code
+        except Exception as e:
+            logger.error(f"Error generating pytest code: {str(e)}", extra={"llm": True})
+            raise
+
+    async def repair_pytest_code(
+        self,
+        code: str,
+        issues: List[str],
+        bypass_cache: bool = False,
+        model: Optional[str] = None
+    ) -> str:
+        """
+        Ask the model to fix specific problems in a generated pytest file.
+        
+        Only the listed problems are sent, so the model edits the file
+        instead of writing a new one.
+        
+        Args:
+            code: The pytest file after local fixes
+            issues: Problems found by static analysis
+            bypass_cache: Skip the response cache for this call
+            model: Model id; defaults to the pytest starting tier
+            
+        Returns:
+            The model's corrected file (not yet validated)
+        """
+        prompt = self._build_pytest_repair_prompt(code, issues)
+        try:
+            repaired = await self.generate_content_async(
+                prompt, temperature=_PYTEST_REPAIR_TEMPERATURE, bypass_cache=bypass_cache,
+                model=model or model_router.route("pytest")[0]
+            )
+            logger.info(f"Repaired pytest code ({len(issues)} issue(s))", extra={"llm": True})
+            return repaired
+        except Exception as e:
+            logger.error(f"Error repairing pytest code: {str(e)}", extra={"llm": True})
+            raise
+
+    async def forget_pytest_code(
+        self,
+        endpoint: str,
+        method: str,
+        base_url: str,
+        headers: Dict[str, str],
+        request_body: Optional[Dict] = None,
+        success_status_code: int = 200,
+        example_response: Optional[Dict] = None,
+        model: Optional[str] = None
+    ) -> None:
+        """
+        Drop a generate_pytest_code answer from the response cache.
+
+        Takes the same arguments as generate_pytest_code, so a file that
+        failed validation is regenerated next time instead of served again.
+        """
+        prompt = self._build_pytest_prompt(
+            endpoint, method, base_url, headers,
+            request_body, success_status_code, example_response
+        )
+        model = model or model_router.route("pytest")[0]
+        await response_cache.delete(self._cache_key(prompt, _PYTEST_TEMPERATURE, None, model))
+
+    async def forget_pytest_repair(self, code: str, issues: List[str], model: Optional[str] = None) -> None:
+        """Drop a repair_pytest_code answer from the response cache; takes the same arguments."""
+        prompt = self._build_pytest_repair_prompt(code, issues)
+        model = model or model_router.route("pytest")[0]
+        await response_cache.delete(self._cache_key(prompt, _PYTEST_REPAIR_TEMPERATURE, None, model))
+
+    async def generate_dataset_spec(
+        self,
+        endpoint: str,
+        method: str,
+        description: str,
+        request_body: Optional[Dict] = None,
+        bypass_cache: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Ask the model to design a generator spec for synthetic records.
+        
+        The model only describes the data (field types, distributions,
+        enums and constraints); the records themselves are produced locally
+        by the dataset engine.
+        
+        Args:
+            endpoint: API endpoint path
+            method: HTTP method
+            description: What the endpoint does and what the records represent
+            request_body: Example record
+            bypass_cache: Skip the response cache for this call
+            
+        Returns:
+            The spec as a JSON object (not yet validated)
+        """
+        prompt = self._build_dataset_spec_prompt(endpoint, method, description, request_body)
+
+        def parse(response: str) -> Dict[str, Any]:
+            spec = extract_json(response, "{")
+            if not isinstance(spec, dict):
+                raise ValueError("Expected a JSON object")
+            return spec
+
+        try:
+            spec = await self._generate_routed("dataset_spec", prompt, 0.2, bypass_cache, parse)
+            logger.info(f"Designed dataset spec with {len(spec.get('fields', []))} fields", extra={"llm": True})
+            return spec
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"Failed to parse dataset spec: {str(e)}", extra={"llm": True})
+            raise
+
+    async def stream_pytest_code(
+        self,
+        endpoint: str,
+        method: str,
+        base_url: str,
+        headers: Dict[str, str],
+        request_body: Optional[Dict] = None,
+        success_status_code: int = 200,
+        example_response: Optional[Dict] = None,
+        bypass_cache: bool = False
+    ) -> AsyncIterator[str]:
+        """
+        Stream pytest code for an API endpoint as it is generated.
+        
+        Takes the same arguments as generate_pytest_code.
+        
+        Yields:
+            Chunks of the generated pytest code
+        """
+        prompt = self._build_pytest_prompt(
+            endpoint, method, base_url, headers,
+            request_body, success_status_code, example_response
+        )
+        async for chunk in self.stream_content(
+            prompt, temperature=_PYTEST_TEMPERATURE, bypass_cache=bypass_cache,
+            model=model_router.route("pytest")[0]
+        ):
+            yield chunk
+
+    @staticmethod
+    @stage("prompt_build")
+    def _build_scenario_prompt(
+        endpoint: str,
+        method: str,
+        description: str,
+        scenario_types: List[str],
+        context: Optional[str]
+    ) -> str:
+        context_section = f"\n{context}\n" if context else ""
+        return f"""Generate test scenarios for the following API endpoint:
+Endpoint: {endpoint}
+Method: {method}
+Description: {description}
+Scenario Types: {', '.join(scenario_types)}
+{context_section}
+For each scenario type, provide:
+1. A clear description of the test case
+2. Expected input data
+3. Expected response/behavior
+
+Format the response as a JSON array of objects with the following structure:
+[
+    {{
+        "type": "SCENARIO_TYPE",
+        "description": "Test case description",
+        "input": "Expected input data",
+        "expected_output": "Expected response/behavior"
+    }}
+]
+
+Ensure the response is valid JSON and only contains the array of scenarios."""
+
+    @staticmethod
+    @stage("prompt_build")
+    def _build_packed_prompt(operations: List[Dict[str, Any]]) -> str:
+        blocks = []
+        for op in operations:
+            block = f"""[{op["id"]}]
+Endpoint: {op["endpoint"]}
+Method: {op["method"]}
+Description: {op["description"]}
+Scenario Types: {', '.join(op["scenario_types"])}"""
+            if op.get("context"):
+                block += f"\n{op['context']}"
+            blocks.append(block)
+        operations_text = "\n\n".join(blocks)
+        
+        return f"""Generate test scenarios for each of the following API endpoints.
+Each endpoint is introduced by its id in square brackets.
+
+{operations_text}
+
+For each endpoint and each of its scenario types, provide:
+1. A clear description of the test case
+2. Expected input data
+3. Expected response/behavior
+
+Format the response as a single JSON object mapping each endpoint id to an array of scenarios:
+{{
+    "<endpoint id>": [
+        {{
+            "type": "SCENARIO_TYPE",
+            "description": "Test case description",
+            "input": "Expected input data",
+            "expected_output": "Expected response/behavior"
+        }}
+    ]
+}}
+
+Ensure the response is valid JSON and only contains that object."""
+
+    @staticmethod
+    @stage("prompt_build")
+    def _build_pytest_prompt(
+        endpoint: str,
+        method: str,
+        base_url: str,
+        headers: Dict[str, str],
+        request_body: Optional[Dict],
+        success_status_code: int,
+        example_response: Optional[Dict]
+    ) -> str:
+        def render(sections: Dict[str, str]) -> str:
+            return f"""Generate a pytest test file for the following API endpoint:
 Endpoint: {endpoint}
 Method: {method}
 Base URL: {base_url}
-Headers: {json.dumps(headers, indent=2)}
-Request Body: {json.dumps(request_body, indent=2) if request_body else 'None'}
+Headers: {sections["headers"]}
+Request Body: {sections["request_body"]}
 Expected Success Status Code: {success_status_code}
-Example Response: {json.dumps(example_response, indent=2) if example_response else 'None'}
+Example Response: {sections["example_response"]}
 
 Requirements:
-1. Use the requests library
+1. Use the requests library through a session-scoped `http_session` fixture that yields a `requests.Session()`; send every request with it (e.g. `http_session.post(...)`), never with `requests.post(...)` directly
 2. Include appropriate imports
-3. Create a fixture for base_url and headers
+3. Create a fixture for base_url that returns `os.environ.get("API_BASE_URL", "{base_url}")`, and one for headers
 4. Generate at least one positive test case
 5. Generate at least one negative test case
 6. Use appropriate pytest markers
@@ -149,12 +899,75 @@ Requirements:
 Format the response as a Python code string with proper indentation.
 The response should only contain the Python code, no explanations."""
 
-        try:
-            code = self.generate_content(prompt, temperature=0.3)
-            logger.info("Generated pytest code successfully", extra={"llm": True})
-            return code
-        except Exception as e:
-            logger.error(f"Error generating pytest code: {str(e)}", extra={"llm": True})
-            raise
+        # Large examples are compacted so the whole prompt stays within PROMPT_MAX_TOKENS
+        overhead = estimate_tokens(render({"headers": "", "request_body": "", "example_response": ""}))
+        sections, _ = fit_sections(
+            {"headers": headers, "request_body": request_body, "example_response": example_response},
+            settings.PROMPT_MAX_TOKENS - overhead
+        )
+        return render(sections)
+
+    @staticmethod
+    @stage("prompt_build")
+    def _build_dataset_spec_prompt(
+        endpoint: str,
+        method: str,
+        description: str,
+        request_body: Optional[Dict]
+    ) -> str:
+        def render(example: str) -> str:
+            return f"""Design a generator for realistic synthetic records for the following API endpoint:
+Endpoint: {endpoint}
+Method: {method}
+Description: {description or "None"}
+Example Record: {example}
+
+Describe every field of a record. Use dotted names for nested objects (e.g. "address.city").
+Field types: integer, number, boolean, enum, string, text, email, uuid, date, datetime, sequence, array.
+Field options:
+- minimum, maximum: bounds for integer/number; minimum is the first value of a sequence
+- distribution: uniform, normal or lognormal, with mean and stddev
+- decimals: rounding for number
+- values, weights: choices for enum and array items, with relative frequencies
+- min_length, max_length: characters for string, words for text, items for array
+- prefix: prepended to string/text values
+- start, end: ISO bounds for date/datetime
+- probability: chance of true for boolean
+- null_rate: fraction of records where the field is null
+
+Constraints between fields:
+- {{"type": "ordered", "fields": ["created_at", "updated_at"]}}: values never decrease in this order; the fields must all be numeric (integer, number, sequence) or all date/datetime
+- {{"type": "null_unless", "fields": ["shipped_at"], "when_field": "status", "when_values": ["shipped"]}}: fields are null unless when_field has one of when_values
+
+Format the response as a JSON object:
+{{
+    "fields": [
+        {{"name": "id", "type": "sequence", "minimum": 1}},
+        {{"name": "status", "type": "enum", "values": ["active", "inactive"], "weights": [0.8, 0.2]}}
+    ],
+    "constraints": []
+}}
+
+Choose ranges, distributions and frequencies that match real-world data for this endpoint.
+Ensure the response is valid JSON and only contains that object."""
+
+        overhead = estimate_tokens(render(""))
+        sections, _ = fit_sections({"example": request_body}, settings.PROMPT_MAX_TOKENS - overhead)
+        return render(sections["example"])
+
+    @staticmethod
+    @stage("prompt_build")
+    def _build_pytest_repair_prompt(code: str, issues: List[str]) -> str:
+        problems = "\n".join(f"- {issue}" for issue in issues)
+        return f"""The following pytest file has problems:
+{problems}
+
+Fix only these problems and keep everything else unchanged.
+
+```python
+{code}
+```
+
+Respond with only the complete corrected Python code, no explanations."""
 
 llm_service = LLMService() 
\ No newline at end of file
@@ -0,0 +1,219 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+from app.core.config import settings
+from app.utils.logger import get_logger
+from app.utils.metrics import Counter, Histogram, current_route
+
+logger = get_logger("model_router")
+
+# Tasks that start at LLM_PYTEST_TIER; everything else starts at the cheapest tier
+COMPLEX_TASKS = ("pytest",)
+
+LLM_TIER_REQUESTS = Counter(
+    "llm_tier_requests_total",
+    "LLM answers per model tier by outcome (accepted, escalated, rejected, error)",
+    ("route", "tier", "model", "outcome")
+)
+LLM_HEDGES = Counter(
+    "llm_hedges_total",
+    "Backup LLM calls sent after the hedge delay, by which call answered first (primary, backup, none)",
+    ("route", "model", "winner")
+)
+LLM_CALL_LATENCY = Histogram(
+    "llm_call_duration_seconds",
+    "Upstream LLM latency of single attempts (kind=attempt) and of calls including any hedge (kind=call)",
+    ("route", "model", "kind")
+)
+
+class LatencyTracker:
+    """Recent upstream latencies per model, for picking the hedge delay."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, model: str, seconds: float) -> None:
+        self._samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def count(self, model: str) -> int:
+        return len(self._samples.get(model, ()))
+
+    def quantile(self, model: str, q: float) -> Optional[float]:
+        """The q-quantile of the window, or None before any samples."""
+        samples = self._samples.get(model)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class ModelRouter:
+    """
+    Picks the Gemini model for each call and hedges slow ones.
+
+    LLM_MODEL_TIERS lists models cheapest first. Scenario, dataset and
+    intent prompts start at the first tier and pytest generation at
+    LLM_PYTEST_TIER; callers move to the next tier when a tier's answer
+    fails validation. With LLM_HEDGE_ENABLED, a call still running after
+    the model's observed LLM_HEDGE_QUANTILE latency gets a backup call;
+    whichever answers first wins and the other is cancelled. At most
+    LLM_HEDGE_MAX_RATIO of calls are hedged, so a slow upstream can't
+    double the load on it.
+    """
+
+    def __init__(self):
+        self.tiers: List[str] = list(settings.LLM_MODEL_TIERS) or [settings.GEMINI_MODEL]
+        self.latency = LatencyTracker(settings.LLM_HEDGE_WINDOW)
+        self.outcomes: Dict[str, Dict[str, int]] = {
+            model: {"accepted": 0, "escalated": 0, "rejected": 0, "error": 0} for model in self.tiers
+        }
+        self.calls = 0
+        self.hedged = 0
+        self.backup_wins = 0
+
+    def route(self, task: str) -> List[str]:
+        """
+        Models to try for a task, in escalation order.
+
+        Args:
+            task: "pytest", or any other task name for the cheapest-first order
+
+        Returns:
+            The task's starting tier followed by the stronger ones
+        """
+        start = 0
+        if task in COMPLEX_TASKS:
+            # Negative values count from the strongest tier, like list indices
+            start = settings.LLM_PYTEST_TIER
+            if start < 0:
+                start += len(self.tiers)
+            start = min(max(start, 0), len(self.tiers) - 1)
+        return self.tiers[start:]
+
+    def record(self, model: str, outcome: str) -> None:
+        """Count an answer of a tier: accepted, escalated (failed validation), rejected (last tier failed) or error."""
+        counts = self.outcomes.setdefault(model, {"accepted": 0, "escalated": 0, "rejected": 0, "error": 0})
+        counts[outcome] += 1
+        tier = self.tiers.index(model) if model in self.tiers else -1
+        LLM_TIER_REQUESTS.inc(route=current_route.get(), tier=str(tier), model=model, outcome=outcome)
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """Seconds to wait before sending a backup call, or None not to hedge this call."""
+        if not settings.LLM_HEDGE_ENABLED or self.latency.count(model) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        if self.hedged >= settings.LLM_HEDGE_MAX_RATIO * self.calls:
+            return None
+        return max(self.latency.quantile(model, settings.LLM_HEDGE_QUANTILE), settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+
+    async def call(
+        self,
+        model: str,
+        attempt: Callable[[], Awaitable[Any]],
+        admit_backup: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> Any:
+        """
+        Run one upstream call, hedged when it is slower than usual.
+
+        Args:
+            model: Model the attempts go to
+            attempt: Zero-argument coroutine factory performing one attempt
+            admit_backup: Waits for rate-limit capacity for a backup
+                attempt; None disables hedging for this call
+
+        Returns:
+            The result of the first attempt to succeed
+        """
+        self.calls += 1
+        started = time.perf_counter()
+        delay = self.hedge_delay(model) if admit_backup is not None else None
+        if delay is None:
+            result = await self._timed(model, attempt)
+        else:
+            result = await self._hedged(model, attempt, admit_backup, delay)
+        LLM_CALL_LATENCY.observe(time.perf_counter() - started, route=current_route.get(), model=model, kind="call")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tier outcomes and hit rate, observed latency quantiles and hedging counts."""
+        tiers = []
+        for index, model in enumerate(self.tiers):
+            counts = self.outcomes[model]
+            total = sum(counts.values())
+            tiers.append({
+                "tier": index,
+                "model": model,
+                **counts,
+                "hit_rate": counts["accepted"] / total if total else 0.0,
+                "latency_samples": self.latency.count(model),
+                "p50_seconds": self.latency.quantile(model, 0.5),
+                "p90_seconds": self.latency.quantile(model, 0.9),
+                "p99_seconds": self.latency.quantile(model, 0.99)
+            })
+        return {
+            "tiers": tiers,
+            "hedging_enabled": settings.LLM_HEDGE_ENABLED,
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "backup_wins": self.backup_wins
+        }
+
+    async def _timed(self, model: str, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        try:
+            result = await attempt()
+        except asyncio.CancelledError:
+            # A cancelled attempt took at least this long; keep it so the quantile doesn't drift down
+            self.latency.observe(model, time.perf_counter() - started)
+            raise
+        elapsed = time.perf_counter() - started
+        self.latency.observe(model, elapsed)
+        LLM_CALL_LATENCY.observe(elapsed, route=current_route.get(), model=model, kind="attempt")
+        return result
+
+    async def _backup(
+        self,
+        model: str,
+        attempt: Callable[[], Awaitable[Any]],
+        admit_backup: Callable[[], Awaitable[None]]
+    ) -> Any:
+        await admit_backup()
+        return await self._timed(model, attempt)
+
+    async def _hedged(
+        self,
+        model: str,
+        attempt: Callable[[], Awaitable[Any]],
+        admit_backup: Callable[[], Awaitable[None]],
+        delay: float
+    ) -> Any:
+        primary = asyncio.ensure_future(self._timed(model, attempt))
+        backup: Optional[asyncio.Future] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            self.hedged += 1
+            logger.debug(f"{model} call exceeded {delay:.2f}s; sending a backup call", extra={"llm": True})
+            backup = asyncio.ensure_future(self._backup(model, attempt, admit_backup))
+            pending = {primary, backup}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = "primary" if task is primary else "backup"
+                        if task is backup:
+                            self.backup_wins += 1
+                        LLM_HEDGES.inc(route=current_route.get(), model=model, winner=winner)
+                        return task.result()
+                    error = error or task.exception()
+            LLM_HEDGES.inc(route=current_route.get(), model=model, winner="none")
+            raise error
+        finally:
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+
+model_router = ModelRouter()
\ No newline at end of file
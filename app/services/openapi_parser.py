@@ -0,0 +1,274 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.schemas.chatbot import ApiDetails
+from app.schemas.openapi import SpecOperation
+from app.schemas.playground import EndpointRequest, HTTPMethod, ScenarioType
+from app.utils.logger import get_logger
+
+logger = get_logger("openapi_parser")
+
+_METHODS = {method.value.lower(): method for method in HTTPMethod}
+_MAX_EXAMPLE_DEPTH = 6
+
+class OpenAPIParser:
+    """
+    Expands an OpenAPI 3.x or Swagger 2.0 document into EndpointRequest and
+    ApiDetails pairs.
+
+    $ref pointers are resolved once and memoized, so specs that reuse the
+    same component schemas across hundreds of operations stay cheap to parse.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        if "openapi" not in spec and "swagger" not in spec:
+            raise ValueError("Document is neither OpenAPI 3.x nor Swagger 2.0")
+        self.spec = spec
+        self.is_swagger2 = "swagger" in spec
+        self._resolved: Dict[str, Any] = {}
+
+    @property
+    def title(self) -> str:
+        return self.spec.get("info", {}).get("title", "Untitled API")
+
+    def base_url(self) -> str:
+        """Return the first server URL declared in the spec."""
+        if self.is_swagger2:
+            scheme = (self.spec.get("schemes") or ["https"])[0]
+            host = self.spec.get("host", "localhost")
+            return f"{scheme}://{host}{self.spec.get('basePath', '')}".rstrip("/")
+        servers = self.spec.get("servers") or [{"url": "http://localhost"}]
+        return servers[0].get("url", "http://localhost").rstrip("/")
+
+    def operations(
+        self,
+        scenario_types: List[ScenarioType],
+        base_url: Optional[str] = None
+    ) -> List[SpecOperation]:
+        """
+        Expand every supported operation in the spec.
+
+        Args:
+            scenario_types: Scenario types to request for each operation
+            base_url: Base URL override; defaults to the spec's first server
+
+        Returns:
+            List of SpecOperation in document order
+        """
+        base_url = base_url or self.base_url()
+        operations = []
+
+        for path, path_item in self.spec.get("paths", {}).items():
+            path_item = self._deref(path_item)
+            shared_params = path_item.get("parameters", [])
+
+            for method_name, operation in path_item.items():
+                method = _METHODS.get(method_name.lower())
+                if method is None:
+                    continue
+                operation = self._deref(operation)
+                parameters = [self._deref(p) for p in shared_params + operation.get("parameters", [])]
+
+                request_schema = self._request_schema(operation, parameters)
+                status_code, response_schema = self._success_response(operation)
+                description = (
+                    operation.get("description")
+                    or operation.get("summary")
+                    or f"{method.value} {path}"
+                )
+
+                operations.append(SpecOperation(
+                    operation_id=operation.get("operationId") or f"{method.value} {path}",
+                    endpoint=EndpointRequest(
+                        endpoint=path,
+                        method=method,
+                        description=description.strip(),
+                        scenario_types=scenario_types,
+                        request_schema=self._inline(request_schema, 0, frozenset(), strip=False) if request_schema else None
+                    ),
+                    api_details=ApiDetails(
+                        base_url=base_url,
+                        headers=self._headers(operation, parameters),
+                        request_body=self._as_dict(self.example(request_schema)),
+                        success_status_code=status_code,
+                        example_response=self._as_dict(self.example(response_schema))
+                    ),
+                    context=self._context(parameters, request_schema, response_schema)
+                ))
+
+        logger.info(f"Parsed {len(operations)} operations from spec '{self.title}'")
+        return operations
+
+    def example(self, schema: Optional[Dict[str, Any]]) -> Any:
+        """
+        Build an example value for a JSON schema.
+
+        Explicit example/default/enum values win; otherwise a placeholder is
+        synthesized from the type and format. Recursive references stop at
+        the first repeat.
+        """
+        return self._example(schema, 0, frozenset())
+
+    def _example(self, schema: Optional[Dict[str, Any]], depth: int, seen: frozenset) -> Any:
+        if not schema or depth > _MAX_EXAMPLE_DEPTH:
+            return None
+        ref = schema.get("$ref")
+        if ref:
+            if ref in seen:
+                return None
+            seen = seen | {ref}
+        schema = self._deref(schema)
+        for key in ("example", "default"):
+            if key in schema:
+                return schema[key]
+        if schema.get("enum"):
+            return schema["enum"][0]
+        for combinator in ("allOf", "oneOf", "anyOf"):
+            if schema.get(combinator):
+                if combinator == "allOf":
+                    merged: Dict[str, Any] = {}
+                    for part in schema["allOf"]:
+                        value = self._example(part, depth + 1, seen)
+                        if isinstance(value, dict):
+                            merged.update(value)
+                    return merged
+                return self._example(schema[combinator][0], depth + 1, seen)
+
+        schema_type = schema.get("type")
+        if schema_type == "object" or "properties" in schema:
+            return {
+                name: self._example(prop, depth + 1, seen)
+                for name, prop in schema.get("properties", {}).items()
+            }
+        if schema_type == "array":
+            return [self._example(schema.get("items"), depth + 1, seen)]
+        if schema_type == "integer":
+            return schema.get("minimum", 1)
+        if schema_type == "number":
+            return float(schema.get("minimum", 1.0))
+        if schema_type == "boolean":
+            return True
+        if schema_type == "string":
+            return {
+                "email": "user@example.com",
+                "date": "2024-01-01",
+                "date-time": "2024-01-01T00:00:00Z",
+                "uuid": "00000000-0000-0000-0000-000000000000",
+                "uri": "https://example.com"
+            }.get(schema.get("format"), "string")
+        return None
+
+    def _deref(self, node: Any) -> Any:
+        if not isinstance(node, dict) or "$ref" not in node:
+            return node
+        ref = node["$ref"]
+        if ref not in self._resolved:
+            if not isinstance(ref, str) or not ref.startswith("#/"):
+                raise ValueError(f"Only local $ref pointers are supported: {ref}")
+            # Mark in progress so self-referencing schemas terminate
+            self._resolved[ref] = {}
+            try:
+                self._resolved[ref] = self._deref(self._pointer(ref))
+            except ValueError:
+                # Later lookups must fail too, not see the placeholder
+                del self._resolved[ref]
+                raise
+        return self._resolved[ref]
+
+    def _pointer(self, ref: str) -> Any:
+        target: Any = self.spec
+        try:
+            for part in ref[2:].split("/"):
+                part = part.replace("~1", "/").replace("~0", "~")
+                target = target[int(part)] if isinstance(target, list) else target[part]
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise ValueError(f"Unresolvable $ref {ref}") from None
+        return target
+
+    def _request_schema(
+        self,
+        operation: Dict[str, Any],
+        parameters: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        if self.is_swagger2:
+            for param in parameters:
+                if param.get("in") == "body":
+                    return self._deref(param.get("schema"))
+            return None
+        body = self._deref(operation.get("requestBody", {}))
+        return self._json_schema(body.get("content", {}))
+
+    def _success_response(self, operation: Dict[str, Any]) -> Tuple[int, Optional[Dict[str, Any]]]:
+        responses = operation.get("responses", {})
+        for code, response in sorted(responses.items(), key=lambda item: str(item[0])):
+            code = str(code)
+            if code.startswith("2") and code.isdigit():
+                response = self._deref(response)
+                if self.is_swagger2:
+                    return int(code), self._deref(response.get("schema"))
+                return int(code), self._json_schema(response.get("content", {}))
+        return 200, None
+
+    def _json_schema(self, content: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        for media_type, media in content.items():
+            if "json" in media_type:
+                return self._deref(media.get("schema"))
+        return None
+
+    def _headers(self, operation: Dict[str, Any], parameters: List[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if operation.get("requestBody") or any(p.get("in") == "body" for p in parameters):
+            headers["Content-Type"] = "application/json"
+        for param in parameters:
+            if param.get("in") == "header" and param.get("required"):
+                headers[param["name"]] = str(self.example(param.get("schema", param)) or "")
+        return headers
+
+    def _context(
+        self,
+        parameters: List[Dict[str, Any]],
+        request_schema: Optional[Dict[str, Any]],
+        response_schema: Optional[Dict[str, Any]]
+    ) -> str:
+        parts = []
+        params = [
+            {"name": p.get("name"), "in": p.get("in"), "required": p.get("required", False)}
+            for p in parameters if p.get("in") != "body"
+        ]
+        if params:
+            parts.append(f"Parameters: {json.dumps(params, separators=(',', ':'))}")
+        if request_schema:
+            parts.append(f"Request schema: {self._compact(request_schema)}")
+        if response_schema:
+            parts.append(f"Response schema: {self._compact(response_schema)}")
+        return "\n".join(parts)[:settings.OPENAPI_CONTEXT_MAX_CHARS]
+
+    def _compact(self, schema: Dict[str, Any]) -> str:
+        return json.dumps(self._inline(schema, 0, frozenset()), separators=(",", ":"), default=str)
+
+    def _inline(self, schema: Any, depth: int, seen: frozenset, strip: bool = True) -> Any:
+        # Inline $refs so the model sees real field names; repeated refs stay as names
+        if isinstance(schema, dict) and "$ref" in schema:
+            ref = schema["$ref"]
+            if ref in seen:
+                return {"$ref": ref.rsplit("/", 1)[-1]}
+            seen = seen | {ref}
+            schema = self._deref(schema)
+        if depth > _MAX_EXAMPLE_DEPTH:
+            return "..."
+        if isinstance(schema, dict):
+            return {
+                k: self._inline(v, depth + 1, seen, strip)
+                for k, v in schema.items()
+                if not strip or k not in ("description", "example", "examples", "xml", "externalDocs")
+            }
+        if isinstance(schema, list):
+            return [self._inline(v, depth + 1, seen, strip) for v in schema]
+        return schema
+
+    @staticmethod
+    def _as_dict(value: Any) -> Optional[Dict]:
+        # ApiDetails only carries object bodies; wrap anything else
+        if value is None or isinstance(value, dict):
+            return value
+        return {"items": value} if isinstance(value, list) else {"value": value}
@@ -0,0 +1,143 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.services.scheduler import estimate_tokens
+from app.utils.logger import get_logger
+from app.utils.metrics import Counter, current_route
+
+logger = get_logger("prompt_budget")
+
+PROMPT_COMPACTION_TOKENS = Counter(
+    "prompt_compaction_tokens_total",
+    "Estimated tokens of JSON examples embedded in prompts, before and after compaction",
+    ("route", "kind")
+)
+
+def json_skeleton(value: Any) -> Any:
+    """
+    Reduce a JSON value to its shape: every scalar becomes its type name.
+
+    {"id": 7, "tags": ["a", "b"]} -> {"id": "integer", "tags": ["string"]}
+    """
+    if isinstance(value, dict):
+        return {key: json_skeleton(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [json_skeleton(value[0])] if value else []
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    return "null"
+
+def sample_json(value: Any, max_items: int, max_string_chars: int) -> Any:
+    """
+    Shrink a JSON value while keeping real example data.
+
+    Arrays keep their first `max_items` elements followed by a marker saying
+    how many were left out; strings longer than `max_string_chars` are cut.
+    Every object key is kept.
+    """
+    if isinstance(value, dict):
+        return {key: sample_json(item, max_items, max_string_chars) for key, item in value.items()}
+    if isinstance(value, list):
+        sampled = [sample_json(item, max_items, max_string_chars) for item in value[:max_items]]
+        if len(value) > max_items:
+            sampled.append(f"... {len(value) - max_items} more items")
+        return sampled
+    if isinstance(value, str) and len(value) > max_string_chars:
+        return f"{value[:max_string_chars]}... ({len(value) - max_string_chars} more chars)"
+    return value
+
+def compact_json(value: Any, max_tokens: int) -> Tuple[str, str]:
+    """
+    Render a JSON value for a prompt within `max_tokens`.
+
+    Tries progressively lossier renderings and returns the first that fits:
+    pretty-printed, minified, sampled (arrays and long strings shortened,
+    then shortened further), the schema skeleton, and finally the skeleton
+    cut to length.
+
+    Returns:
+        Tuple of (rendered text, name of the strategy used)
+    """
+    text = json.dumps(value, indent=2)
+    if estimate_tokens(text) <= max_tokens:
+        return text, "full"
+    text = _minify(value)
+    if estimate_tokens(text) <= max_tokens:
+        return text, "minified"
+    for max_items, max_chars in (
+        (settings.PROMPT_SAMPLE_ITEMS, settings.PROMPT_MAX_STRING_CHARS),
+        (1, settings.PROMPT_MAX_STRING_CHARS // 4)
+    ):
+        text = _minify(sample_json(value, max_items, max_chars))
+        if estimate_tokens(text) <= max_tokens:
+            return text, "sampled"
+    text = _minify(json_skeleton(value))
+    if estimate_tokens(text) <= max_tokens:
+        return text, "skeleton"
+    return text[:max(max_tokens * 4 - 16, 0)] + " ...(truncated)", "truncated"
+
+def fit_sections(
+    sections: Dict[str, Optional[Any]],
+    budget_tokens: int
+) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    Render several JSON prompt sections so that together they fit a token budget.
+
+    Sections that fit their fair share are kept whole and their unused share
+    goes to the larger ones, so a huge example response is compacted before
+    a small header map is touched. None/empty sections render as "None".
+
+    Args:
+        sections: Section name -> JSON value
+        budget_tokens: Tokens available for all sections together
+
+    Returns:
+        Tuple of (section name -> rendered text, compression report)
+    """
+    rendered: Dict[str, str] = {}
+    strategies: Dict[str, str] = {}
+    full: Dict[str, str] = {}
+    for name, value in sections.items():
+        if value:
+            full[name] = json.dumps(value, indent=2)
+        else:
+            rendered[name] = "None"
+
+    # Smallest first, each taking at most an equal share of what's left
+    remaining = max(budget_tokens, 0)
+    pending: List[str] = sorted(full, key=lambda name: len(full[name]))
+    while pending:
+        name = pending.pop(0)
+        share = remaining // (len(pending) + 1)
+        if estimate_tokens(full[name]) <= share:
+            rendered[name], strategies[name] = full[name], "full"
+        else:
+            rendered[name], strategies[name] = compact_json(sections[name], share)
+        remaining -= estimate_tokens(rendered[name])
+
+    original = sum(estimate_tokens(text) for text in full.values())
+    compacted = sum(estimate_tokens(rendered[name]) for name in full)
+    report = {
+        "original_tokens": original,
+        "compacted_tokens": compacted,
+        "compression_ratio": compacted / original if original else 1.0,
+        "strategies": strategies
+    }
+    route = current_route.get()
+    PROMPT_COMPACTION_TOKENS.inc(original, route=route, kind="original")
+    PROMPT_COMPACTION_TOKENS.inc(compacted, route=route, kind="compacted")
+    if compacted < original:
+        logger.info(
+            f"Compacted prompt examples from ~{original} to ~{compacted} tokens "
+            f"({report['compression_ratio']:.1%}): {strategies}"
+        )
+    return rendered, report
+
+def _minify(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
\ No newline at end of file
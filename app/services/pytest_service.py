@@ -0,0 +1,147 @@
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+from app.schemas.chatbot import PytestValidation
+from app.services.llm_service import llm_service
+from app.services.model_router import model_router
+from app.utils.logger import get_logger
+from app.utils.metrics import Counter, current_route, stage
+from app.utils.pytest_utils import validate_pytest
+
+logger = get_logger("pytest_service")
+
+PYTEST_OUTCOMES = Counter(
+    "pytest_postprocess_total",
+    "Generated pytest files by post-processing outcome (valid, fixed_locally, repaired, invalid)",
+    ("route", "outcome")
+)
+
+class PytestService:
+    """
+    Generates pytest files and checks them before they are returned.
+
+    Model output is cleaned and analysed locally first (see
+    validate_pytest). Only when problems remain is a repair prompt listing
+    them sent to the LLM, which is much cheaper than regenerating the file.
+    If the file is still invalid after that, its answers are dropped from
+    the response cache and it is regenerated on the next model tier, if
+    any (LLM_ESCALATE_ON_INVALID).
+    """
+
+    async def generate(
+        self,
+        endpoint: str,
+        method: str,
+        base_url: str,
+        headers: Dict[str, str],
+        request_body: Optional[Dict] = None,
+        success_status_code: int = 200,
+        example_response: Optional[Dict] = None,
+        bypass_cache: bool = False
+    ) -> Tuple[str, PytestValidation]:
+        """
+        Generate a pytest file and validate it.
+
+        Takes the same arguments as LLMService.generate_pytest_code.
+
+        Returns:
+            Tuple of (final code, validation report)
+        """
+        models = model_router.route("pytest")
+        if not settings.LLM_ESCALATE_ON_INVALID:
+            models = models[:1]
+        for position, model in enumerate(models):
+            try:
+                raw = await llm_service.generate_pytest_code(
+                    endpoint=endpoint,
+                    method=method,
+                    base_url=base_url,
+                    headers=headers,
+                    request_body=request_body,
+                    success_status_code=success_status_code,
+                    example_response=example_response,
+                    bypass_cache=bypass_cache,
+                    model=model
+                )
+            except Exception:
+                model_router.record(model, "error")
+                raise
+            code, validation = await self.finalize(raw, bypass_cache, model, record=False)
+            if validation.valid:
+                model_router.record(model, "accepted")
+                break
+            # Still invalid after repair: don't serve this answer from the cache again
+            await llm_service.forget_pytest_code(
+                endpoint, method, base_url, headers,
+                request_body, success_status_code, example_response, model
+            )
+            if position == len(models) - 1:
+                model_router.record(model, "rejected")
+                break
+            model_router.record(model, "escalated")
+            logger.info(f"Pytest code from {model} is still invalid; regenerating with {models[position + 1]}")
+        self._record(validation)
+        return code, validation
+
+    async def finalize(
+        self,
+        raw: str,
+        bypass_cache: bool = False,
+        model: Optional[str] = None,
+        record: bool = True
+    ) -> Tuple[str, PytestValidation]:
+        """
+        Fix and validate model output, asking the LLM for a repair if needed.
+
+        The repaired file is kept only if it has fewer problems than the
+        locally fixed one.
+
+        Args:
+            raw: Model output
+            bypass_cache: Skip the response cache for the repair call
+            model: Model the repair prompt goes to (default: the pytest starting tier)
+            record: Count the outcome in pytest_postprocess_total
+
+        Returns:
+            Tuple of (final code, validation report)
+        """
+        with stage("pytest_validate"):
+            code, validation = validate_pytest(raw)
+        if validation.valid or not settings.PYTEST_REPAIR_ENABLED:
+            if record:
+                self._record(validation)
+            return code, validation
+
+        logger.info(f"Generated pytest code needs repair: {validation.issues}")
+        try:
+            repaired_raw = await llm_service.repair_pytest_code(code, validation.issues, bypass_cache, model)
+        except Exception as e:
+            logger.warning(f"Pytest repair failed, returning unrepaired code: {str(e)}")
+            if record:
+                self._record(validation)
+            return code, validation
+
+        with stage("pytest_validate"):
+            repaired, repaired_validation = validate_pytest(repaired_raw)
+        if not repaired_validation.valid:
+            await llm_service.forget_pytest_repair(code, validation.issues, model)
+        if len(repaired_validation.issues) < len(validation.issues):
+            repaired_validation.llm_repaired = True
+            repaired_validation.fixes = validation.fixes + repaired_validation.fixes
+            code, validation = repaired, repaired_validation
+        if record:
+            self._record(validation)
+        return code, validation
+
+    @staticmethod
+    def _record(validation: PytestValidation) -> None:
+        if validation.issues:
+            outcome = "invalid"
+        elif validation.llm_repaired:
+            outcome = "repaired"
+        elif validation.fixes:
+            outcome = "fixed_locally"
+        else:
+            outcome = "valid"
+        PYTEST_OUTCOMES.inc(route=current_route.get(), outcome=outcome)
+
+pytest_service = PytestService()
\ No newline at end of file
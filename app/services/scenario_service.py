@@ -0,0 +1,354 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from app.core.config import settings
+from app.schemas.playground import EndpointRequest, EndpointResponse, ScenarioType, TestScenario
+from app.services.data_generator import LOCAL_SCENARIO_TYPES, LocalScenarioGenerator
+from app.services.llm_service import llm_service
+from app.services.scheduler import estimate_tokens
+from app.utils.logger import get_logger
+from app.utils.metrics import SCENARIOS, current_route, stage
+
+logger = get_logger("scenario_service")
+
+def to_test_scenarios(scenarios: List[Dict[str, str]]) -> List[TestScenario]:
+    """Convert raw LLM scenario dicts to TestScenario objects."""
+    with stage("scenario_build"):
+        result = [
+            TestScenario(
+                type=scenario["type"],
+                description=scenario["description"],
+                input=scenario["input"],
+                expected_output=scenario["expected_output"]
+            )
+            for scenario in scenarios
+        ]
+    _count_scenarios(result, "llm")
+    return result
+
+def _count_scenarios(scenarios: List[TestScenario], source: str) -> None:
+    route = current_route.get()
+    for scenario in scenarios:
+        SCENARIOS.inc(route=route, scenario_type=scenario.type.value, source=source)
+
+def split_local_scenarios(
+    endpoint_request: EndpointRequest
+) -> Tuple[List[TestScenario], List[ScenarioType]]:
+    """
+    Generate the structured scenario types locally when possible.
+    
+    POSITIVE, NEGATIVE and EDGE_CASE scenarios are built by the rule engine
+    whenever the request carries a request_schema or example request_body.
+    
+    Args:
+        endpoint_request: Endpoint to generate scenarios for
+        
+    Returns:
+        Tuple of (locally generated scenarios, scenario types still needing the LLM)
+    """
+    generator = None
+    if settings.LOCAL_GENERATION_ENABLED:
+        generator = LocalScenarioGenerator.from_request(
+            endpoint_request.request_schema,
+            endpoint_request.request_body,
+            endpoint_request.seed
+        )
+    if generator is None:
+        return [], list(endpoint_request.scenario_types)
+    
+    local_types = [t for t in endpoint_request.scenario_types if t in LOCAL_SCENARIO_TYPES]
+    llm_types = [t for t in endpoint_request.scenario_types if t not in LOCAL_SCENARIO_TYPES]
+    with stage("local_generation"):
+        local_scenarios = generator.generate(local_types)
+    _count_scenarios(local_scenarios, "local")
+    return local_scenarios, llm_types
+
+async def generate_endpoint_scenarios(
+    endpoint_request: EndpointRequest,
+    bypass_cache: bool = False,
+    context: Optional[str] = None
+) -> EndpointResponse:
+    """
+    Generate test scenarios for a single endpoint.
+    
+    Failures are reported on the returned EndpointResponse instead of
+    being raised, so one bad endpoint does not discard the rest of a batch.
+    
+    Args:
+        endpoint_request: Endpoint to generate scenarios for
+        bypass_cache: Skip the response cache for this endpoint
+        context: Optional schema details to ground the scenarios
+        
+    Returns:
+        EndpointResponse with the generated scenarios or an error message
+    """
+    logger.info(
+        "Generating scenarios for endpoint: {}",
+        endpoint_request.endpoint,
+        extra={
+            "endpoint": endpoint_request.endpoint,
+            "method": endpoint_request.method,
+            "scenario_types": endpoint_request.scenario_types
+        }
+    )
+    
+    try:
+        local_scenarios, llm_types = split_local_scenarios(endpoint_request)
+    except Exception as e:
+        logger.error(f"Error generating scenarios for {endpoint_request.endpoint}: {str(e)}")
+        return EndpointResponse(
+            endpoint=endpoint_request.endpoint,
+            method=endpoint_request.method,
+            error=str(e)
+        )
+    return await _complete_with_llm(endpoint_request, local_scenarios, llm_types, bypass_cache, context)
+
+async def _complete_with_llm(
+    endpoint_request: EndpointRequest,
+    local_scenarios: List[TestScenario],
+    llm_types: List[ScenarioType],
+    bypass_cache: bool,
+    context: Optional[str]
+) -> EndpointResponse:
+    try:
+        scenarios, diagnostics = [], []
+        if llm_types:
+            scenarios, diagnostics = await llm_service.generate_test_scenarios_with_diagnostics(
+                endpoint=endpoint_request.endpoint,
+                method=endpoint_request.method,
+                description=endpoint_request.description,
+                scenario_types=[t.value for t in llm_types],
+                bypass_cache=bypass_cache,
+                context=context
+            )
+        
+        return EndpointResponse(
+            endpoint=endpoint_request.endpoint,
+            method=endpoint_request.method,
+            scenarios=local_scenarios + to_test_scenarios(scenarios),
+            diagnostics=diagnostics
+        )
+        
+    except Exception as e:
+        logger.error(f"Error generating scenarios for {endpoint_request.endpoint}: {str(e)}")
+        return EndpointResponse(
+            endpoint=endpoint_request.endpoint,
+            method=endpoint_request.method,
+            scenarios=local_scenarios,
+            error=str(e)
+        )
+
+def estimate_scenario_tokens(
+    endpoint_request: EndpointRequest,
+    llm_types: List[ScenarioType],
+    context: Optional[str] = None
+) -> int:
+    """Rough prompt plus completion tokens one endpoint adds to a packed scenario prompt."""
+    prompt_tokens = estimate_tokens(
+        f"{endpoint_request.endpoint} {endpoint_request.description} {context or ''}"
+    ) + 30  # Block labels and scenario type names
+    return prompt_tokens + len(llm_types) * settings.SCENARIO_PACK_TOKENS_PER_TYPE
+
+# One endpoint waiting for the LLM: (input index, local scenarios, types still needed, estimated tokens)
+_PendingEndpoint = Tuple[int, List[TestScenario], List[ScenarioType], int]
+_DONE = object()
+
+class ScenarioBatch:
+    """
+    Generates scenarios for many endpoints, packing several into each LLM call.
+
+    Iterating a batch yields (input index, EndpointResponse) pairs in
+    completion order. Endpoints are prepared lazily: locally generated
+    scenario types are split off, endpoints needing nothing else are yielded
+    straight away, and the rest are grouped in order until the estimated
+    prompt plus completion tokens would pass SCENARIO_PACK_MAX_TOKENS or
+    the group holds SCENARIO_PACK_MAX_ENDPOINTS. Each group is sent as one
+    packed prompt; endpoints missing from the packed answer, or whose part
+    is invalid, fall back to a call of their own.
+
+    Groups wait in bounded queues, so memory stays proportional to
+    `concurrency` rather than to the batch size, and a slow consumer slows
+    generation down instead of buffering results.
+    """
+
+    def __init__(
+        self,
+        endpoint_requests: Sequence[EndpointRequest],
+        bypass_cache: bool = False,
+        contexts: Optional[Sequence[Optional[str]]] = None,
+        concurrency: Optional[int] = None
+    ):
+        self.endpoint_requests = endpoint_requests
+        self.bypass_cache = bypass_cache
+        self.contexts = contexts
+        self.concurrency = concurrency or settings.BATCH_CONCURRENCY
+        self.llm_calls = 0
+
+    async def __aiter__(self) -> AsyncIterator[Tuple[int, EndpointResponse]]:
+        # Results are buffered up to `slots`; the unbounded queue only ever
+        # holds that many plus the end marker, which must never block
+        results: asyncio.Queue = asyncio.Queue()
+        slots = asyncio.Semaphore(self.concurrency * 2)
+        groups: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+
+        async def emit(item: Tuple[int, EndpointResponse]) -> None:
+            await slots.acquire()
+            results.put_nowait(item)
+
+        async def worker() -> None:
+            while True:
+                group = await groups.get()
+                if group is None:
+                    return
+                await self._run_group(group, emit)
+
+        async def run() -> None:
+            workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            try:
+                await self._produce(groups, emit)
+                for _ in workers:
+                    await groups.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+                results.put_nowait(_DONE)
+
+        runner = asyncio.create_task(run())
+        try:
+            while True:
+                item = await results.get()
+                if item is _DONE:
+                    break
+                slots.release()
+                yield item
+            await runner  # Surface errors from preparation
+        finally:
+            runner.cancel()
+
+        logger.info(
+            f"Generated scenarios for {len(self.endpoint_requests)} endpoints with {self.llm_calls} LLM calls"
+        )
+
+    def _context(self, index: int) -> Optional[str]:
+        return self.contexts[index] if self.contexts else None
+
+    async def _produce(
+        self,
+        groups: asyncio.Queue,
+        emit: Callable[[Tuple[int, EndpointResponse]], Awaitable[None]]
+    ) -> None:
+        current: List[_PendingEndpoint] = []
+        current_tokens = 0
+
+        for index, endpoint_request in enumerate(self.endpoint_requests):
+            try:
+                local_scenarios, llm_types = split_local_scenarios(endpoint_request)
+            except Exception as e:
+                logger.error(f"Error generating scenarios for {endpoint_request.endpoint}: {str(e)}")
+                await emit((index, EndpointResponse(
+                    endpoint=endpoint_request.endpoint,
+                    method=endpoint_request.method,
+                    error=str(e)
+                )))
+                continue
+            if not llm_types:
+                await emit((index, EndpointResponse(
+                    endpoint=endpoint_request.endpoint,
+                    method=endpoint_request.method,
+                    scenarios=local_scenarios
+                )))
+                continue
+
+            cost = estimate_scenario_tokens(endpoint_request, llm_types, self._context(index))
+            if current and (
+                not settings.SCENARIO_PACK_ENABLED
+                or current_tokens + cost > settings.SCENARIO_PACK_MAX_TOKENS
+                or len(current) >= settings.SCENARIO_PACK_MAX_ENDPOINTS
+            ):
+                await groups.put(current)
+                current, current_tokens = [], 0
+            current.append((index, local_scenarios, llm_types, cost))
+            current_tokens += cost
+
+        if current:
+            await groups.put(current)
+
+    async def _run_single(self, pending: _PendingEndpoint) -> Tuple[int, EndpointResponse]:
+        index, local_scenarios, llm_types, _ = pending
+        self.llm_calls += 1
+        response = await _complete_with_llm(
+            self.endpoint_requests[index], local_scenarios, llm_types, self.bypass_cache, self._context(index)
+        )
+        return index, response
+
+    async def _run_group(
+        self,
+        group: List[_PendingEndpoint],
+        emit: Callable[[Tuple[int, EndpointResponse]], Awaitable[None]]
+    ) -> None:
+        if len(group) == 1:
+            await emit(await self._run_single(group[0]))
+            return
+
+        self.llm_calls += 1
+        packed: Dict[str, list] = {}
+        try:
+            packed = await llm_service.generate_packed_test_scenarios(
+                [
+                    {
+                        "id": f"op{index}",
+                        "endpoint": self.endpoint_requests[index].endpoint,
+                        "method": self.endpoint_requests[index].method.value,
+                        "description": self.endpoint_requests[index].description,
+                        "scenario_types": [t.value for t in llm_types],
+                        "context": self._context(index)
+                    }
+                    for index, _, llm_types, _ in group
+                ],
+                bypass_cache=self.bypass_cache
+            )
+        except Exception as e:
+            logger.warning(f"Packed generation failed, falling back to single calls: {str(e)}")
+
+        fallbacks = []
+        for pending in group:
+            index, local_scenarios, _, _ = pending
+            endpoint_request = self.endpoint_requests[index]
+            try:
+                if f"op{index}" in packed:
+                    await emit((index, EndpointResponse(
+                        endpoint=endpoint_request.endpoint,
+                        method=endpoint_request.method,
+                        scenarios=local_scenarios + to_test_scenarios(packed[f"op{index}"])
+                    )))
+                    continue
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Discarding packed scenarios for {endpoint_request.endpoint}: {str(e)}")
+            # Not in the packed answer, or its part was invalid
+            fallbacks.append(self._run_single(pending))
+        for result in await asyncio.gather(*fallbacks):
+            await emit(result)
+
+async def generate_scenarios_packed(
+    endpoint_requests: Sequence[EndpointRequest],
+    bypass_cache: bool = False,
+    contexts: Optional[Sequence[Optional[str]]] = None
+) -> Tuple[List[EndpointResponse], int]:
+    """
+    Generate scenarios for many endpoints and collect them in request order.
+
+    See ScenarioBatch for how endpoints are packed into LLM calls.
+
+    Args:
+        endpoint_requests: Endpoints to generate scenarios for
+        bypass_cache: Skip the response cache
+        contexts: Optional schema context per endpoint, aligned with endpoint_requests
+
+    Returns:
+        Tuple of (one EndpointResponse per request in request order, LLM calls made)
+    """
+    batch = ScenarioBatch(endpoint_requests, bypass_cache, contexts)
+    responses: List[Optional[EndpointResponse]] = [None] * len(endpoint_requests)
+    async for index, response in batch:
+        responses[index] = response
+    return responses, batch.llm_calls
\ No newline at end of file
@@ -0,0 +1,417 @@
+import asyncio
+import functools
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+from app.core.config import settings
+from app.utils.logger import get_logger
+from app.utils.metrics import LLM_RETRIES, STAGE_LATENCY, Gauge, current_route
+
+logger = get_logger("scheduler")
+
+@functools.lru_cache(maxsize=None)
+def retryable_errors() -> Tuple[type, ...]:
+    """
+    Upstream errors worth retrying: rate limits, overload and transient server faults.
+
+    Resolved on first use so importing the app doesn't load the Google client libraries.
+    """
+    from google.api_core import exceptions as google_exceptions
+    return (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.BadGateway,
+        google_exceptions.GatewayTimeout,
+        google_exceptions.DeadlineExceeded,
+        asyncio.TimeoutError
+    )
+
+class LLMUnavailableError(Exception):
+    """Raised when a call can't be served: circuit open, deadline hit or retries exhausted."""
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at `rate_per_minute`.
+
+    Waiters are served in FIFO order, so a large request can't be starved
+    by a stream of small ones.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until `amount` tokens are available and take them."""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+    async def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+# How long one SQLite transaction waits for another process's write lock before backing off
+_BUSY_TIMEOUT_SECONDS = 0.5
+
+class SharedTokenBucket:
+    """
+    Token bucket kept in a SQLite file so every worker process draws from one quota.
+
+    Refill and take happen in a single IMMEDIATE transaction, so concurrent
+    processes can't both spend the same tokens. Transactions run in a
+    worker thread, so a worker holding the write lock never stalls the
+    event loop, and a lock held past a short busy timeout is retried after
+    an async sleep. Waiting happens outside the transaction; within a
+    process waiters are still served in FIFO order.
+    """
+
+    def __init__(self, name: str, db_path: Path, rate_per_minute: float, capacity: Optional[float] = None):
+        self.name = name
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            str(db_path), timeout=_BUSY_TIMEOUT_SECONDS, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS token_buckets ("
+            "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "INSERT OR IGNORE INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+            (name, self.capacity, time.time())
+        )
+        self._db_lock = threading.Lock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until `amount` tokens are available and take them."""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                _, wait = await self._take_async(amount)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    async def available(self) -> float:
+        return (await self._take_async(0))[0]
+
+    async def _take_async(self, amount: float) -> Tuple[float, float]:
+        """`_take` off the event loop, retried while another process holds the write lock."""
+        while True:
+            try:
+                return await asyncio.to_thread(self._take, amount)
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                await asyncio.sleep(random.uniform(0, _BUSY_TIMEOUT_SECONDS))
+
+    def _take(self, amount: float) -> Tuple[float, float]:
+        """Take `amount` tokens if possible; returns (tokens left, seconds to wait before retrying)."""
+        with self._db_lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, updated = self._db.execute(
+                    "SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                # Wall-clock time, since monotonic clocks aren't comparable across processes
+                now = time.time()
+                tokens = min(self.capacity, tokens + max(now - updated, 0) * self.rate)
+                if tokens >= amount:
+                    tokens -= amount
+                    wait = 0.0
+                else:
+                    wait = (amount - tokens) / self.rate
+                self._db.execute(
+                    "UPDATE token_buckets SET tokens = ?, updated_at = ? WHERE name = ?",
+                    (tokens, now, self.name)
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return tokens, wait
+
+def create_bucket(name: str, rate_per_minute: float) -> Union[TokenBucket, SharedTokenBucket]:
+    """
+    Build a rate-limit bucket for the backend selected by LLM_RATE_LIMIT_BACKEND.
+
+    With the "memory" backend each process gets an equal share of the quota,
+    so WORKERS processes together stay within it.
+    """
+    if settings.LLM_RATE_LIMIT_BACKEND == "memory":
+        return TokenBucket(rate_per_minute / max(settings.WORKERS, 1))
+    if settings.LLM_RATE_LIMIT_BACKEND == "sqlite":
+        return SharedTokenBucket(name, settings.LLM_RATE_LIMIT_DB_PATH, rate_per_minute)
+    raise ValueError(f"Unknown LLM_RATE_LIMIT_BACKEND: {settings.LLM_RATE_LIMIT_BACKEND}")
+
+class CircuitBreaker:
+    """
+    Stops calling upstream after repeated failures.
+
+    Opens after `failure_threshold` consecutive retryable failures, rejects
+    calls for `reset_seconds`, then lets a single trial call through
+    (half-open) to decide whether to close again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def cancel_trial(self) -> None:
+        """Release a half-open trial slot whose call never reached upstream."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.warning(f"Circuit opened after {self.failures} consecutive upstream failures")
+            self._opened_at = time.monotonic()
+
+class LLMScheduler:
+    """
+    Central admission control for Gemini calls.
+
+    Every attempt first takes one of LLM_MAX_CONCURRENCY local slots, then
+    passes a requests/min and tokens/min token bucket and the circuit
+    breaker, and only then starts its per-attempt timeout, so waiting
+    locally never counts as an upstream failure. Retryable errors are
+    retried with jittered exponential backoff until the call's overall
+    deadline; the slot is released during backoff.
+    """
+
+    def __init__(self):
+        # Shared with streams, so the limit covers every in-flight call of the process
+        self.slots = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        self.request_bucket = create_bucket("requests", settings.LLM_REQUESTS_PER_MINUTE)
+        self.token_bucket = create_bucket("tokens", settings.LLM_TOKENS_PER_MINUTE)
+        self.circuit = CircuitBreaker(
+            settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            settings.LLM_CIRCUIT_RESET_SECONDS
+        )
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.calls = 0
+        self.retries = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def admit(self, estimated_tokens: int, deadline: Optional[float] = None) -> None:
+        """
+        Wait for rate-limit capacity for one call.
+
+        Args:
+            estimated_tokens: Prompt plus expected completion tokens
+            deadline: Absolute time.monotonic() deadline for getting admitted
+
+        Raises:
+            LLMUnavailableError: If the circuit is open or the deadline passes while queued
+        """
+        if not self.circuit.allow():
+            self.rejected += 1
+            raise LLMUnavailableError("LLM temporarily unavailable: circuit breaker is open")
+
+        started = time.monotonic()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            timeout = None if deadline is None else max(deadline - started, 0)
+            await asyncio.wait_for(self._acquire(estimated_tokens), timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            self.circuit.cancel_trial()
+            raise LLMUnavailableError("LLM call deadline exceeded while waiting for rate limit")
+        except asyncio.CancelledError:
+            self.circuit.cancel_trial()
+            raise
+        finally:
+            self.queue_depth -= 1
+            waited = time.monotonic() - started
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            STAGE_LATENCY.observe(waited, route=current_route.get(), stage="llm_queue")
+        self.calls += 1
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        estimated_tokens: int,
+        deadline_seconds: Optional[float] = None
+    ) -> Any:
+        """
+        Run an upstream call under rate limiting, retries and the circuit breaker.
+
+        Args:
+            call: Zero-argument coroutine factory performing one attempt
+            estimated_tokens: Prompt plus expected completion tokens
+            deadline_seconds: Overall budget including queueing and retries;
+                defaults to LLM_DEADLINE_SECONDS
+
+        Returns:
+            The result of the first successful attempt
+
+        Raises:
+            LLMUnavailableError: If retries or the deadline are exhausted
+        """
+        deadline = time.monotonic() + (deadline_seconds or settings.LLM_DEADLINE_SECONDS)
+        attempt = 0
+
+        while True:
+            try:
+                return await self._attempt(call, estimated_tokens, deadline)
+            except retryable_errors() as e:
+                error = e
+
+            delay = self._backoff(attempt)
+            if attempt >= settings.LLM_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                raise LLMUnavailableError(
+                    f"LLM call failed after {attempt + 1} attempt(s): {type(error).__name__}: {str(error)}"
+                ) from error
+
+            attempt += 1
+            self.retries += 1
+            LLM_RETRIES.inc(route=current_route.get())
+            logger.warning(
+                f"Retryable LLM error ({type(error).__name__}), retry {attempt} in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def stats(self) -> Dict[str, Any]:
+        """Return queue, wait-time, retry and circuit breaker statistics."""
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "calls": self.calls,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "avg_wait_seconds": self.total_wait_seconds / (self.calls + self.rejected) if self.calls + self.rejected else 0.0,
+            "max_wait_seconds": self.max_wait_seconds,
+            "circuit_state": self.circuit.state,
+            "consecutive_failures": self.circuit.failures,
+            "requests_available": await self.request_bucket.available(),
+            "tokens_available": await self.token_bucket.available()
+        }
+
+    async def acquire_slot(self, deadline: Optional[float] = None) -> None:
+        """
+        Wait for a local concurrency slot; release it with `slots.release()`.
+
+        Args:
+            deadline: Absolute time.monotonic() deadline for getting a slot
+
+        Raises:
+            LLMUnavailableError: If the deadline passes while waiting
+        """
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            await asyncio.wait_for(self.slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            # Local congestion; upstream was never called, so the circuit isn't told
+            self.rejected += 1
+            raise LLMUnavailableError("LLM call deadline exceeded while waiting for a concurrency slot")
+
+    async def _attempt(self, call: Callable[[], Awaitable[Any]], estimated_tokens: int, deadline: float) -> Any:
+        """One upstream attempt; the attempt timeout starts only once a slot is held and the call is admitted."""
+        await self.acquire_slot(deadline)
+        try:
+            await self.admit(estimated_tokens, deadline)
+            timeout = min(settings.LLM_ATTEMPT_TIMEOUT_SECONDS, max(deadline - time.monotonic(), 0))
+            try:
+                result = await asyncio.wait_for(call(), timeout)
+            except asyncio.TimeoutError as e:
+                if timeout < settings.LLM_ATTEMPT_TIMEOUT_SECONDS:
+                    # Cut short by the call's deadline after queueing, not a slow upstream
+                    self.circuit.cancel_trial()
+                    raise LLMUnavailableError("LLM call deadline exceeded during the attempt") from e
+                self.circuit.record_failure()
+                raise
+            except retryable_errors():
+                self.circuit.record_failure()
+                raise
+            except asyncio.CancelledError:
+                self.circuit.cancel_trial()
+                raise
+            except Exception:
+                # Non-transient errors (bad request, auth) aren't the upstream's health problem
+                self.circuit.record_success()
+                raise
+            self.circuit.record_success()
+            return result
+        finally:
+            self.slots.release()
+
+    async def _acquire(self, estimated_tokens: int) -> None:
+        await self.request_bucket.acquire(1)
+        await self.token_bucket.acquire(estimated_tokens)
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        # Full jitter: uniform over [0, min(cap, base * 2^attempt)]
+        ceiling = min(settings.LLM_BACKOFF_MAX_SECONDS, settings.LLM_BACKOFF_BASE_SECONDS * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for rate limiting (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+llm_scheduler = LLMScheduler()
+
+Gauge("llm_queue_depth", "LLM calls waiting for rate-limit capacity", lambda: llm_scheduler.queue_depth)
+Gauge(
+    "llm_circuit_open", "1 while the LLM circuit breaker is rejecting calls",
+    lambda: llm_scheduler.circuit.state == CircuitBreaker.OPEN
+)
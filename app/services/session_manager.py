@@ -0,0 +1,113 @@
+import time
+import uuid
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.services.session_store import SessionStore, create_session_store
+from app.utils.logger import get_logger
+from app.utils.metrics import Gauge
+
+logger = get_logger("session_manager")
+
+class SessionManager:
+    """
+    Keeps bounded conversation state for /chatbot/chat.
+
+    The last SESSION_MAX_TURNS turns are kept verbatim (each truncated to
+    SESSION_TURN_MAX_CHARS). Older turns are folded into a list of one-line
+    digests capped at SESSION_SUMMARY_MAX_CHARS, so the context sent to the
+    LLM stays the same size however long the conversation runs. Details
+    extracted along the way (endpoint, method, last intent) are kept in
+    `context` so follow-up messages can refer back to them.
+    """
+
+    def __init__(self, store: SessionStore):
+        self.store = store
+
+    def get_or_create(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Load a session, or start a new one if it's unknown or expired.
+
+        Args:
+            session_id: Client-supplied id; a new id is generated when omitted
+
+        Returns:
+            The session dict
+        """
+        if session_id:
+            session = self.store.get(session_id)
+            if session is not None:
+                return session
+        now = time.time()
+        return {
+            "session_id": session_id or uuid.uuid4().hex,
+            "created_at": now,
+            "updated_at": now,
+            "turns": [],
+            "summary": [],
+            "context": {}
+        }
+
+    def add_turn(
+        self,
+        session: Dict[str, Any],
+        role: str,
+        content: str,
+        details: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Append a message to the session, compact old turns and save it.
+
+        Args:
+            session: Session from get_or_create
+            role: "user" or "assistant"
+            content: Message text
+            details: Extracted fields (e.g. intent, endpoint, method) to remember
+        """
+        turn: Dict[str, Any] = {"role": role, "content": content[:settings.SESSION_TURN_MAX_CHARS]}
+        if details:
+            known = {key: value for key, value in details.items() if value is not None}
+            turn["details"] = known
+            session["context"].update(known)
+        session["turns"].append(turn)
+        self._compact(session)
+        session["updated_at"] = time.time()
+        self.store.save(session)
+
+    def prompt_context(self, session: Dict[str, Any]) -> str:
+        """Render the bounded conversation history for inclusion in a prompt."""
+        parts = []
+        if session["context"]:
+            known = ", ".join(f"{key}={value}" for key, value in session["context"].items())
+            parts.append(f"Known details: {known}")
+        if session["summary"]:
+            parts.append("Earlier in the conversation:\n" + "\n".join(session["summary"]))
+        if session["turns"]:
+            parts.append("Recent messages:\n" + "\n".join(
+                f"{turn['role']}: {turn['content']}" for turn in session["turns"]
+            ))
+        return "\n\n".join(parts)
+
+    def delete(self, session_id: str) -> None:
+        """End a session."""
+        self.store.delete(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Session store size and eviction counters."""
+        return self.store.stats()
+
+    @staticmethod
+    def _compact(session: Dict[str, Any]) -> None:
+        turns = session["turns"]
+        summary = session["summary"]
+        while len(turns) > settings.SESSION_MAX_TURNS:
+            oldest = turns.pop(0)
+            digest = oldest["content"][:settings.SESSION_DIGEST_CHARS].replace("\n", " ")
+            if len(oldest["content"]) > settings.SESSION_DIGEST_CHARS:
+                digest += "..."
+            summary.append(f"{oldest['role']}: {digest}")
+        while summary and sum(len(line) for line in summary) > settings.SESSION_SUMMARY_MAX_CHARS:
+            summary.pop(0)
+
+session_manager = SessionManager(create_session_store())
+
+Gauge("chat_sessions", "Chat sessions currently stored", lambda: session_manager.store.count())
\ No newline at end of file
@@ -0,0 +1,179 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("session_store")
+
+class SessionStore(ABC):
+    """
+    Storage backend for chat sessions.
+
+    A session is a JSON-serializable dict (see SessionManager). Stores hold
+    at most `max_sessions`, evicting the least recently used first, and
+    expire sessions idle for longer than `ttl_seconds`.
+    """
+
+    def __init__(self, max_sessions: int, ttl_seconds: int):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self.expirations = 0
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the session, or None if it doesn't exist or has expired."""
+
+    @abstractmethod
+    def save(self, session: Dict[str, Any]) -> None:
+        """Insert or replace a session and mark it most recently used."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Remove a session."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored sessions."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and eviction counters."""
+        return {
+            "sessions": self.count(),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+class InMemorySessionStore(SessionStore):
+    """Process-local LRU session store; sessions are lost on restart."""
+
+    def __init__(self, max_sessions: int, ttl_seconds: int):
+        super().__init__(max_sessions, ttl_seconds)
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if time.time() - session["updated_at"] > self.ttl_seconds:
+                del self._sessions[session_id]
+                self.expirations += 1
+                return None
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def save(self, session: Dict[str, Any]) -> None:
+        with self._lock:
+            self._sessions[session["session_id"]] = session
+            self._sessions.move_to_end(session["session_id"])
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def count(self) -> int:
+        return len(self._sessions)
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Session store backed by a local SQLite file, so conversations survive restarts.
+
+    Several workers may share the file, so nothing about its contents is
+    cached in the process: each save purges expired sessions, inserts and
+    evicts the overflow (counted with SELECT COUNT(*)) in one IMMEDIATE
+    transaction.
+    """
+
+    def __init__(self, db_path: Path, max_sessions: int, ttl_seconds: int):
+        super().__init__(max_sessions, ttl_seconds)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_path), isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chat_sessions (
+                session_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS chat_sessions_updated ON chat_sessions (updated_at);
+            """
+        )
+        self._lock = threading.Lock()
+        logger.info(f"Session store persisted to {db_path}")
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, updated_at FROM chat_sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if time.time() - row[1] > self.ttl_seconds:
+                cursor = self._db.execute(
+                    "DELETE FROM chat_sessions WHERE session_id = ? AND updated_at = ?",
+                    (session_id, row[1])
+                )
+                self.expirations += cursor.rowcount
+                return None
+        return json.loads(row[0])
+
+    def save(self, session: Dict[str, Any]) -> None:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._db.execute(
+                    "DELETE FROM chat_sessions WHERE updated_at < ?",
+                    (time.time() - self.ttl_seconds,)
+                )
+                self.expirations += cursor.rowcount
+                self._db.execute(
+                    "INSERT OR REPLACE INTO chat_sessions (session_id, data, updated_at) VALUES (?, ?, ?)",
+                    (session["session_id"], json.dumps(session), session["updated_at"])
+                )
+                excess = self._db.execute("SELECT COUNT(*) FROM chat_sessions").fetchone()[0] - self.max_sessions
+                if excess > 0:
+                    # Least recently used first
+                    cursor = self._db.execute(
+                        "DELETE FROM chat_sessions WHERE session_id IN ("
+                        "SELECT session_id FROM chat_sessions ORDER BY updated_at LIMIT ?)",
+                        (excess,)
+                    )
+                    self.evictions += cursor.rowcount
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM chat_sessions").fetchone()[0]
+
+def create_session_store() -> SessionStore:
+    """Build the session store selected by SESSION_STORE_BACKEND."""
+    if settings.SESSION_STORE_BACKEND == "memory":
+        return InMemorySessionStore(settings.SESSION_MAX_SESSIONS, settings.SESSION_TTL_SECONDS)
+    if settings.SESSION_STORE_BACKEND == "sqlite":
+        return SQLiteSessionStore(
+            settings.SESSION_DB_PATH,
+            settings.SESSION_MAX_SESSIONS,
+            settings.SESSION_TTL_SECONDS
+        )
+    raise ValueError(f"Unknown SESSION_STORE_BACKEND: {settings.SESSION_STORE_BACKEND}")
\ No newline at end of file
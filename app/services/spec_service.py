@@ -0,0 +1,154 @@
+import asyncio
+from typing import List, Optional, Set
+from app.core.config import settings
+from app.schemas.chatbot import PytestGenerationResponse
+from app.schemas.openapi import SpecChanges, SpecOperation, SpecOperationResult, SpecRequest, SpecResponse
+from app.schemas.playground import EndpointResponse
+from app.services.artifact_service import artifact_service
+from app.services.openapi_parser import OpenAPIParser
+from app.services.pytest_service import pytest_service
+from app.services.scenario_service import generate_scenarios_packed
+from app.utils.logger import get_logger
+from app.utils.pytest_utils import suggest_filename
+
+logger = get_logger("spec_service")
+
+class SpecService:
+    """Generates scenarios (and optionally pytest files) for a whole OpenAPI spec."""
+
+    async def generate(self, request: SpecRequest) -> SpecResponse:
+        """
+        Parse a spec and generate scenarios for every operation in it.
+
+        In incremental mode, scenario sets and pytest files whose inputs
+        haven't changed since the last run of the same namespace are loaded
+        from GENERATED_DIR instead of generated; only the rest go to the
+        LLM. Artifacts of operations dropped from the spec are deleted.
+
+        Args:
+            request: SpecRequest with the spec document and options
+
+        Returns:
+            SpecResponse with one result per operation, in document order
+        """
+        parser = OpenAPIParser(request.spec)
+        operations = parser.operations(request.scenario_types, request.base_url)
+        if len(operations) > settings.MAX_JOB_SIZE:
+            raise ValueError(
+                f"Spec has {len(operations)} operations; the limit is {settings.MAX_JOB_SIZE}"
+            )
+
+        namespace = (request.namespace or parser.title) if request.incremental else None
+        # Incremental reuse is skipped when the caller asks to regenerate
+        reuse = namespace is not None and not request.bypass_cache
+        known = [artifact_service.known(namespace, op) for op in operations] if namespace else []
+        regenerated: Set[int] = set()
+        reused = 0
+
+        responses: List[Optional[EndpointResponse]] = [
+            artifact_service.load_scenarios(namespace, op) if reuse else None for op in operations
+        ]
+        pending = [index for index, response in enumerate(responses) if response is None]
+        reused += len(operations) - len(pending)
+        llm_calls = 0
+        if pending:
+            generated, llm_calls = await generate_scenarios_packed(
+                [operations[index].endpoint for index in pending],
+                request.bypass_cache,
+                [operations[index].context for index in pending]
+            )
+            for index, response in zip(pending, generated):
+                responses[index] = response
+                regenerated.add(index)
+                # Failures aren't recorded, so the next run retries them
+                if namespace and response.error is None and response.scenarios:
+                    artifact_service.save_scenarios(namespace, operations[index], response)
+
+        results = [
+            SpecOperationResult(
+                operation_id=operation.operation_id,
+                endpoint=response.endpoint,
+                method=response.method,
+                scenarios=response.scenarios,
+                error=response.error,
+                diagnostics=response.diagnostics
+            )
+            for operation, response in zip(operations, responses)
+        ]
+
+        if request.generate_pytest:
+            semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+            async def run_pytest(index: int, operation: SpecOperation) -> None:
+                nonlocal reused
+                stored = artifact_service.load_pytest(namespace, operation) if reuse else None
+                if stored is not None:
+                    results[index].pytest_code = stored
+                    reused += 1
+                    return
+                async with semaphore:
+                    await self._attach_pytest(results[index], operation, request.bypass_cache)
+                regenerated.add(index)
+                # Like failed scenario sets, invalid files aren't recorded, so the next run retries them
+                pytest_code = results[index].pytest_code
+                if namespace and pytest_code is not None and pytest_code.validation.valid:
+                    artifact_service.save_pytest(namespace, operation, pytest_code)
+
+            await asyncio.gather(*(run_pytest(i, op) for i, op in enumerate(operations)))
+
+        changes = None
+        if namespace:
+            changes = SpecChanges(
+                namespace=namespace,
+                removed=artifact_service.prune(namespace, (artifact_service.key(op) for op in operations)),
+                reused=reused
+            )
+            for index, operation in enumerate(operations):
+                if not known[index]:
+                    changes.added.append(artifact_service.key(operation))
+                elif index in regenerated:
+                    changes.changed.append(artifact_service.key(operation))
+                else:
+                    changes.unchanged.append(artifact_service.key(operation))
+            logger.info(
+                f"Incremental run of {namespace}: {len(changes.added)} added, {len(changes.changed)} changed, "
+                f"{len(changes.unchanged)} unchanged, {len(changes.removed)} removed"
+            )
+
+        return SpecResponse(
+            title=parser.title,
+            operation_count=len(operations),
+            llm_calls=llm_calls,
+            results=results,
+            changes=changes
+        )
+
+    async def _attach_pytest(
+        self,
+        result: SpecOperationResult,
+        operation: SpecOperation,
+        bypass_cache: bool
+    ) -> None:
+        details = operation.api_details
+        try:
+            code, validation = await pytest_service.generate(
+                endpoint=operation.endpoint.endpoint,
+                method=operation.endpoint.method.value,
+                base_url=details.base_url,
+                headers=details.headers,
+                request_body=details.request_body,
+                success_status_code=details.success_status_code,
+                example_response=details.example_response,
+                bypass_cache=bypass_cache
+            )
+            result.pytest_code = PytestGenerationResponse(
+                code=code,
+                filename=suggest_filename(f"{operation.endpoint.method.value.lower()}{operation.endpoint.endpoint}"),
+                test_count=validation.test_count,
+                validation=validation
+            )
+        except Exception as e:
+            logger.error(f"Error generating pytest code for {operation.operation_id}: {str(e)}")
+            result.error = result.error or f"Failed to generate pytest code: {str(e)}"
+
+spec_service = SpecService()
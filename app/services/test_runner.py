@@ -0,0 +1,278 @@
+import asyncio
+import os
+import re
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Tuple
+from app.core.config import settings
+from app.schemas.runner import Distribution, RunRequest, RunResponse, TestCaseResult, TestFile, TestOutcome
+from app.utils.logger import get_logger
+from app.utils.metrics import Counter, current_route
+from app.utils.pytest_utils import BASE_URL_ENV, SESSION_FIXTURE_CODE, test_node_ids, validate_pytest
+
+logger = get_logger("test_runner")
+
+RUNNER_TESTS = Counter(
+    "test_runner_tests_total",
+    "Generated tests executed by the runner, by outcome",
+    ("route", "outcome")
+)
+
+# Fallback fixtures for files that use but don't define them
+_CONFTEST = f'''import os
+import pytest
+import requests
+
+@pytest.fixture(scope="session")
+def base_url():
+    return os.environ["{BASE_URL_ENV}"]
+
+{SESSION_FIXTURE_CODE}'''
+# Keeps pytest from picking up configuration above the run directory
+_PYTEST_INI = """[pytest]
+filterwarnings =
+    ignore::pytest.PytestUnknownMarkWarning
+"""
+# The only server variables passed to the submitted code; locale and SYSTEMROOT keep the interpreter working
+_CHILD_ENV = ("PATH", "LANG", "LC_ALL", "SYSTEMROOT")
+
+class PytestRunner:
+    """
+    Runs generated pytest files against a target API.
+
+    Files are written to a temporary directory and their tests are split
+    into shards, each run by its own `python -m pytest` process. Each
+    process gets one session-scoped requests.Session, so connections are
+    reused across its tests. Results come from pytest's JUnit XML report.
+    At most TEST_RUNNER_WORKERS processes run at once, across all
+    concurrent runs.
+    """
+
+    def __init__(self):
+        self._slots = asyncio.Semaphore(settings.TEST_RUNNER_WORKERS)
+
+    async def run(self, request: RunRequest) -> RunResponse:
+        """
+        Run the test files and collect per-test results.
+
+        Args:
+            request: Files, target base_url and parallelism options
+
+        Returns:
+            RunResponse with counts, timings and a result per test
+        """
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (request.timeout_seconds or settings.TEST_RUNNER_TIMEOUT_SECONDS)
+
+        with tempfile.TemporaryDirectory(prefix="pytest-run-") as directory:
+            root = Path(directory)
+            (root / "conftest.py").write_text(_CONFTEST)
+            (root / "pytest.ini").write_text(_PYTEST_INI)
+            files = self._write_files(root, request.files)
+
+            shards = self._shard(files, request.workers or settings.TEST_RUNNER_WORKERS, request.distribution)
+            logger.info(
+                f"Running {sum(len(ids) for ids in files.values())} tests from {len(files)} file(s) "
+                f"against {request.base_url} in {len(shards)} worker(s)"
+            )
+            outcomes = await asyncio.gather(*(
+                self._run_shard(root, index, node_ids, request.base_url, deadline)
+                for index, node_ids in enumerate(shards)
+            ))
+
+        # Report tests in file and source order, not completion order
+        order = {node_id: position for position, node_id in enumerate(
+            node_id for node_ids in files.values() for node_id in node_ids
+        )}
+        results = sorted(
+            (result for shard_results, _ in outcomes for result in shard_results),
+            key=lambda result: order.get(_base_node_id(result.nodeid), len(order))
+        )
+        counts = {outcome: 0 for outcome in TestOutcome}
+        route = current_route.get()
+        for result in results:
+            counts[result.outcome] += 1
+            RUNNER_TESTS.inc(route=route, outcome=result.outcome.value)
+
+        response = RunResponse(
+            total=len(results),
+            passed=counts[TestOutcome.PASSED],
+            failed=counts[TestOutcome.FAILED],
+            errors=counts[TestOutcome.ERROR],
+            skipped=counts[TestOutcome.SKIPPED],
+            duration=round(time.perf_counter() - started, 3),
+            workers=len(shards),
+            timed_out=any(timed_out for _, timed_out in outcomes),
+            results=results
+        )
+        logger.info(
+            f"Test run finished in {response.duration:.2f}s: {response.passed} passed, {response.failed} failed, "
+            f"{response.errors} errors, {response.skipped} skipped"
+        )
+        return response
+
+    @staticmethod
+    def _write_files(root: Path, test_files: List[TestFile]) -> Dict[str, List[str]]:
+        """
+        Clean up and write the files; returns filename -> node ids to run.
+
+        Files go through the same post-processing as generated code, so raw
+        model output works too. A file whose tests can't be listed (it
+        doesn't parse) is run whole, so pytest reports the collection error.
+        """
+        files: Dict[str, List[str]] = {}
+        for test_file in test_files:
+            filename = _safe_filename(test_file.filename, files)
+            code, _ = validate_pytest(test_file.code)
+            (root / filename).write_text(code, encoding="utf-8")
+            files[filename] = test_node_ids(filename, code) or [filename]
+        return files
+
+    @staticmethod
+    def _shard(files: Dict[str, List[str]], workers: int, distribution: Distribution) -> List[List[str]]:
+        """Split node ids across at most `workers` shards, keeping source order within each shard."""
+        if distribution == Distribution.FILE:
+            # Largest files first, each to the least loaded shard
+            shards: List[List[str]] = [[] for _ in range(min(workers, len(files)))]
+            for filename in sorted(files, key=lambda name: -len(files[name])):
+                min(shards, key=len).extend(files[filename])
+            return [shard for shard in shards if shard]
+
+        node_ids = [node_id for ids in files.values() for node_id in ids]
+        count = min(workers, len(node_ids))
+        # Contiguous slices, so neighbouring tests (often create-then-check) stay together
+        size, extra = divmod(len(node_ids), count)
+        shards, start = [], 0
+        for index in range(count):
+            end = start + size + (1 if index < extra else 0)
+            shards.append(node_ids[start:end])
+            start = end
+        return shards
+
+    async def _run_shard(
+        self,
+        root: Path,
+        index: int,
+        node_ids: List[str],
+        base_url: str,
+        deadline: float
+    ) -> Tuple[List[TestCaseResult], bool]:
+        """Run one shard in a pytest process; returns (results, whether it timed out)."""
+        report = root / f".shard-{index}.xml"
+        loop = asyncio.get_running_loop()
+        output = b""
+        timed_out = False
+
+        async with self._slots:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return _missing(node_ids, [], "Run timed out before this worker started"), True
+
+            env = {key: os.environ[key] for key in _CHILD_ENV if key in os.environ}
+            env[BASE_URL_ENV] = base_url
+            env["PYTHONDONTWRITEBYTECODE"] = "1"
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "--continue-on-collection-errors",
+                "-o", "junit_family=xunit1", f"--junitxml={report}", "--rootdir", str(root),
+                *node_ids,
+                cwd=root,
+                env=env,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT
+            )
+            try:
+                output, _ = await asyncio.wait_for(process.communicate(), remaining)
+            except asyncio.TimeoutError:
+                timed_out = True
+                logger.warning(f"Test worker {index} timed out; killing it")
+            finally:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+        results = _parse_report(report) if report.exists() else []
+        if timed_out:
+            reason = "Run timed out"
+        else:
+            reason = f"No result reported by pytest (exit code {process.returncode}): " + _tail(
+                output.decode("utf-8", errors="replace")
+            )
+        return results + _missing(node_ids, results, reason), timed_out
+
+def _safe_filename(name: str, taken: Dict[str, List[str]]) -> str:
+    """A unique test_*.py name without directories."""
+    stem = re.sub(r"[^A-Za-z0-9_]+", "_", Path(name).stem).strip("_") or "generated"
+    if not stem.startswith("test_"):
+        stem = f"test_{stem}"
+    filename, number = f"{stem}.py", 2
+    while filename in taken:
+        filename, number = f"{stem}_{number}.py", number + 1
+    return filename
+
+def _base_node_id(node_id: str) -> str:
+    """Node id without parametrization: test_a.py::test_x[1] -> test_a.py::test_x."""
+    return node_id.split("[", 1)[0]
+
+def _tail(text: str) -> str:
+    limit = settings.TEST_RUNNER_MESSAGE_MAX_CHARS
+    return text if len(text) <= limit else "..." + text[-limit:]
+
+def _parse_report(path: Path) -> List[TestCaseResult]:
+    """Convert a JUnit XML report (xunit1 family, which has file attributes) to results."""
+    try:
+        tree = ET.parse(path)
+    except ET.ParseError as e:
+        logger.warning(f"Unreadable pytest report {path.name}: {str(e)}")
+        return []
+
+    results = []
+    for case in tree.iter("testcase"):
+        name = case.get("name", "")
+        filename = case.get("file") or ""
+        classname = case.get("classname", "")
+        module = filename[:-3].replace("/", ".") if filename.endswith(".py") else ""
+        cls = classname[len(module) + 1:] if module and classname.startswith(module + ".") else ""
+        if filename:
+            nodeid = "::".join(part for part in (filename, cls, name) if part)
+        else:
+            # Collection errors only carry the module path
+            filename = f"{classname.replace('.', '/')}.py" if classname else name
+            nodeid = filename
+
+        outcome, message = TestOutcome.PASSED, None
+        for tag, candidate in (("failure", TestOutcome.FAILED), ("error", TestOutcome.ERROR), ("skipped", TestOutcome.SKIPPED)):
+            element = case.find(tag)
+            if element is not None:
+                outcome = candidate
+                message = _tail((element.text or "").strip() or element.get("message", ""))
+                break
+        results.append(TestCaseResult(
+            nodeid=nodeid,
+            file=filename,
+            name=name,
+            outcome=outcome,
+            duration=float(case.get("time") or 0.0),
+            message=message
+        ))
+    return results
+
+def _missing(node_ids: List[str], results: List[TestCaseResult], reason: str) -> List[TestCaseResult]:
+    """Error results for requested tests pytest reported nothing about."""
+    reported = {_base_node_id(result.nodeid) for result in results} | {result.file for result in results}
+    return [
+        TestCaseResult(
+            nodeid=node_id,
+            file=node_id.split("::", 1)[0],
+            name=node_id.rsplit("::", 1)[-1],
+            outcome=TestOutcome.ERROR,
+            duration=0.0,
+            message=reason
+        )
+        for node_id in node_ids if node_id not in reported
+    ]
+
+pytest_runner = PytestRunner()
\ No newline at end of file
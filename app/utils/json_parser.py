@@ -0,0 +1,260 @@
+import json
+import re
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from app.schemas.playground import ScenarioType
+
+_FENCE_RE = re.compile(r"```[a-zA-Z0-9_-]*\s*\n?(.*?)```", re.DOTALL)
+_SCENARIO_FIELDS = ("type", "description", "input", "expected_output")
+_SCENARIO_TYPES = {t.value for t in ScenarioType}
+_EMPTY = object()  # Sentinel for "no element", since null is a valid JSON element
+
+def strip_code_fences(text: str) -> str:
+    """
+    Remove markdown code fences around LLM output.
+
+    Returns the body of the first fenced block if there is one, the text after
+    an unterminated opening fence, or the original text otherwise.
+    """
+    match = _FENCE_RE.search(text)
+    if match:
+        return match.group(1).strip()
+    stripped = text.strip()
+    if stripped.startswith("```"):
+        return stripped.split("\n", 1)[1] if "\n" in stripped else ""
+    return stripped
+
+class IncrementalJSONArrayParser:
+    """
+    Incrementally parses the elements of a top-level JSON array.
+
+    Feed text as it arrives (e.g. from a streamed LLM response); every
+    element is yielded as soon as its closing bracket is seen. Leading prose
+    and markdown fences before the array are skipped, and elements that fail
+    to parse are recorded in `errors` rather than aborting the stream.
+    """
+
+    def __init__(self):
+        self.errors: List[str] = []
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._element_start: Optional[int] = None
+        self._index = 0
+
+    @property
+    def started(self) -> bool:
+        """Whether the opening bracket of the array has been seen."""
+        return self._started
+
+    @property
+    def finished(self) -> bool:
+        """Whether the closing bracket of the array has been seen."""
+        return self._finished
+
+    def feed(self, chunk: str) -> Iterator[Any]:
+        """
+        Consume a chunk of text.
+
+        Args:
+            chunk: Next piece of the response
+
+        Yields:
+            Each array element completed by this chunk
+        """
+        self._buffer += chunk
+        while self._pos < len(self._buffer) and not self._finished:
+            char = self._buffer[self._pos]
+
+            if not self._started:
+                if char == "[":
+                    self._started = True
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+                if self._element_start is None:
+                    self._element_start = self._pos
+            elif char in "[{":
+                if self._element_start is None:
+                    self._element_start = self._pos
+                self._depth += 1
+            elif char in "]}":
+                if self._depth == 0:
+                    if char == "]":
+                        element = self._take_element(self._pos)
+                        if element is not _EMPTY:
+                            yield element
+                        self._finished = True
+                else:
+                    self._depth -= 1
+            elif char == "," and self._depth == 0:
+                element = self._take_element(self._pos)
+                if element is not _EMPTY:
+                    yield element
+            elif not char.isspace() and self._element_start is None:
+                self._element_start = self._pos
+
+            self._pos += 1
+
+        # Drop consumed text so memory stays bounded for long streams
+        if self._element_start is None and self._pos > 0:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        elif self._element_start is not None and self._element_start > 0:
+            self._buffer = self._buffer[self._element_start:]
+            self._pos -= self._element_start
+            self._element_start = 0
+
+    def close(self) -> None:
+        """Record an error if the stream ended inside an unfinished element."""
+        if self._element_start is not None and not self._finished:
+            self.errors.append(f"Element {self._index}: truncated before it was complete")
+
+    def _take_element(self, end: int) -> Any:
+        start = self._element_start
+        self._element_start = None
+        if start is None:
+            return _EMPTY
+        text = self._buffer[start:end].strip()
+        index = self._index
+        self._index += 1
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            self.errors.append(f"Element {index}: invalid JSON ({e.msg})")
+            return _EMPTY
+
+def extract_json(text: str, opening: str = "[") -> Any:
+    """
+    Extract the first JSON value starting with `opening` from LLM output.
+
+    Handles markdown fences and prose before or after the JSON.
+
+    Args:
+        text: Raw model output
+        opening: "[" for an array, "{" for an object
+
+    Returns:
+        The decoded JSON value
+
+    Raises:
+        json.JSONDecodeError: If no complete JSON value can be found
+    """
+    body = strip_code_fences(text)
+    try:
+        return json.loads(body)
+    except json.JSONDecodeError:
+        pass
+
+    decoder = json.JSONDecoder()
+    for candidate in (body, text):
+        start = candidate.find(opening)
+        while start != -1:
+            try:
+                value, _ = decoder.raw_decode(candidate, start)
+                return value
+            except json.JSONDecodeError:
+                start = candidate.find(opening, start + 1)
+    raise json.JSONDecodeError(f"No JSON value starting with '{opening}' found", text, 0)
+
+def normalize_scenario(entry: Any) -> Dict[str, str]:
+    """
+    Validate one scenario entry and coerce it to the TestScenario shape.
+
+    Non-string input/expected_output values are serialized to JSON, and
+    scenario types are normalized ("edge case" -> "EDGE_CASE").
+
+    Raises:
+        ValueError: If the entry can't be turned into a scenario
+    """
+    if not isinstance(entry, dict):
+        raise ValueError(f"expected an object, got {type(entry).__name__}")
+    missing = [field for field in _SCENARIO_FIELDS if field not in entry]
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(missing)}")
+    scenario_type = re.sub(r"[\s-]+", "_", str(entry["type"]).strip()).upper()
+    if scenario_type not in _SCENARIO_TYPES:
+        raise ValueError(f"unknown scenario type '{entry['type']}'")
+    normalized = {"type": scenario_type}
+    for field in _SCENARIO_FIELDS[1:]:
+        value = entry[field]
+        normalized[field] = value if isinstance(value, str) else json.dumps(value)
+    return normalized
+
+def parse_scenarios(text: str) -> Tuple[List[Dict[str, str]], List[str]]:
+    """
+    Recover every valid scenario from an LLM response.
+
+    The whole array is decoded when possible; otherwise complete elements
+    are salvaged incrementally from a truncated or malformed response.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        Tuple of (valid scenario dicts, diagnostics for discarded entries)
+    """
+    diagnostics: List[str] = []
+    try:
+        entries = extract_json(text, "[")
+        if not isinstance(entries, list):
+            entries = [entries]
+    except json.JSONDecodeError:
+        parser = IncrementalJSONArrayParser()
+        entries = list(parser.feed(strip_code_fences(text)))
+        parser.close()
+        diagnostics.extend(parser.errors)
+        if not parser.started:
+            diagnostics.append("No JSON array found in response")
+        elif not parser.finished:
+            diagnostics.append("Response array was not terminated; kept the complete entries")
+
+    scenarios = []
+    for index, entry in enumerate(entries):
+        try:
+            scenarios.append(normalize_scenario(entry))
+        except ValueError as e:
+            diagnostics.append(f"Scenario {index}: {str(e)}")
+    return scenarios, diagnostics
+
+
+class ScenarioStream:
+    """
+    Async iterator over scenarios parsed from a streamed LLM response.
+
+    Valid scenarios are yielded as soon as each object is complete; anything
+    discarded is reported in `diagnostics` once iteration finishes.
+    """
+
+    def __init__(self, chunks: AsyncIterator[str]):
+        self.chunks = chunks
+        self.diagnostics: List[str] = []
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, str]]:
+        parser = IncrementalJSONArrayParser()
+        index = 0
+        async for chunk in self.chunks:
+            for entry in parser.feed(chunk):
+                try:
+                    yield normalize_scenario(entry)
+                except ValueError as e:
+                    self.diagnostics.append(f"Scenario {index}: {str(e)}")
+                index += 1
+        parser.close()
+        self.diagnostics.extend(parser.errors)
+        if not parser.started:
+            self.diagnostics.append("No JSON array found in response")
+        elif not parser.finished:
+            self.diagnostics.append("Response array was not terminated; kept the complete entries")
@@ -1,52 +1,225 @@
+import copy
+import queue
+import random
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import Any, Dict, Optional
 from loguru import logger
 from app.core.config import settings
 
 # Remove default logger
 logger.remove()
 
-# Add console logger
-logger.add(
-    sys.stderr,
-    format=settings.LOG_FORMAT,
-    level=settings.LOG_LEVEL,
-    colorize=True
-)
-
-# Add file logger with rotation
-logger.add(
-    settings.LOG_FILE,
-    format=settings.LOG_FORMAT,
-    level=settings.LOG_LEVEL,
-    rotation=settings.LOG_MAX_SIZE,
-    retention=settings.LOG_BACKUP_COUNT,
-    compression="zip"
-)
-
-# Add error logger
-error_log_file = settings.LOG_DIR / "error.log"
-logger.add(
-    error_log_file,
-    format=settings.LOG_FORMAT,
-    level="ERROR",
-    rotation=settings.LOG_MAX_SIZE,
-    retention=settings.LOG_BACKUP_COUNT,
-    compression="zip"
-)
-
-# Add LLM interaction logger
-llm_log_file = settings.LOG_DIR / "llm.log"
-logger.add(
-    llm_log_file,
-    format=settings.LOG_FORMAT,
-    level="DEBUG",
-    rotation=settings.LOG_MAX_SIZE,
-    retention=settings.LOG_BACKUP_COUNT,
-    compression="zip",
-    filter=lambda record: "llm" in record["extra"]
-)
+# In async mode the real sinks live on a separate logger that only the
+# writer thread uses; request handlers just format and enqueue
+_writer = copy.deepcopy(logger) if settings.LOG_ASYNC else logger
+
+def _add_sinks(target) -> None:
+    # Add console logger
+    target.add(
+        sys.stderr,
+        format=settings.LOG_FORMAT,
+        level=settings.LOG_LEVEL,
+        colorize=True
+    )
+
+    # Add file logger with rotation
+    target.add(
+        settings.LOG_FILE,
+        format=settings.LOG_FORMAT,
+        level=settings.LOG_LEVEL,
+        rotation=settings.LOG_MAX_SIZE,
+        retention=settings.LOG_BACKUP_COUNT,
+        compression="zip"
+    )
+
+    # Add error logger
+    error_log_file = settings.LOG_DIR / "error.log"
+    target.add(
+        error_log_file,
+        format=settings.LOG_FORMAT,
+        level="ERROR",
+        rotation=settings.LOG_MAX_SIZE,
+        retention=settings.LOG_BACKUP_COUNT,
+        compression="zip"
+    )
+
+    # Add LLM interaction logger
+    llm_log_file = settings.LOG_DIR / "llm.log"
+    target.add(
+        llm_log_file,
+        format=settings.LOG_FORMAT,
+        level="DEBUG",
+        rotation=settings.LOG_MAX_SIZE,
+        retention=settings.LOG_BACKUP_COUNT,
+        compression="zip",
+        filter=lambda record: "llm" in record["extra"]
+    )
+
+class QueuedSink:
+    """
+    Bounded hand-off from request threads to a background writer thread.
+
+    Records are queued in the caller and written (including file rotation
+    and compression) by the writer thread. When the queue is full, records
+    below WARNING are dropped immediately; WARNING and above wait up to
+    LOG_QUEUE_BLOCK_SECONDS for space before being dropped.
+    """
+
+    def __init__(self, writer, max_records: int):
+        self._writer = writer
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(max_records)
+        self._thread = threading.Thread(target=self._drain, name="log-writer", daemon=True)
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.enqueue_seconds = 0.0
+        self._thread.start()
+
+    def __call__(self, message) -> None:
+        started = time.perf_counter()
+        record = message.record
+        try:
+            if record["level"].no >= 30:
+                self._queue.put(record, timeout=settings.LOG_QUEUE_BLOCK_SECONDS)
+            else:
+                self._queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+        self.enqueue_seconds += time.perf_counter() - started
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush queued records and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, drop counts and per-record enqueue overhead."""
+        return {
+            "mode": "async",
+            "queued": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "avg_enqueue_us": self.enqueue_seconds / self.enqueued * 1e6 if self.enqueued else 0.0
+        }
+
+    def _drain(self) -> None:
+        reported_drops = 0
+        while True:
+            record = self._queue.get()
+            if record is not None:
+                # Replay the original record so time, name and location are preserved
+                self._writer.patch(lambda r, original=record: r.update(original)).log(
+                    record["level"].name, record["message"]
+                )
+                self.written += 1
+            if self.dropped != reported_drops and (record is None or self._queue.empty()):
+                self._writer.bind(name="logger").warning(
+                    "Log queue full: dropped {} record(s)", self.dropped - reported_drops
+                )
+                reported_drops = self.dropped
+            if record is None:
+                return
+
+_add_sinks(_writer)
+
+queued_sink: Optional[QueuedSink] = None
+if settings.LOG_ASYNC:
+    queued_sink = QueuedSink(_writer, settings.LOG_QUEUE_SIZE)
+    # Only queue what some writer sink will keep: LOG_LEVEL and up, plus LLM records
+    min_level = logger.level(settings.LOG_LEVEL).no
+    logger.add(
+        queued_sink,
+        level="DEBUG",
+        format="{message}",
+        filter=lambda record: record["level"].no >= min_level or "llm" in record["extra"],
+        catch=True
+    )
+
+def log_stats() -> Dict[str, Any]:
+    """Logging pipeline statistics."""
+    return queued_sink.stats() if queued_sink else {"mode": "sync"}
+
+def shutdown_logging() -> None:
+    """Flush and stop the background writer, if any."""
+    if queued_sink:
+        queued_sink.stop()
+
+def truncate_payload(text: str) -> str:
+    """Cut an LLM prompt or response down to LOG_LLM_PAYLOAD_MAX_CHARS."""
+    limit = settings.LOG_LLM_PAYLOAD_MAX_CHARS
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} more chars]"
+
+def sample_llm_payload() -> bool:
+    """Decide whether one LLM call's prompt and response go to llm.log (LOG_LLM_PAYLOAD_SAMPLE_RATE)."""
+    return random.random() < settings.LOG_LLM_PAYLOAD_SAMPLE_RATE
+
+class BoundLogger:
+    """
+    Named logger whose `extra=` keyword binds context instead of being
+    passed to message formatting.
+
+    Keeps f-string messages containing braces (paths like /pets/{petId},
+    JSON in exception text) from breaking loguru's str.format call, and
+    makes `extra` keys visible to sink filters.
+    """
+
+    def __init__(self, bound):
+        self._logger = bound
+
+    def bind(self, **kwargs) -> "BoundLogger":
+        return BoundLogger(self._logger.bind(**kwargs))
+
+    def llm_payload(self, label: str, payload: str, sampled: bool) -> None:
+        """
+        Log a prompt or response to llm.log, truncated.
+
+        Args:
+            label: What the payload is, e.g. "Prompt" or "Response"
+            payload: Full text; truncated to LOG_LLM_PAYLOAD_MAX_CHARS
+            sampled: The call's sample_llm_payload() decision, shared by its
+                prompt and response so llm.log never holds only half a call
+        """
+        if not sampled:
+            return
+        self._logger.bind(llm=True).debug("{} ({} chars): {}", label, len(payload), truncate_payload(payload))
+
+    def _log(self, level: str, message: Any, args: tuple, kwargs: Dict[str, Any]) -> None:
+        target = self._logger
+        extra = kwargs.pop("extra", None)
+        if extra:
+            target = target.bind(**extra)
+        target.opt(depth=2).log(level, message, *args, **kwargs)
+
+    def debug(self, message: Any, *args, **kwargs) -> None:
+        self._log("DEBUG", message, args, kwargs)
+
+    def info(self, message: Any, *args, **kwargs) -> None:
+        self._log("INFO", message, args, kwargs)
+
+    def warning(self, message: Any, *args, **kwargs) -> None:
+        self._log("WARNING", message, args, kwargs)
+
+    def error(self, message: Any, *args, **kwargs) -> None:
+        self._log("ERROR", message, args, kwargs)
+
+    def critical(self, message: Any, *args, **kwargs) -> None:
+        self._log("CRITICAL", message, args, kwargs)
+
+    def exception(self, message: Any, *args, **kwargs) -> None:
+        target = self._logger
+        extra = kwargs.pop("extra", None)
+        if extra:
+            target = target.bind(**extra)
+        target.opt(exception=True, depth=1).error(message, *args, **kwargs)
 
 def get_logger(name: str):
     """Get a logger instance with the specified name."""
-    return logger.bind(name=name) 
\ No newline at end of file
+    return BoundLogger(logger.bind(name=name))
\ No newline at end of file
@@ -0,0 +1,258 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from fastapi import Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+# Route template of the request being handled, e.g. "/api/v1/playground/generate-scenarios".
+# Work spawned from a request (gathered tasks, background jobs) inherits it.
+current_route: ContextVar[str] = ContextVar("current_route", default="none")
+_endpoint_marks: ContextVar[Optional[Dict[str, float]]] = ContextVar("endpoint_marks", default=None)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """Monotonically increasing count, one series per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+class Gauge(_Metric):
+    """Point-in-time value read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], float]):
+        super().__init__(name, documentation)
+        self._function = function
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name} {float(self._function())}"]
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: [bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._series.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+class Registry:
+    """Holds every metric and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("route", "method", "status")
+)
+STAGE_LATENCY = Histogram(
+    "stage_duration_seconds", "Time spent per processing stage", ("route", "stage")
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "Prompt and completion tokens sent to/received from the LLM", ("route", "kind")
+)
+LLM_CACHE = Counter(
+    "llm_cache_requests_total", "LLM response cache lookups", ("route", "result")
+)
+LLM_RETRIES = Counter("llm_retries_total", "Retried LLM attempts", ("route",))
+ERRORS = Counter("errors_total", "Errors by route and stage", ("route", "stage"))
+SCENARIOS = Counter(
+    "scenarios_generated_total", "Scenarios returned", ("route", "scenario_type", "source")
+)
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a processing stage for the current route.
+
+    Errors raised inside the block are counted in errors_total.
+    """
+    route = current_route.get()
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        ERRORS.inc(route=route, stage=name)
+        raise
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - started, route=route, stage=name)
+
+def _timed_endpoint(call: Callable) -> Callable:
+    # Marks when the endpoint body starts and ends, so the route handler can
+    # attribute the time before it to validation and after it to serialization
+    if asyncio.iscoroutinefunction(call):
+        @wraps(call)
+        async def timed(*args, **kwargs):
+            marks = _endpoint_marks.get()
+            if marks is not None:
+                marks["start"] = time.perf_counter()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                if marks is not None:
+                    marks["end"] = time.perf_counter()
+        return timed
+
+    @wraps(call)
+    def timed_sync(*args, **kwargs):
+        marks = _endpoint_marks.get()
+        if marks is not None:
+            marks["start"] = time.perf_counter()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            if marks is not None:
+                marks["end"] = time.perf_counter()
+    return timed_sync
+
+class InstrumentedRoute(APIRoute):
+    """
+    APIRoute that records request latency plus validation and response
+    serialization stages for every endpoint on the router.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The request handler looks up dependant.call per request, so wrapping it here is enough
+        self.dependant.call = _timed_endpoint(self.dependant.call)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        route = self.path_format
+
+        async def timed_handler(request: Request) -> Response:
+            marks: Dict[str, float] = {}
+            route_token = current_route.set(route)
+            marks_token = _endpoint_marks.set(marks)
+            started = time.perf_counter()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except RequestValidationError:
+                status = 422
+                raise
+            except Exception as e:
+                status = getattr(e, "status_code", 500)
+                raise
+            finally:
+                finished = time.perf_counter()
+                if "start" in marks:
+                    STAGE_LATENCY.observe(marks["start"] - started, route=route, stage="validation")
+                    if "end" in marks:
+                        STAGE_LATENCY.observe(finished - marks["end"], route=route, stage="serialization")
+                elif status == 422:
+                    STAGE_LATENCY.observe(finished - started, route=route, stage="validation")
+                if status >= 500:
+                    ERRORS.inc(route=route, stage="request")
+                REQUEST_LATENCY.observe(finished - started, route=route, method=request.method, status=str(status))
+                _endpoint_marks.reset(marks_token)
+                current_route.reset(route_token)
+
+        return timed_handler
\ No newline at end of file
@@ -0,0 +1,392 @@
+import ast
+import builtins
+import re
+from typing import List, Optional, Set, Tuple
+from app.core.config import settings
+from app.schemas.chatbot import PytestValidation
+from app.utils.json_parser import strip_code_fences
+
+# Fixtures pytest itself provides
+_BUILTIN_FIXTURES = {
+    "request", "pytestconfig", "cache", "monkeypatch", "recwarn", "caplog",
+    "capsys", "capsysbinary", "capfd", "capfdbinary", "tmp_path", "tmp_path_factory",
+    "tmpdir", "tmpdir_factory", "record_property", "record_testsuite_property",
+    "doctest_namespace"
+}
+# Undefined names that can be fixed by adding an import
+_KNOWN_IMPORTS = {
+    "pytest": "import pytest",
+    "requests": "import requests",
+    "json": "import json",
+    "re": "import re",
+    "os": "import os",
+    "time": "import time",
+    "uuid": "import uuid",
+    "random": "import random",
+    "string": "import string",
+    "jsonschema": "import jsonschema",
+    "HTTPStatus": "from http import HTTPStatus",
+    "Mock": "from unittest.mock import Mock",
+    "MagicMock": "from unittest.mock import MagicMock",
+    "patch": "from unittest.mock import patch"
+}
+# Module-level requests functions that have a Session equivalent
+_REQUESTS_METHODS = {"get", "post", "put", "patch", "delete", "head", "options", "request"}
+# Generated tests read their target from this variable, so a runner can point them anywhere
+BASE_URL_ENV = "API_BASE_URL"
+SESSION_FIXTURE = "http_session"
+SESSION_FIXTURE_CODE = f'''@pytest.fixture(scope="session")
+def {SESSION_FIXTURE}():
+    with requests.Session() as session:
+        yield session
+'''
+_CODE_START_RE = re.compile(r"^(import |from |@|def |async def |class |#|\"\"\"|'''|[A-Za-z_][A-Za-z0-9_]* *=)")
+_BUILTINS = set(dir(builtins))
+
+def suggest_filename(endpoint: Optional[str]) -> str:
+    """Generate a test filename based on the endpoint path."""
+    endpoint_name = endpoint or "unknown"
+    return f"test_{re.sub(r'[^A-Za-z0-9]+', '_', endpoint_name).strip('_')}.py"
+
+def count_tests(code: str) -> int:
+    """Count test functions; falls back to a text search when the code doesn't parse."""
+    try:
+        return len(_test_functions(ast.parse(code)))
+    except SyntaxError:
+        return code.count("def test_")
+
+def test_node_ids(filename: str, code: str) -> List[str]:
+    """pytest node ids of the test functions in a file, in source order (empty if it doesn't parse)."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return []
+    node_ids = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"):
+            node_ids.append(f"{filename}::{node.name}")
+        elif isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            node_ids.extend(
+                f"{filename}::{node.name}::{item.name}" for item in node.body
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name.startswith("test")
+            )
+    return node_ids
+
+def validate_pytest(text: str) -> Tuple[str, PytestValidation]:
+    """
+    Clean up generated pytest code and check it statically.
+
+    Mechanical problems are fixed locally: markdown fences and surrounding
+    prose are removed, tabs are expanded, a truncated final statement is
+    dropped and missing standard imports are added. A literal base_url is
+    made overridable through API_BASE_URL and, with PYTEST_SHARED_SESSION,
+    requests are routed through a shared session fixture (see
+    share_http_session). What can't be fixed
+    locally (syntax errors, undefined fixtures or names, no tests) is
+    listed in `issues`.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        Tuple of (cleaned code, validation report)
+    """
+    fixes: List[str] = []
+    code = strip_code_fences(text)
+    if code != text.strip():
+        fixes.append("Removed markdown code fences")
+
+    tree, code, error = _parse_with_fixes(code, fixes)
+    if tree is None:
+        return code, PytestValidation(valid=False, test_count=count_tests(code), fixes=fixes, issues=[error])
+
+    code, changed = read_base_url_from_env(code, tree)
+    if changed:
+        tree = ast.parse(code)
+        fixes.append(f"base_url fixture reads {BASE_URL_ENV}")
+    if settings.PYTEST_SHARED_SESSION:
+        code, session_fixes = share_http_session(code, tree)
+        if session_fixes:
+            tree = ast.parse(code)
+            fixes.extend(session_fixes)
+
+    issues: List[str] = []
+    undefined = _undefined_names(tree)
+    addable = sorted(name for name in undefined if name in _KNOWN_IMPORTS)
+    if addable:
+        code = _add_imports(code, tree, [_KNOWN_IMPORTS[name] for name in addable])
+        tree = ast.parse(code)
+        fixes.append(f"Added missing imports: {', '.join(addable)}")
+    issues.extend(f"Undefined name: {name}" for name in sorted(undefined - set(addable)))
+
+    tests = _test_functions(tree)
+    fixtures = _fixture_names(tree)
+    missing = set()
+    for function in tests + _fixture_functions(tree):
+        missing |= _requested_fixtures(function) - fixtures - _BUILTIN_FIXTURES
+    issues.extend(f"Undefined fixture: {name}" for name in sorted(missing))
+    if not tests:
+        issues.append("No test functions found")
+
+    return code, PytestValidation(
+        valid=not issues,
+        test_count=len(tests),
+        markers=sorted({marker for function in tests for marker in _markers(function)}),
+        fixtures=sorted(fixtures),
+        fixes=fixes,
+        issues=issues
+    )
+
+def share_http_session(code: str, tree: Optional[ast.Module] = None) -> Tuple[str, List[str]]:
+    """
+    Make tests reuse HTTP connections.
+
+    Calls like `requests.post(...)` in tests and fixtures become
+    `http_session.post(...)`, the functions making them request the
+    `http_session` fixture, and a session-scoped fixture yielding one
+    requests.Session is added if the file doesn't define it. Imports it
+    needs are added by validate_pytest afterwards.
+
+    Args:
+        code: pytest code that parses
+        tree: Its syntax tree, if already parsed
+
+    Returns:
+        Tuple of (code, descriptions of the changes made)
+    """
+    tree = tree or ast.parse(code)
+    fixtures = _fixture_names(tree)
+    bound = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load)}
+    if SESSION_FIXTURE in bound - fixtures:
+        return code, []  # The name means something else here
+
+    edits: List[Tuple[int, int, int, int, str]] = []
+    fixes: List[str] = []
+    rewritten = 0
+    for function in _test_functions(tree) + _fixture_functions(tree):
+        if function.name == SESSION_FIXTURE:
+            continue
+        calls = [
+            node.func.value for node in ast.walk(function)
+            if isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr in _REQUESTS_METHODS
+            and isinstance(node.func.value, ast.Name)
+            and node.func.value.id == "requests"
+        ]
+        if not calls:
+            continue
+        rewritten += len(calls)
+        edits.extend(
+            (name.lineno, name.col_offset, name.end_lineno, name.end_col_offset, SESSION_FIXTURE)
+            for name in calls
+        )
+        if SESSION_FIXTURE not in {arg.arg for arg in function.args.posonlyargs + function.args.args}:
+            edits.append(_add_parameter(code, function, SESSION_FIXTURE))
+
+    if rewritten:
+        fixes.append(f"Routed {rewritten} requests call(s) through the session-scoped {SESSION_FIXTURE} fixture")
+        if SESSION_FIXTURE not in fixtures:
+            line = _after_imports(tree)
+            edits.append((line + 1, 0, line + 1, 0, "\n" + SESSION_FIXTURE_CODE))
+
+    return (_apply_edits(code, edits) if edits else code), fixes
+
+def read_base_url_from_env(code: str, tree: Optional[ast.Module] = None) -> Tuple[str, bool]:
+    """
+    Make a `base_url` fixture that returns a string literal read API_BASE_URL first.
+
+    The literal stays as the default, so the file still works on its own,
+    while a runner can point it at another server.
+
+    Returns:
+        Tuple of (code, whether it was changed)
+    """
+    tree = tree or ast.parse(code)
+    for function in _fixture_functions(tree):
+        body = [node for node in function.body if not _is_docstring(node)]
+        if (
+            function.name == "base_url" and len(body) == 1 and isinstance(body[0], ast.Return)
+            and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str)
+        ):
+            value = body[0].value
+            return _apply_edits(code, [(
+                value.lineno, value.col_offset, value.end_lineno, value.end_col_offset,
+                f"os.environ.get({BASE_URL_ENV!r}, {value.value!r})"
+            )]), True
+    return code, False
+
+def _add_parameter(code: str, function: ast.AST, name: str) -> Tuple[int, int, int, int, str]:
+    """Edit adding `name` as the first parameter (after self/cls) of a function."""
+    args = function.args
+    positional = args.posonlyargs + args.args
+    if positional and positional[0].arg in ("self", "cls"):
+        first = positional[0]
+        return (first.end_lineno, first.end_col_offset, first.end_lineno, first.end_col_offset, f", {name}")
+    has_params = positional or args.vararg or args.kwonlyargs or args.kwarg
+    line = code.encode("utf-8").split(b"\n")[function.lineno - 1]
+    match = re.compile(rb"def\s+" + function.name.encode("utf-8") + rb"\s*\(").search(line, function.col_offset)
+    column = match.end() if match else function.col_offset
+    return (function.lineno, column, function.lineno, column, f"{name}, " if has_params else name)
+
+def _apply_edits(code: str, edits: List[Tuple[int, int, int, int, str]]) -> str:
+    """Replace (line, byte column, end line, end byte column) spans, as reported by ast, with new text."""
+    lines = code.encode("utf-8").split(b"\n")
+    for line, column, end_line, end_column, text in sorted(edits, reverse=True):
+        if line > len(lines):
+            lines.append(b"")
+        head = lines[line - 1][:column]
+        tail = lines[end_line - 1][end_column:]
+        lines[line - 1:end_line] = [head + text.encode("utf-8") + tail]
+    return b"\n".join(lines).decode("utf-8")
+
+def _after_imports(tree: ast.Module) -> int:
+    """Line number of the last top-level import (0 if there is none)."""
+    line = 0
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            line = node.end_lineno
+    return line
+
+def _is_docstring(node: ast.AST) -> bool:
+    return isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)
+
+def _parse_with_fixes(code: str, fixes: List[str]) -> Tuple[Optional[ast.Module], str, str]:
+    """Parse `code`, applying mechanical fixes until it parses; returns (tree or None, code, last error)."""
+    try:
+        return ast.parse(code), code, ""
+    except SyntaxError as e:
+        error = e
+
+    if "\t" in code:
+        candidate = code.expandtabs(4)
+        try:
+            tree = ast.parse(candidate)
+            fixes.append("Replaced tabs with spaces")
+            return tree, candidate, ""
+        except SyntaxError as e:
+            code, error = candidate, e
+
+    # Prose before the code, e.g. "Here is the test file:"
+    lines = code.splitlines()
+    start = next((i for i, line in enumerate(lines) if _CODE_START_RE.match(line)), 0)
+    if start:
+        candidate = "\n".join(lines[start:])
+        try:
+            tree = ast.parse(candidate)
+            fixes.append(f"Removed {start} line(s) of text before the code")
+            return tree, candidate, ""
+        except SyntaxError as e:
+            code, error, lines = candidate, e, candidate.splitlines()
+
+    # A truncated or prose-polluted tail: drop the top-level statement the error is in
+    if error.lineno:
+        cut = min(error.lineno, len(lines)) - 1
+        while cut > 0 and (not lines[cut].strip() or lines[cut][0].isspace()):
+            cut -= 1
+        while cut > 0 and lines[cut - 1].startswith("@"):
+            cut -= 1
+        candidate = "\n".join(lines[:cut]).rstrip() + "\n"
+        try:
+            tree = ast.parse(candidate)
+            if cut and _test_functions(tree):
+                fixes.append(f"Dropped unparsable code from line {cut + 1} on")
+                return tree, candidate, ""
+        except SyntaxError:
+            pass
+
+    return None, code, f"Syntax error on line {error.lineno}: {error.msg}"
+
+def _test_functions(tree: ast.Module) -> List[ast.AST]:
+    functions = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"):
+            functions.append(node)
+        elif isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            functions.extend(
+                item for item in node.body
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name.startswith("test")
+            )
+    return functions
+
+def _decorator_path(decorator: ast.AST) -> str:
+    """Dotted name of a decorator, without call arguments: @pytest.mark.x(1) -> "pytest.mark.x"."""
+    if isinstance(decorator, ast.Call):
+        decorator = decorator.func
+    parts = []
+    while isinstance(decorator, ast.Attribute):
+        parts.append(decorator.attr)
+        decorator = decorator.value
+    if isinstance(decorator, ast.Name):
+        parts.append(decorator.id)
+    return ".".join(reversed(parts))
+
+def _markers(function: ast.AST) -> List[str]:
+    paths = (_decorator_path(decorator) for decorator in function.decorator_list)
+    return [path.split(".", 2)[2] for path in paths if path.startswith("pytest.mark.")]
+
+def _fixture_functions(tree: ast.Module) -> List[ast.AST]:
+    return [
+        node for node in ast.walk(tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        and any(_decorator_path(d) in ("pytest.fixture", "fixture") for d in node.decorator_list)
+    ]
+
+def _fixture_names(tree: ast.Module) -> Set[str]:
+    names = set()
+    for function in _fixture_functions(tree):
+        names.add(function.name)
+        for decorator in function.decorator_list:
+            # @pytest.fixture(name="alias")
+            for keyword in getattr(decorator, "keywords", []):
+                if keyword.arg == "name" and isinstance(keyword.value, ast.Constant):
+                    names.add(str(keyword.value.value))
+    return names
+
+def _requested_fixtures(function: ast.AST) -> Set[str]:
+    """Arguments pytest will resolve as fixtures (not self, defaults or parametrized names)."""
+    args = function.args
+    positional = args.posonlyargs + args.args
+    without_default = positional[:len(positional) - len(args.defaults)]
+    names = {arg.arg for arg in without_default} - {"self", "cls"}
+    for decorator in function.decorator_list:
+        if _decorator_path(decorator) == "pytest.mark.parametrize" and decorator.args:
+            argnames = decorator.args[0]
+            if isinstance(argnames, ast.Constant) and isinstance(argnames.value, str):
+                names -= {name.strip() for name in argnames.value.split(",")}
+            elif isinstance(argnames, (ast.List, ast.Tuple)):
+                names -= {elt.value for elt in argnames.elts if isinstance(elt, ast.Constant)}
+    return names
+
+def _undefined_names(tree: ast.Module) -> Set[str]:
+    """Names read somewhere but never bound anywhere in the module (scope-insensitive)."""
+    bound: Set[str] = set()
+    loaded: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and any(alias.name == "*" for alias in node.names):
+            return set()  # Star imports make this undecidable
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            bound.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound.add(node.name)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            bound.update(node.names)
+        elif isinstance(node, ast.Name):
+            (loaded if isinstance(node.ctx, ast.Load) else bound).add(node.id)
+    return loaded - bound - _BUILTINS
+
+def _add_imports(code: str, tree: ast.Module, imports: List[str]) -> str:
+    """Insert import lines after the module docstring and any __future__ imports."""
+    line = 0
+    for node in tree.body:
+        is_docstring = _is_docstring(node)
+        is_future = isinstance(node, ast.ImportFrom) and node.module == "__future__"
+        if not (is_docstring or is_future):
+            break
+        line = node.end_lineno
+    lines = code.splitlines()
+    return "\n".join(lines[:line] + imports + lines[line:]) + "\n"
\ No newline at end of file
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import random
+import re
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+from google.api_core import exceptions as google_exceptions
+
+_TYPES_RE = re.compile(r"Scenario Types: (.+)")
+_PACKED_ID_RE = re.compile(r"^\[(op\d+)\]$", re.MULTILINE)
+
+@dataclass
+class FakeGeminiConfig:
+    """
+    Behaviour of the fake backend.
+
+    Latency is log-normal around `latency_ms` (time to first token) with
+    spread `latency_sigma`; output then arrives at `tokens_per_second`.
+    `error_rate` is the fraction of calls failing with a 503.
+    """
+
+    latency_ms: float = 800.0
+    latency_sigma: float = 0.3
+    tokens_per_second: float = 200.0
+    error_rate: float = 0.0
+    scenarios_per_type: int = 3
+    tests_per_file: int = 6
+    stream_chunk_tokens: int = 20
+    seed: int = 0
+
+class _Response:
+    def __init__(self, text: str, prompt_tokens: int):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=_tokens(text)
+        )
+
+class _Stream:
+    def __init__(self, model: "FakeGeminiModel", text: str):
+        self._model = model
+        self._text = text
+
+    def __aiter__(self) -> AsyncIterator[SimpleNamespace]:
+        return self._chunks()
+
+    async def _chunks(self) -> AsyncIterator[SimpleNamespace]:
+        size = self._model.config.stream_chunk_tokens * 4
+        for start in range(0, len(self._text), size):
+            piece = self._text[start:start + size]
+            await asyncio.sleep(_tokens(piece) / self._model.config.tokens_per_second)
+            yield SimpleNamespace(text=piece)
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+class FakeGeminiModel:
+    """
+    Drop-in stand-in for genai.GenerativeModel used by LLMService.
+
+    Answers scenario, packed-scenario and pytest prompts with well-formed
+    output of realistic size, so the whole request path is exercised
+    without calling the real API.
+    """
+
+    def __init__(self, config: FakeGeminiConfig, model_name: str = "models/fake-gemini"):
+        self.config = config
+        self.model_name = model_name
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(config.seed)
+
+    async def generate_content_async(
+        self,
+        prompt: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+        stream: bool = False
+    ) -> Any:
+        await asyncio.sleep(self._first_token_delay())
+        self._maybe_fail()
+        text = self._answer(prompt)
+        if stream:
+            return _Stream(self, text)
+        await asyncio.sleep(_tokens(text) / self.config.tokens_per_second)
+        return _Response(text, _tokens(prompt))
+
+    def generate_content(
+        self,
+        prompt: str,
+        generation_config: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        time.sleep(self._first_token_delay())
+        self._maybe_fail()
+        text = self._answer(prompt)
+        time.sleep(_tokens(text) / self.config.tokens_per_second)
+        return _Response(text, _tokens(prompt))
+
+    def _first_token_delay(self) -> float:
+        self.calls += 1
+        if self.config.latency_ms <= 0:
+            return 0.0
+        return self._random.lognormvariate(0, self.config.latency_sigma) * self.config.latency_ms / 1000
+
+    def _maybe_fail(self) -> None:
+        if self._random.random() < self.config.error_rate:
+            self.errors += 1
+            raise google_exceptions.ServiceUnavailable("fake backend overloaded")
+
+    def _answer(self, prompt: str) -> str:
+        if "pytest" in prompt:
+            return self._pytest_file()
+        ids = _PACKED_ID_RE.findall(prompt)
+        if ids:
+            types = _TYPES_RE.findall(prompt)
+            return json.dumps({
+                op_id: self._scenarios(t.split(", "))
+                for op_id, t in zip(ids, types)
+            })
+        match = _TYPES_RE.search(prompt)
+        return json.dumps(self._scenarios(match.group(1).split(", ") if match else ["POSITIVE"]))
+
+    def _scenarios(self, scenario_types: List[str]) -> List[Dict[str, str]]:
+        return [
+            {
+                "type": scenario_type.strip(),
+                "description": f"{scenario_type.strip().title()} case {i}: verify the endpoint handles this input",
+                "input": json.dumps({"id": i, "name": f"item-{i}", "tags": ["a", "b"]}),
+                "expected_output": "Status 200 with the created resource in the body"
+            }
+            for scenario_type in scenario_types
+            for i in range(self.config.scenarios_per_type)
+        ]
+
+    def _pytest_file(self) -> str:
+        tests = "\n\n".join(
+            f'''def test_case_{i}(api_url, headers):
+    response = requests.post(api_url, json={{"id": {i}}}, headers=headers)
+    assert response.status_code == 200
+    assert "id" in response.json()'''
+            for i in range(self.config.tests_per_file)
+        )
+        return f'''import pytest
+import requests
+
+@pytest.fixture
+def api_url():
+    return "http://localhost:8000/items"
+
+@pytest.fixture
+def headers():
+    return {{"Content-Type": "application/json"}}
+
+{tests}
+'''
\ No newline at end of file
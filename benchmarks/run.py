@@ -0,0 +1,273 @@
+"""
+Load-test the API in-process against a fake Gemini backend.
+
+Usage:
+    python -m benchmarks.run --target scenarios --requests 200 --concurrency 20
+    python -m benchmarks.run --target pytest --latency-ms 1500 --error-rate 0.05 \\
+        --compare benchmarks/results/baseline.json
+
+Requests go straight to the ASGI app (no sockets), so the numbers reflect
+the service itself: routing, validation, scheduling, parsing and
+serialization around a model with the configured latency, token rate and
+error rate. No API quota is used.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# The fake backend must not be throttled by limits sized for the real API,
+# and benchmark runs shouldn't persist cache or jobs between runs
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "1000000")
+os.environ.setdefault("LLM_TOKENS_PER_MINUTE", "1000000000")
+os.environ.setdefault("JOB_STORE_BACKEND", "memory")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.fake_gemini import FakeGeminiConfig, FakeGeminiModel  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "results"
+TARGETS = {
+    "scenarios": "/api/v1/playground/generate-scenarios",
+    "pytest": "/api/v1/chatbot/generate-pytest"
+}
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def _payload(target: str, index: int, args: argparse.Namespace) -> Dict[str, Any]:
+    # Distinct paths per request unless --repeat, so the response cache doesn't hide the backend
+    suffix = "" if args.repeat else f"/{index}"
+    if target == "scenarios":
+        return {
+            "endpoints": [
+                {
+                    "endpoint": f"/bench/items{suffix}/{n}",
+                    "method": "POST",
+                    "description": "Create an item in the benchmark catalogue",
+                    "scenario_types": args.scenario_types
+                }
+                for n in range(args.endpoints_per_batch)
+            ]
+        }
+    return {
+        "intent_data": {
+            "intent": "generate_tests",
+            "endpoint": f"/bench/items{suffix}",
+            "method": "POST",
+            "requires_details": False
+        },
+        "api_details": {
+            "base_url": "http://localhost:8000",
+            "headers": {"Content-Type": "application/json"},
+            "request_body": {"name": "item", "price": 9.99},
+            "success_status_code": 201,
+            "example_response": {"id": 1, "name": "item", "price": 9.99}
+        }
+    }
+
+async def _call(app, path: str, body: Dict[str, Any]) -> Tuple[int, int]:
+    """Send one POST through the ASGI app; returns (status, response bytes)."""
+    payload = json.dumps(body).encode()
+    sent = False
+    status = 0
+    size = 0
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await asyncio.Event().wait()  # Client never disconnects
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"benchmark"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode())
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80)
+    }
+    await app(scope, receive, send)
+    return status, size
+
+async def _run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.main import app, shutdown_event, startup_event
+    from app.services.llm_service import llm_service
+    from app.services.scheduler import llm_scheduler
+
+    model = FakeGeminiModel(FakeGeminiConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        seed=args.seed
+    ))
+    llm_service.model = model
+    await startup_event()
+
+    path = TARGETS[args.target]
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    response_bytes = 0
+
+    async def drive(first: int, count: int, measure: bool) -> float:
+        nonlocal response_bytes
+        indices = iter(range(first, first + count))
+
+        async def worker() -> None:
+            nonlocal response_bytes
+            for index in indices:
+                started = time.perf_counter()
+                status, size = await _call(app, path, _payload(args.target, index, args))
+                if measure:
+                    latencies.append(time.perf_counter() - started)
+                    statuses[str(status)] = statuses.get(str(status), 0) + 1
+                    response_bytes += size
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        return time.perf_counter() - started
+
+    if args.warmup:
+        await drive(0, args.warmup, measure=False)
+    if args.trace_memory:
+        tracemalloc.start()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    elapsed = await drive(args.warmup, args.requests, measure=True)
+
+    peak_traced = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+    if args.trace_memory:
+        tracemalloc.stop()
+    await shutdown_event()
+
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    return {
+        "latency_ms": {
+            "p50": _percentile(latencies, 50) * 1000,
+            "p95": _percentile(latencies, 95) * 1000,
+            "p99": _percentile(latencies, 99) * 1000,
+            "mean": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+            "max": max(latencies, default=0.0) * 1000
+        },
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "success_rate": ok / len(latencies) if latencies else 0.0,
+        "statuses": statuses,
+        "elapsed_seconds": elapsed,
+        "response_bytes": response_bytes,
+        "upstream_calls": model.calls,
+        "upstream_errors": model.errors,
+        "scheduler": await llm_scheduler.stats(),
+        "memory": {
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 ** 2 if sys.platform == "darwin" else 1024),
+            "rss_growth_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / (1024 ** 2 if sys.platform == "darwin" else 1024),
+            "traced_peak_mb": peak_traced / 1024 ** 2 if peak_traced is not None else None
+        }
+    }
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    rows = []
+    metrics = [
+        ("p50 ms", ("latency_ms", "p50")),
+        ("p95 ms", ("latency_ms", "p95")),
+        ("p99 ms", ("latency_ms", "p99")),
+        ("throughput rps", ("throughput_rps",)),
+        ("max RSS MB", ("memory", "max_rss_mb"))
+    ]
+    for label, keys in metrics:
+        new, old = current["results"], baseline["results"]
+        for key in keys:
+            new, old = new[key], old[key]
+        change = (new - old) / old * 100 if old else 0.0
+        rows.append(f"  {label:<16}{old:>12.2f} -> {new:>10.2f}  ({change:+.1f}%)")
+    return rows
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=sorted(TARGETS), default="scenarios")
+    parser.add_argument("--requests", type=int, default=100, help="Measured requests")
+    parser.add_argument("--warmup", type=int, default=0, help="Unmeasured requests sent first")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--endpoints-per-batch", type=int, default=1)
+    parser.add_argument("--scenario-types", nargs="+", default=["POSITIVE", "NEGATIVE", "SECURITY"])
+    parser.add_argument("--repeat", action="store_true", help="Send identical requests (exercises cache/coalescing)")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Median time to first token")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="Log-normal spread of latency")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of upstream calls returning 503")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true", help="Track Python allocations (slower)")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<target>-<time>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to diff against")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(_run(args))
+    report = {
+        "benchmark": args.target,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "config": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        "results": results
+    }
+
+    output = args.output or RESULTS_DIR / f"{args.target}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    latency = results["latency_ms"]
+    print(f"{args.target}: {args.requests} requests at concurrency {args.concurrency}")
+    print(f"  latency ms      p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  p99 {latency['p99']:.1f}")
+    print(f"  throughput      {results['throughput_rps']:.2f} req/s")
+    print(f"  success rate    {results['success_rate']:.1%}  {results['statuses']}")
+    print(f"  upstream calls  {results['upstream_calls']} ({results['upstream_errors']} failed)")
+    print(f"  max RSS         {results['memory']['max_rss_mb']:.1f} MB")
+    if args.compare:
+        print(f"Compared with {args.compare}:")
+        print("\n".join(_compare(report, json.loads(args.compare.read_text()))))
+    print(f"Saved {output}")
+    return report
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+import httpx
+import pytest
+
+# Settings are read when the app is first imported, so these must be set first.
+# Settings need a key at import time; these tests never call Gemini
+os.environ.setdefault("GEMINI_API_KEY", "test")
+# Keep log files out of the working tree
+_LOG_DIR = tempfile.mkdtemp(prefix="api-tests-logs-")
+os.environ.setdefault("LOG_DIR", _LOG_DIR)
+os.environ.setdefault("LOG_FILE", os.path.join(_LOG_DIR, "app.log"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Tests make far more calls than the default quota allows
+os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "1000000")
+
+# Generated test files target a live API; run them through /api/v1/runner/run instead
+collect_ignore = ["generated", "user_reg_testing.py"]
+
+class StubModel:
+    """
+    Stands in for genai.GenerativeModel.
+
+    Answers every prompt with `reply` (a string, or a function of the
+    prompt) after `delay` seconds, and records the prompts it was sent and
+    how many calls overlapped. Exceptions queued in `errors` are raised by
+    the next calls, one per call.
+    """
+
+    def __init__(self, reply: Union[str, Callable[[str], str]] = "[]", delay: float = 0.0):
+        self.reply = reply
+        self.delay = delay
+        self.prompts: List[str] = []
+        self.errors: List[BaseException] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def calls(self) -> int:
+        return len(self.prompts)
+
+    async def generate_content_async(
+        self,
+        prompt: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+        stream: bool = False
+    ) -> Any:
+        self._start(prompt)
+        try:
+            await asyncio.sleep(self.delay)
+            text = self._answer(prompt)
+        finally:
+            self.in_flight -= 1
+        return _Chunks(text) if stream else SimpleNamespace(text=text, usage_metadata=None)
+
+    def generate_content(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> Any:
+        self._start(prompt)
+        try:
+            time.sleep(self.delay)
+            text = self._answer(prompt)
+        finally:
+            self.in_flight -= 1
+        return SimpleNamespace(text=text, usage_metadata=None)
+
+    def _start(self, prompt: str) -> None:
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _answer(self, prompt: str) -> str:
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.reply(prompt) if callable(self.reply) else self.reply
+
+class _Chunks:
+    """A streamed answer, a few characters per chunk."""
+
+    def __init__(self, text: str, size: int = 16):
+        self.pieces = [text[start:start + size] for start in range(0, len(text), size)]
+
+    def __aiter__(self) -> AsyncIterator[SimpleNamespace]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[SimpleNamespace]:
+        for piece in self.pieces:
+            await asyncio.sleep(0)
+            yield SimpleNamespace(text=piece)
+
+@pytest.fixture(scope="session")
+def _loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture
+def run(_loop) -> Callable:
+    """
+    Run a coroutine to completion.
+
+    Every test shares one event loop, because the app's singletons hold
+    asyncio locks and semaphores that bind to the loop they are first used on.
+    """
+    return _loop.run_until_complete
+
+@pytest.fixture
+def llm():
+    """A StubModel answering for every model tier, with the cache and scheduler state reset."""
+    from app.services.cache import response_cache
+    from app.services.llm_service import llm_service
+    from app.services.scheduler import llm_scheduler
+
+    model = StubModel()
+    llm_service.model = model
+    llm_service._inflight.clear()
+    response_cache.clear()
+    llm_scheduler.circuit.record_success()
+    yield model
+    llm_service.model = None
+    response_cache.clear()
+    llm_scheduler.circuit.record_success()
+
+@pytest.fixture
+def api(run):
+    """An HTTP client for the app, on the shared event loop (startup hooks don't run)."""
+    from app.main import app
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    yield client
+    run(client.aclose())
\ No newline at end of file
@@ -0,0 +1,100 @@
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from app.core.config import settings
+from app.services.batch_runner import PYTEST, SCENARIOS, BatchRunner, Checkpoint, ResultWriter
+
+ROOT = Path(__file__).parent.parent
+SCENARIO_REPLY = '[{"type": "SECURITY", "description": "d", "input": "i", "expected_output": "o"}]'
+VALID = "import requests\n\ndef test_list():\n    assert requests.get"
+
+def endpoint(path: str) -> str:
+    return json.dumps({"endpoint": path, "method": "GET", "description": "d", "scenario_types": ["SECURITY"]})
+
+def pytest_request(path: str) -> str:
+    return json.dumps({
+        "intent_data": {"intent": "generate_tests", "endpoint": path, "method": "GET", "requires_details": False},
+        "api_details": {"base_url": "http://pets.test", "headers": {}, "success_status_code": 200}
+    })
+
+def process(run, tmp_path, kind: str, lines: list, out_dir: Path = None, **options):
+    """Run a batch over `lines`; returns (counts, result records by line)."""
+    checkpoint = Checkpoint(tmp_path / "run.ckpt")
+    output = tmp_path / "results.jsonl"
+    writer = ResultWriter(str(output), out_dir, append=bool(checkpoint.done))
+    try:
+        counts = run(BatchRunner(kind, writer, checkpoint, **options).run(io.StringIO("\n".join(lines) + "\n")))
+    finally:
+        writer.close()
+        checkpoint.close()
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    return counts, {record["line"]: record for record in records}
+
+@pytest.fixture(autouse=True)
+def unpacked(monkeypatch):
+    monkeypatch.setattr(settings, "SCENARIO_PACK_ENABLED", False)
+
+def test_scenarios_are_written_per_line_and_files_on_request(run, llm, tmp_path):
+    llm.reply = SCENARIO_REPLY
+    lines = [endpoint("/pets"), "", "{not json", endpoint("/owners")]
+    counts, records = process(run, tmp_path, SCENARIOS, lines, out_dir=tmp_path / "out", window=1)
+
+    assert counts == {"succeeded": 2, "failed": 0, "invalid": 1, "skipped": 0}
+    assert records[1]["result"]["endpoint"] == "/pets"
+    assert records[3]["error"].startswith("Invalid EndpointRequest")
+    assert sorted(path.name for path in (tmp_path / "out").iterdir()) == ["get_owners.json", "get_pets.json"]
+    assert json.loads(Path(records[4]["file"]).read_text())["endpoint"] == "/owners"
+
+def test_a_rerun_skips_finished_lines_and_retries_failures(run, llm, tmp_path):
+    llm.reply = lambda prompt: "not json" if "/owners" in prompt else SCENARIO_REPLY
+    lines = [endpoint("/pets"), endpoint("/owners")]
+    counts, records = process(run, tmp_path, SCENARIOS, lines)
+    assert counts == {"succeeded": 1, "failed": 1, "invalid": 0, "skipped": 0}
+    assert records[2]["error"]
+
+    llm.reply = SCENARIO_REPLY
+    counts, records = process(run, tmp_path, SCENARIOS, lines)
+    assert counts == {"succeeded": 1, "failed": 0, "invalid": 0, "skipped": 1}
+    # The resumed run appends to the earlier results
+    assert "error" not in records[2]
+
+    # An edited line counts as new
+    counts, _ = process(run, tmp_path, SCENARIOS, [endpoint("/pets"), endpoint("/owners/v2")])
+    assert counts["skipped"] == 1 and counts["succeeded"] == 1
+
+def test_a_torn_checkpoint_entry_is_ignored(tmp_path):
+    path = tmp_path / "run.ckpt"
+    path.write_text('{"line": 1, "sha": "abc"}\n{"line": 2, "sh')
+    checkpoint = Checkpoint(path)
+    checkpoint.add(3, "def")
+    checkpoint.close()
+    assert (1, "abc") in checkpoint
+    assert Checkpoint(path).done == {(1, "abc"), (3, "def")}
+
+def test_pytest_files_are_generated_with_bounded_concurrency(run, llm, tmp_path):
+    llm.reply = VALID
+    llm.delay = 0.01
+    lines = [pytest_request(f"/items/{index}") for index in range(6)] + [pytest_request("/items/0")]
+    counts, records = process(run, tmp_path, PYTEST, lines, out_dir=tmp_path / "out", concurrency=2, bypass_cache=True)
+
+    assert counts == {"succeeded": 7, "failed": 0, "invalid": 0, "skipped": 0}
+    assert llm.max_in_flight <= 2
+    assert records[1]["result"]["validation"]["valid"]
+    # The same file name from another line gets the line number appended
+    assert Path(records[7]["file"]).name == "test_get_items_0_7.py"
+    assert (tmp_path / "out" / "test_get_items_0.py").read_text() == VALID
+
+def test_the_cli_reports_invalid_input_with_a_failing_status(tmp_path):
+    source = tmp_path / "input.jsonl"
+    source.write_text('{"endpoint": "/pets"}\nnot json\n')
+    output = tmp_path / "results.jsonl"
+    completed = subprocess.run(
+        [sys.executable, "-m", "app.cli", "scenarios", str(source), "-o", str(output)],
+        cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+    assert completed.returncode == 1
+    assert "0 succeeded, 0 failed, 2 invalid, 0 skipped" in completed.stderr
+    assert [json.loads(line)["line"] for line in output.read_text().splitlines()] == [1, 2]
\ No newline at end of file
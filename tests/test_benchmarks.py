@@ -0,0 +1,97 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from google.api_core import exceptions as google_exceptions
+from app.core.config import settings
+from app.services.llm_service import llm_service
+from app.utils.json_parser import parse_scenarios
+from app.utils.pytest_utils import validate_pytest
+from benchmarks.fake_gemini import FakeGeminiConfig, FakeGeminiModel
+from benchmarks.run import _compare, _percentile
+
+ROOT = Path(__file__).parent.parent
+
+def fake(**overrides) -> FakeGeminiModel:
+    return FakeGeminiModel(FakeGeminiConfig(latency_ms=0, tokens_per_second=1e9, **overrides))
+
+def test_scenario_prompts_get_one_scenario_list_per_type(run):
+    model = fake(scenarios_per_type=2)
+    response = run(model.generate_content_async("Scenario Types: POSITIVE, SECURITY"))
+    scenarios, errors = parse_scenarios(response.text)
+    assert errors == []
+    assert [scenario["type"] for scenario in scenarios] == ["POSITIVE", "POSITIVE", "SECURITY", "SECURITY"]
+    assert response.usage_metadata.candidates_token_count > 0
+
+def test_packed_prompts_are_answered_per_operation(run):
+    prompt = "[op0]\nScenario Types: POSITIVE\n\n[op1]\nScenario Types: NEGATIVE, SECURITY"
+    answer = json.loads(run(fake(scenarios_per_type=1).generate_content_async(prompt)).text)
+    assert {op_id: [scenario["type"] for scenario in scenarios] for op_id, scenarios in answer.items()} == {
+        "op0": ["POSITIVE"],
+        "op1": ["NEGATIVE", "SECURITY"]
+    }
+
+def test_pytest_prompts_get_a_valid_test_file(run):
+    response = run(fake(tests_per_file=3).generate_content_async("Write pytest tests"))
+    _, validation = validate_pytest(response.text)
+    assert validation.valid
+    assert response.text.count("def test_case_") == 3
+
+def test_streams_arrive_in_chunks(run):
+    model = fake(stream_chunk_tokens=5)
+
+    async def collect():
+        stream = await model.generate_content_async("Write pytest tests", stream=True)
+        return [chunk.text async for chunk in stream]
+
+    chunks = run(collect())
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 20 for chunk in chunks)
+    _, validation = validate_pytest("".join(chunks))
+    assert validation.valid
+
+def test_errors_are_raised_at_the_configured_rate(run):
+    model = fake(error_rate=1.0)
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        run(model.generate_content_async("Scenario Types: POSITIVE"))
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        model.generate_content("Scenario Types: POSITIVE")
+    assert model.calls == model.errors == 2
+
+def test_the_app_runs_end_to_end_on_the_fake_backend(run, llm, api, monkeypatch):
+    monkeypatch.setattr(settings, "SCENARIO_PACK_ENABLED", False)
+    model = fake()
+    llm_service.model = model
+    body = {"endpoints": [{"endpoint": "/bench/items", "method": "POST", "description": "d", "scenario_types": ["POSITIVE"]}]}
+    response = run(api.post(f"{settings.API_V1_STR}/playground/generate-scenarios", json=body))
+    assert response.status_code == 200
+    assert len(response.json()["results"][0]["scenarios"]) == 3
+    assert model.calls == 1
+
+def test_percentile_and_compare():
+    assert _percentile([], 50) == 0.0
+    assert _percentile([3.0, 1.0, 2.0, 4.0], 50) == 2.0
+    assert _percentile([3.0, 1.0, 2.0, 4.0], 99) == 4.0
+    results = {"latency_ms": {"p50": 10.0, "p95": 20.0, "p99": 30.0}, "throughput_rps": 5.0, "memory": {"max_rss_mb": 100.0}}
+    faster = {"latency_ms": {"p50": 5.0, "p95": 20.0, "p99": 30.0}, "throughput_rps": 10.0, "memory": {"max_rss_mb": 100.0}}
+    rows = _compare({"results": faster}, {"results": results})
+    assert "(-50.0%)" in rows[0]
+    assert "(+100.0%)" in rows[3]
+
+def test_run_writes_a_report(tmp_path):
+    # A separate process: the runner starts and shuts down the app on its own event loop
+    output = tmp_path / "report.json"
+    completed = subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.run", "--requests", "6", "--concurrency", "3",
+            "--latency-ms", "0", "--tokens-per-second", "1000000", "--output", str(output)
+        ],
+        cwd=ROOT, capture_output=True, text=True, timeout=120
+    )
+    assert completed.returncode == 0, completed.stderr
+    report = json.loads(output.read_text())
+    assert report["benchmark"] == "scenarios"
+    assert report["results"]["statuses"] == {"200": 6}
+    assert report["results"]["success_rate"] == 1.0
+    assert report["results"]["upstream_calls"] >= 1
\ No newline at end of file
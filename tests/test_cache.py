@@ -0,0 +1,77 @@
+import sqlite3
+import time
+from app.services.cache import ResponseCache
+from app.services.llm_service import llm_service
+
+def test_make_key_depends_on_prompt_model_and_config():
+    key = ResponseCache.make_key("p", "m", {"temperature": 0.7})
+    assert key == ResponseCache.make_key("p", "m", {"temperature": 0.7})
+    assert key != ResponseCache.make_key("q", "m", {"temperature": 0.7})
+    assert key != ResponseCache.make_key("p", "n", {"temperature": 0.7})
+    assert key != ResponseCache.make_key("p", "m", {"temperature": 0.3})
+
+def test_memory_tier_evicts_least_recently_used(run):
+    cache = ResponseCache(max_entries=2)
+    run(cache.set("a", "1"))
+    run(cache.set("b", "2"))
+    assert run(cache.get("a")) == "1"
+    run(cache.set("c", "3"))
+    assert run(cache.get("b")) is None
+    assert run(cache.get("a")) == "1" and run(cache.get("c")) == "3"
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+def test_expired_entries_are_misses(run):
+    cache = ResponseCache(ttl_seconds=0)
+    run(cache.set("a", "1"))
+    time.sleep(0.01)
+    assert run(cache.get("a")) is None
+
+def test_sqlite_tier_survives_a_restart(run, tmp_path):
+    run(ResponseCache(db_path=tmp_path / "cache.db").set("a", "1"))
+    restarted = ResponseCache(db_path=tmp_path / "cache.db")
+    assert run(restarted.get("a")) == "1"
+    run(restarted.delete("a"))
+    assert run(ResponseCache(db_path=tmp_path / "cache.db").get("a")) is None
+
+def test_sqlite_tier_prunes_expired_and_excess_rows_on_write(run, tmp_path):
+    path = tmp_path / "cache.db"
+    cache = ResponseCache(db_path=path, max_db_entries=3)
+    with sqlite3.connect(path) as db:
+        db.execute("INSERT INTO llm_cache VALUES ('stale', 'x', ?)", (time.time() - 2 * cache.ttl_seconds,))
+    for index in range(5):
+        run(cache.set(f"k{index}", str(index)))
+
+    with sqlite3.connect(path) as db:
+        keys = {key for key, in db.execute("SELECT key FROM llm_cache")}
+    assert keys == {"k2", "k3", "k4"}
+
+def test_a_locked_sqlite_tier_does_not_hold_up_calls(run, tmp_path):
+    path = tmp_path / "cache.db"
+    cache = ResponseCache(db_path=path)
+    run(cache.set("a", "1"))
+    cache._entries.clear()
+
+    # Another worker holding the write lock
+    holder = sqlite3.connect(path, isolation_level=None)
+    holder.execute("BEGIN EXCLUSIVE")
+    try:
+        started = time.monotonic()
+        assert run(cache.get("a")) == "1"
+        run(cache.set("b", "2"))
+        assert time.monotonic() - started < 2
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+    # The write was skipped for the persistent tier only
+    assert run(cache.get("b")) == "2"
+    assert run(ResponseCache(db_path=path).get("b")) is None
+
+def test_repeated_calls_are_served_from_the_cache(run, llm):
+    llm.reply = "answer"
+    assert run(llm_service.generate_content_async("p")) == "answer"
+    assert run(llm_service.generate_content_async("p")) == "answer"
+    assert llm.calls == 1
+
+    assert run(llm_service.generate_content_async("p", bypass_cache=True)) == "answer"
+    assert run(llm_service.generate_content_async("p", temperature=0.1)) == "answer"
+    assert llm.calls == 3
\ No newline at end of file
@@ -0,0 +1,70 @@
+import asyncio
+from app.core.config import settings
+from app.services.llm_service import llm_service
+
+def test_identical_concurrent_calls_share_one_upstream_call(run, llm):
+    llm.delay = 0.02
+    llm.reply = "shared"
+    before = llm_service.coalesced_calls
+
+    async def fan_out():
+        return await asyncio.gather(*(llm_service.generate_content_async("same") for _ in range(5)))
+
+    assert run(fan_out()) == ["shared"] * 5
+    assert llm.calls == 1
+    assert llm_service.coalesced_calls - before == 4
+    assert llm_service._inflight == {}
+
+def test_different_parameters_are_not_coalesced(run, llm):
+    llm.delay = 0.02
+
+    async def fan_out():
+        return await asyncio.gather(
+            llm_service.generate_content_async("same"),
+            llm_service.generate_content_async("same", temperature=0.1),
+            llm_service.generate_content_async("other")
+        )
+
+    run(fan_out())
+    assert llm.calls == 3
+
+def test_a_cancelled_caller_does_not_fail_the_others(run, llm):
+    llm.delay = 0.05
+    llm.reply = "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(llm_service.generate_content_async("same"))
+        second = asyncio.ensure_future(llm_service.generate_content_async("same"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert run(scenario()) == ("done", True)
+    assert llm.calls == 1
+
+def test_errors_reach_every_caller_and_are_not_kept(run, llm):
+    llm.delay = 0.02
+    llm.errors.append(ValueError("bad request"))
+
+    async def fan_out():
+        return await asyncio.gather(
+            *(llm_service.generate_content_async("same") for _ in range(3)),
+            return_exceptions=True
+        )
+
+    results = run(fan_out())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert llm.calls == 1
+    # The next call goes upstream again
+    llm.reply = "recovered"
+    assert run(llm_service.generate_content_async("same")) == "recovered"
+
+def test_coalescing_can_be_disabled(run, llm, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_COALESCE_REQUESTS", False)
+    llm.delay = 0.02
+
+    async def fan_out():
+        return await asyncio.gather(*(llm_service.generate_content_async("same") for _ in range(3)))
+
+    run(fan_out())
+    assert llm.calls == 3
\ No newline at end of file
@@ -0,0 +1,85 @@
+import json
+from app.schemas.playground import ScenarioType
+from app.services.data_generator import LocalScenarioGenerator, infer_schema
+
+ALL_TYPES = [ScenarioType.POSITIVE, ScenarioType.NEGATIVE, ScenarioType.EDGE_CASE]
+
+USER = {
+    "type": "object",
+    "required": ["email", "age"],
+    "properties": {
+        "email": {"type": "string", "format": "email"},
+        "age": {"type": "integer", "minimum": 18, "maximum": 120},
+        "role": {"type": "string", "enum": ["admin", "member"]},
+        "name": {"type": "string", "minLength": 2, "maxLength": 20},
+        "address": {"type": "object", "required": ["city"], "properties": {"city": {"type": "string"}}}
+    }
+}
+
+def cases(schema, scenario_type, seed=1):
+    generated = LocalScenarioGenerator(schema, seed).generate([scenario_type])
+    return {scenario.description: json.loads(scenario.input) for scenario in generated}
+
+def test_output_is_reproducible_for_a_seed():
+    first = LocalScenarioGenerator(USER, 7).generate(ALL_TYPES)
+    assert first == LocalScenarioGenerator(USER, 7).generate(ALL_TYPES)
+    assert {scenario.type for scenario in first} == set(ALL_TYPES)
+
+def test_positive_cases_satisfy_the_schema():
+    positive = cases(USER, ScenarioType.POSITIVE)
+    full = positive["Valid request with all fields populated"]
+    assert 18 <= full["age"] <= 120 and "@" in full["email"] and 2 <= len(full["name"]) <= 20
+    assert set(positive["Valid request with only required fields"]) == {"email", "age"}
+    assert positive["Valid request with 'role' set to enum value 'member'"]["role"] == "member"
+
+def test_negative_cases_break_one_rule_each():
+    negative = cases(USER, ScenarioType.NEGATIVE)
+    assert negative["Empty request body"] == {}
+    assert "email" not in negative["Missing required field 'email'"]
+    assert negative["Wrong type for 'age' (expected integer)"]["age"] == "not-a-number"
+    assert negative["'age' below minimum 18"]["age"] == 17
+    assert negative["Value for 'role' outside the allowed enum"]["role"] == "__invalid_enum__"
+    assert len(negative["'name' one character longer than maxLength 20"]["name"]) == 21
+    assert "city" not in negative["Missing required field 'address.city'"]["address"]
+
+def test_edge_cases_probe_the_bounds():
+    edge = cases(USER, ScenarioType.EDGE_CASE)
+    assert edge["'age' at maximum 120"]["age"] == 120
+    assert len(edge["'name' at minLength 2"]["name"]) == 2
+    assert edge["Null value for optional field 'role'"]["role"] is None
+    assert "Null value for optional field 'email'" not in edge
+
+def test_no_empty_body_negative_without_required_fields():
+    # The empty body is then the valid minimal request
+    schema = {
+        "type": "object",
+        "properties": {"name": {"type": "string"}, "children": {"type": "array", "items": {"$ref": "Node"}}}
+    }
+    assert "Empty request body" not in cases(schema, ScenarioType.NEGATIVE)
+    assert cases(schema, ScenarioType.POSITIVE)["Valid request with only required fields"] == {}
+
+def test_openapi_31_type_lists_use_the_non_null_type():
+    schema = {
+        "type": "object",
+        "required": ["nickname"],
+        "properties": {
+            "nickname": {"type": ["string", "null"], "maxLength": 5},
+            "score": {"type": ["null", "integer"], "minimum": 0},
+            "note": {"type": ["null"]}
+        }
+    }
+    full = cases(schema, ScenarioType.POSITIVE)["Valid request with all fields populated"]
+    assert isinstance(full["nickname"], str) and isinstance(full["score"], int) and full["note"] is None
+    negative = cases(schema, ScenarioType.NEGATIVE)
+    assert negative["Wrong type for 'nickname' (expected string)"]["nickname"] == 12345
+    assert negative["'score' below minimum 0"]["score"] == -1
+
+def test_infer_schema_from_an_example_body():
+    schema = infer_schema({"email": "a@b.co", "tags": ["x"], "active": True, "score": 1.5})
+    assert schema["required"] == ["email", "tags", "active", "score"]
+    assert schema["properties"]["email"]["format"] == "email"
+    assert schema["properties"]["tags"] == {"type": "array", "items": {"type": "string", "example": "x"}}
+    assert schema["properties"]["active"]["type"] == "boolean"
+    assert LocalScenarioGenerator.from_request(None, None) is None
+    generator = LocalScenarioGenerator.from_request(request_body={"email": "a@b.co"})
+    assert generator.generate([ScenarioType.POSITIVE])[0].input == '{"email": "a@b.co"}'
\ No newline at end of file
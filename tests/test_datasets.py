@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+import pytest
+from pydantic import ValidationError
+from app.core.config import settings
+from app.schemas.dataset import DatasetFormat, GeneratorSpec
+from app.services.dataset_engine import DatasetEngine, stream_dataset
+from app.services.dataset_service import dataset_service
+
+ROUTE = f"{settings.API_V1_STR}/datasets"
+
+SPEC = {
+    "fields": [
+        {"name": "id", "type": "sequence", "minimum": 100},
+        {"name": "status", "type": "enum", "values": ["active", "closed"], "weights": [3, 1]},
+        {"name": "opened", "type": "date", "start": "2024-01-01", "end": "2024-12-31"},
+        {"name": "closed", "type": "date", "start": "2024-01-01", "end": "2024-12-31"},
+        {"name": "reason", "type": "text", "min_length": 2, "max_length": 4},
+        {"name": "price", "type": "number", "minimum": 1, "maximum": 10, "decimals": 2, "null_rate": 0.2},
+        {"name": "owner.email", "type": "email"}
+    ],
+    "constraints": [
+        {"type": "ordered", "fields": ["opened", "closed"]},
+        {"type": "null_unless", "fields": ["reason"], "when_field": "status", "when_values": ["closed"]}
+    ]
+}
+
+def records(rows: int, seed: int = 0, fmt: DatasetFormat = DatasetFormat.JSONL) -> str:
+    return b"".join(stream_dataset(GeneratorSpec.model_validate(SPEC), rows, fmt, seed)).decode()
+
+def test_records_follow_the_spec(monkeypatch):
+    monkeypatch.setattr(settings, "DATASET_CHUNK_ROWS", 64)
+    rows = [json.loads(line) for line in records(500).splitlines()]
+    assert len(rows) == 500
+    assert [row["id"] for row in rows] == list(range(100, 600))
+    assert {row["status"] for row in rows} == {"active", "closed"}
+    assert all(row["opened"] <= row["closed"] for row in rows)
+    assert all((row["reason"] is None) == (row["status"] != "closed") for row in rows)
+    prices = [row["price"] for row in rows if row["price"] is not None]
+    assert all(1 <= price <= 10 for price in prices)
+    assert 50 < len(rows) - len(prices) < 150
+    assert all("@" in row["owner"]["email"] for row in rows)
+
+def test_output_is_reproducible_per_seed():
+    assert records(200, seed=1) == records(200, seed=1)
+    assert records(200, seed=1) != records(200, seed=2)
+
+def test_adding_a_field_does_not_change_the_others():
+    spec = GeneratorSpec.model_validate(SPEC)
+    wider = GeneratorSpec.model_validate({**SPEC, "fields": SPEC["fields"] + [{"name": "extra", "type": "uuid"}]})
+    first = next(DatasetEngine(spec, seed=3).iter_chunks(50))
+    second = next(DatasetEngine(wider, seed=3).iter_chunks(50))
+    assert all(first[name] == second[name] for name in first)
+
+def test_csv_output_has_a_header_and_one_line_per_record():
+    rows = list(csv.reader(io.StringIO(records(20, fmt=DatasetFormat.CSV))))
+    assert rows[0] == [field["name"] for field in SPEC["fields"]]
+    assert len(rows) == 21
+
+@pytest.mark.parametrize("spec, message", [
+    ({"fields": [{"name": "a", "type": "enum"}]}, "needs values"),
+    ({"fields": [{"name": "a", "type": "integer"}, {"name": "a.b", "type": "integer"}]}, "nests inside"),
+    ({"fields": [{"name": "a", "type": "integer"}, {"name": "b", "type": "string"}],
+      "constraints": [{"type": "ordered", "fields": ["a", "b"]}]}, "all numeric"),
+    ({"fields": [{"name": "a", "type": "integer"}],
+      "constraints": [{"type": "null_unless", "fields": ["a"], "when_field": "missing"}]}, "unknown fields")
+])
+def test_invalid_specs_are_rejected(spec, message):
+    with pytest.raises(ValidationError, match=message):
+        GeneratorSpec.model_validate(spec)
+
+def test_a_spec_is_inferred_from_an_example_record():
+    spec = dataset_service.spec_from_example({
+        "id": 1,
+        "email": "ada@example.com",
+        "joined": "2024-05-01",
+        "bio": "writes programs for engines",
+        "address": {"city": "London"},
+        "tags": ["a", "b"],
+        "score": 4.5,
+        "nothing": None
+    })
+    types = {field.name: field.type.value for field in spec.fields}
+    assert types == {
+        "id": "sequence",
+        "email": "email",
+        "joined": "date",
+        "bio": "text",
+        "address.city": "string",
+        "tags": "array",
+        "score": "number"
+    }
+
+def test_an_invalid_llm_spec_falls_back_to_the_example(run, llm, api):
+    llm.reply = '{"fields": [{"name": "a", "type": "enum"}]}'
+    body = {"endpoint": "/users", "description": "Users", "request_body": {"name": "Ada"}}
+    response = run(api.post(f"{ROUTE}/spec", json=body))
+    assert response.status_code == 200
+    assert response.json()["source"] == "example"
+    assert response.json()["spec"]["fields"][0]["name"] == "name"
+
+def test_generate_streams_records_from_the_llm_spec(run, llm, api):
+    llm.reply = json.dumps({"fields": [{"name": "n", "type": "integer", "minimum": 0, "maximum": 9}]})
+    body = {"endpoint": "/numbers", "description": "Numbers", "rows": 30, "format": "csv"}
+    response = run(api.post(f"{ROUTE}/generate", json=body))
+    assert response.status_code == 200
+    assert response.headers["x-dataset-spec-source"] == "llm"
+    lines = response.text.splitlines()
+    assert lines[0] == "n" and len(lines) == 31
+    # A supplied spec skips the LLM
+    calls = llm.calls
+    body = {"endpoint": "/numbers", "rows": 5, "spec": SPEC}
+    response = run(api.post(f"{ROUTE}/generate", json=body))
+    assert response.headers["x-dataset-spec-source"] == "request"
+    assert llm.calls == calls
+
+def test_parquet_needs_pyarrow(run, llm, api):
+    try:
+        import pyarrow  # noqa: F401
+        pytest.skip("pyarrow is installed")
+    except ImportError:
+        pass
+    response = run(api.post(f"{ROUTE}/generate", json={"endpoint": "/x", "rows": 1, "spec": SPEC, "format": "parquet"}))
+    assert response.status_code == 400
+    assert "pyarrow" in response.json()["detail"]
\ No newline at end of file
@@ -0,0 +1,84 @@
+import copy
+import pytest
+from app.core.config import settings
+from app.schemas.openapi import SpecRequest
+from app.services import spec_service as spec_module
+from app.services.artifact_service import ArtifactService
+from app.services.fingerprint_store import InMemoryFingerprintStore
+from app.services.spec_service import spec_service
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Pets", "version": "1"},
+    "servers": [{"url": "http://pets.test"}],
+    "paths": {
+        "/pets": {"get": {"operationId": "listPets", "summary": "List pets", "responses": {"200": {"description": "ok"}}}},
+        "/owners": {"get": {"operationId": "listOwners", "summary": "List owners", "responses": {"200": {"description": "ok"}}}}
+    }
+}
+SCENARIOS = '[{"type": "SECURITY", "description": "d", "input": "i", "expected_output": "o"}]'
+VALID = "import requests\n\ndef test_list():\n    assert requests.get\n"
+INVALID = "def test_list():\n    assert missing_name == 1\n"
+
+@pytest.fixture
+def artifacts(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "SCENARIO_PACK_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_ESCALATE_ON_INVALID", False)
+    service = ArtifactService(InMemoryFingerprintStore(), tmp_path)
+    monkeypatch.setattr(spec_module, "artifact_service", service)
+    return service
+
+def generate(run, spec: dict, **options):
+    request = SpecRequest(spec=spec, scenario_types=["SECURITY"], incremental=True, **options)
+    return run(spec_service.generate(request))
+
+def test_unchanged_operations_are_reused_from_disk(run, llm, artifacts, tmp_path):
+    llm.reply = lambda prompt: VALID if "pytest" in prompt else SCENARIOS
+    first = generate(run, SPEC, generate_pytest=True)
+    assert first.changes.added == ["GET /pets", "GET /owners"]
+    assert len(list(tmp_path.rglob("test_*.py"))) == 2
+    calls = llm.calls
+
+    second = generate(run, SPEC, generate_pytest=True)
+    assert llm.calls == calls
+    assert second.changes.unchanged == ["GET /pets", "GET /owners"]
+    assert second.changes.reused == 4
+    assert second.results[0].scenarios == first.results[0].scenarios
+    assert second.results[0].pytest_code.code == first.results[0].pytest_code.code
+
+    changed = copy.deepcopy(SPEC)
+    changed["paths"]["/pets"]["get"]["summary"] = "List every pet"
+    del changed["paths"]["/owners"]
+    third = generate(run, changed, generate_pytest=True)
+    assert (third.changes.changed, third.changes.removed) == (["GET /pets"], ["GET /owners"])
+    assert [path.name for path in tmp_path.rglob("test_*.py")] == ["test_get_pets.py"]
+
+def test_invalid_pytest_files_are_not_saved(run, llm, artifacts, tmp_path):
+    llm.reply = lambda prompt: INVALID if "pytest" in prompt else SCENARIOS
+    first = generate(run, SPEC, generate_pytest=True)
+    assert not first.results[0].pytest_code.validation.valid
+    assert list(tmp_path.rglob("test_*.py")) == []
+
+    # The scenarios are reused, but the pytest files are generated again
+    second = generate(run, SPEC, generate_pytest=True)
+    assert second.changes.reused == 2
+    assert second.changes.changed == ["GET /pets", "GET /owners"]
+    assert list(tmp_path.rglob("test_*.py")) == []
+
+def test_failed_scenarios_are_retried_on_the_next_run(run, llm, artifacts):
+    llm.reply = "not json"
+    first = generate(run, SPEC, bypass_cache=True)
+    assert all(result.error for result in first.results)
+
+    llm.reply = SCENARIOS
+    second = generate(run, SPEC)
+    assert second.changes.reused == 0
+    assert all(result.scenarios for result in second.results)
+
+def test_bypass_cache_regenerates_everything(run, llm, artifacts):
+    llm.reply = SCENARIOS
+    generate(run, SPEC)
+    calls = llm.calls
+    response = generate(run, SPEC, bypass_cache=True)
+    assert llm.calls == calls + 2
+    assert response.changes.changed == ["GET /pets", "GET /owners"]
\ No newline at end of file
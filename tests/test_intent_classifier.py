@@ -0,0 +1,61 @@
+import pytest
+from app.core.config import settings
+from app.schemas.playground import HTTPMethod
+from app.services.intent_classifier import IntentClassifier, extract_endpoint
+
+@pytest.mark.parametrize("message, expected", [
+    ("generate tests for POST /users", ("/users", HTTPMethod.POST)),
+    ("what about get /pets/{petId}.", ("/pets/{petId}", HTTPMethod.GET)),
+    ("the /orders endpoint, DELETE please", ("/orders", HTTPMethod.DELETE)),
+    ("see https://example.com/docs", (None, None)),
+    ("hello there", (None, None))
+])
+def test_extract_endpoint(message, expected):
+    assert extract_endpoint(message) == expected
+
+@pytest.mark.parametrize("message, intent", [
+    ("write pytest tests for POST /users", "generate_tests"),
+    ("give me negative test cases for GET /pets", "generate_scenarios"),
+    ("what can you do?", "help"),
+    ("hello!", "greeting")
+])
+def test_clear_messages_are_classified_locally(run, llm, message, intent):
+    classification, tier = run(IntentClassifier().classify(message))
+    assert (classification.intent, tier) == (intent, "local")
+    assert classification.requires_details == (intent in ("generate_tests", "generate_scenarios"))
+    assert llm.calls == 0
+
+def test_llm_failures_fall_back_to_the_local_guess(run, llm):
+    llm.reply = "no json here"
+    # A bare endpoint leans towards the intent the session was already in
+    classification, tier = run(IntentClassifier().classify("/pets", {"intent": "generate_scenarios"}))
+    assert (classification.intent, classification.endpoint, tier) == ("generate_scenarios", "/pets", "fallback")
+
+def test_ambiguous_messages_go_to_the_llm_with_history(run, llm):
+    llm.reply = 'Sure: {"intent": "generate_tests", "endpoint": "/users", "method": "put"}'
+    classifier = IntentClassifier()
+    classification, tier = run(classifier.classify("and the other one?", history="user: tests for /users"))
+    assert tier == "llm"
+    assert (classification.intent, classification.endpoint, classification.method) == ("generate_tests", "/users", HTTPMethod.PUT)
+    assert "user: tests for /users" in llm.prompts[0]
+    assert classifier.stats() == {"local": 0, "llm": 1, "fallback": 0, "total": 1, "local_ratio": 0.0}
+
+def test_unknown_llm_answers_are_normalised(run, llm):
+    llm.reply = '{"intent": "dance", "endpoint": "null", "method": "FETCH"}'
+    classification, _ = run(IntentClassifier().classify("hmm"))
+    assert (classification.intent, classification.endpoint, classification.method) == ("other", None, None)
+
+def test_the_llm_tier_can_be_disabled(run, llm, monkeypatch):
+    monkeypatch.setattr(settings, "INTENT_LLM_ENABLED", False)
+    classification, tier = run(IntentClassifier().classify("hmm"))
+    assert (classification.intent, tier) == ("other", "local")
+    assert llm.calls == 0
+
+def test_chat_follow_ups_reuse_the_remembered_endpoint(run, llm, api):
+    url = f"{settings.API_V1_STR}/chatbot/chat"
+    first = run(api.post(url, json={"message": "write pytest tests for POST /users"})).json()
+    assert first["intent"]["endpoint"] == "/users"
+    follow_up = run(api.post(url, json={"message": "more pytest tests please", "session_id": first["session_id"]})).json()
+    assert follow_up["intent"]["intent"] == "generate_tests"
+    assert (follow_up["intent"]["endpoint"], follow_up["intent"]["method"]) == ("/users", "POST")
+    assert run(api.get("/intent/stats")).json()["local"] >= 2
\ No newline at end of file
@@ -0,0 +1,131 @@
+import asyncio
+import time
+import pytest
+from app.schemas.jobs import JobRequest, JobStatus
+from app.services.job_manager import JobManager
+from app.services.job_store import InMemoryJobStore, SQLiteJobStore
+
+ITEMS = [{"endpoint": f"/items/{index}"} for index in range(3)]
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryJobStore()
+    return SQLiteJobStore(tmp_path / "jobs.db")
+
+def endpoints(count: int) -> list:
+    return [
+        {"endpoint": f"/items/{index}", "method": "GET", "description": "Reads an item", "scenario_types": ["POSITIVE"]}
+        for index in range(count)
+    ]
+
+async def run_job(manager: JobManager, job_id: str) -> None:
+    task = manager._tasks.get(job_id)
+    if task is not None:
+        await task
+
+def test_results_are_numbered_in_completion_order(store):
+    store.create_job("j", ITEMS, {"bypass_cache": True})
+    store.save_result("j", 2, {"n": 2}, failed=False)
+    store.save_result("j", 0, {"n": 0}, failed=True)
+    store.save_result("j", 0, {"n": "again"}, failed=False)
+
+    job = store.get_job("j")
+    assert (job["status"], job["total"], job["completed"], job["failed"]) == ("PENDING", 3, 2, 1)
+    assert job["options"] == {"bypass_cache": True}
+    results = store.get_results("j")
+    assert [(index, result) for _, index, result in results] == [(2, {"n": 2}), (0, {"n": 0})]
+    assert store.get_results("j", since=results[0][0]) == results[1:]
+    assert store.pending_items("j") == [(1, ITEMS[1])]
+
+def test_transition_status_only_moves_from_expected_states(store):
+    store.create_job("j", ITEMS, {})
+    assert store.transition_status("j", ("PENDING",), "RUNNING")
+    assert not store.transition_status("j", ("PENDING",), "COMPLETED")
+    assert store.transition_status("j", ("PENDING", "RUNNING"), "CANCELLED")
+    assert store.get_job("j")["status"] == "CANCELLED"
+    assert store.unfinished_jobs() == []
+    assert not store.transition_status("missing", ("PENDING",), "RUNNING")
+
+def test_a_lease_is_held_until_it_lapses_or_is_released(store):
+    store.create_job("j", ITEMS, {})
+    assert store.claim_job("j", "a", 30)
+    assert not store.claim_job("j", "b", 30)
+    assert store.renew_lease("j", "a", 30)
+    assert not store.renew_lease("j", "b", 30)
+
+    store.release_job("j", "a")
+    assert store.claim_job("j", "b", 0.01)
+    time.sleep(0.02)
+    assert store.claim_job("j", "a", 30)
+    assert not store.renew_lease("j", "b", 30)
+
+def test_finished_jobs_cannot_be_claimed(store):
+    store.create_job("j", ITEMS, {})
+    store.transition_status("j", ("PENDING",), "COMPLETED")
+    assert not store.claim_job("j", "a", 30)
+
+def test_a_job_runs_every_endpoint_and_completes(run, llm):
+    llm.reply = '[{"type": "POSITIVE", "description": "d", "input": "i", "expected_output": "o"}]'
+    manager = JobManager(InMemoryJobStore())
+
+    async def scenario():
+        job_id = manager.submit(JobRequest(endpoints=endpoints(4)))
+        await run_job(manager, job_id)
+        return job_id
+
+    job_id = run(scenario())
+    job = manager.get_job(job_id)
+    assert (job["status"], job["completed"], job["failed"]) == ("COMPLETED", 4, 0)
+    results = manager.get_results(job_id)
+    assert sorted(index for _, index, _ in results) == [0, 1, 2, 3]
+    assert all(len(result["scenarios"]) == 1 for _, _, result in results)
+
+def test_an_unreadable_item_is_recorded_as_failed(run, llm):
+    llm.reply = '[{"type": "POSITIVE", "description": "d", "input": "i", "expected_output": "o"}]'
+    store = InMemoryJobStore()
+    manager = JobManager(store)
+    store.create_job("j", [endpoints(1)[0], {"endpoint": "/old", "method": "TRACE"}], {})
+
+    async def scenario():
+        manager._start("j")
+        await run_job(manager, "j")
+
+    run(scenario())
+    job = store.get_job("j")
+    assert (job["status"], job["completed"], job["failed"]) == ("COMPLETED", 2, 1)
+    failed = {index: result for _, index, result in store.get_results("j")}[1]
+    assert failed["endpoint"] == "/old" and failed["method"] is None and failed["error"]
+
+def test_a_job_whose_run_fails_ends_as_failed(run, llm):
+    class BrokenStore(InMemoryJobStore):
+        def save_result(self, *args, **kwargs):
+            raise OSError("disk full")
+
+    store = BrokenStore()
+    manager = JobManager(store)
+    store.create_job("j", endpoints(2), {})
+
+    async def scenario():
+        manager._start("j")
+        await run_job(manager, "j")
+
+    run(scenario())
+    assert store.get_job("j")["status"] == JobStatus.FAILED.value
+    assert store.unfinished_jobs() == []
+
+def test_cancel_stops_a_running_job_and_keeps_its_status(run, llm):
+    llm.delay = 0.05
+    manager = JobManager(InMemoryJobStore())
+
+    async def scenario():
+        job_id = manager.submit(JobRequest(endpoints=endpoints(40)))
+        await asyncio.sleep(0.07)
+        await manager.cancel(job_id)
+        return job_id
+
+    job_id = run(scenario())
+    job = manager.get_job(job_id)
+    assert job["status"] == "CANCELLED"
+    assert 0 < job["completed"] < 40
+    assert job_id not in manager._tasks
\ No newline at end of file
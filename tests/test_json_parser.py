@@ -0,0 +1,95 @@
+import json
+import pytest
+from app.utils.json_parser import IncrementalJSONArrayParser, ScenarioStream, extract_json, parse_scenarios, strip_code_fences
+
+SCENARIO = {"type": "positive", "description": "Lists users", "input": {"page": 1}, "expected_output": "200 OK"}
+
+def test_strip_code_fences_returns_fenced_body():
+    assert strip_code_fences('Here you go:\n```json\n[1, 2]\n```\nDone.') == "[1, 2]"
+
+def test_strip_code_fences_handles_unterminated_fence():
+    assert strip_code_fences("```python\nimport pytest\n") == "import pytest"
+
+def test_strip_code_fences_leaves_plain_text():
+    assert strip_code_fences("  [1, 2]\n") == "[1, 2]"
+
+def test_extract_json_skips_prose_around_the_value():
+    assert extract_json('The scenarios are [{"a": 1}] as requested. [2]') == [{"a": 1}]
+
+def test_extract_json_finds_an_object():
+    assert extract_json('Spec:\n```\n{"fields": []}\n```', "{") == {"fields": []}
+
+def test_extract_json_raises_without_json():
+    with pytest.raises(json.JSONDecodeError):
+        extract_json("No scenarios today.")
+
+def test_parse_scenarios_normalizes_entries():
+    scenarios, diagnostics = parse_scenarios(f"```json\n{json.dumps([SCENARIO])}\n```")
+    assert diagnostics == []
+    assert scenarios == [{
+        "type": "POSITIVE",
+        "description": "Lists users",
+        "input": '{"page": 1}',
+        "expected_output": "200 OK"
+    }]
+
+def test_parse_scenarios_salvages_a_truncated_array():
+    complete = json.dumps(SCENARIO)
+    scenarios, diagnostics = parse_scenarios(f'[{complete}, {complete}, {{"type": "NEGATIVE", "descr')
+    assert len(scenarios) == 2
+    assert "Element 2: truncated before it was complete" in diagnostics
+    assert "Response array was not terminated; kept the complete entries" in diagnostics
+
+def test_parse_scenarios_reports_invalid_entries():
+    bad = {"type": "unknown", "description": "x", "input": "", "expected_output": ""}
+    scenarios, diagnostics = parse_scenarios(json.dumps([SCENARIO, bad, {"type": "EDGE_CASE"}]))
+    assert len(scenarios) == 1
+    assert diagnostics == [
+        "Scenario 1: unknown scenario type 'unknown'",
+        "Scenario 2: missing fields: description, input, expected_output"
+    ]
+
+def test_parse_scenarios_without_array():
+    scenarios, diagnostics = parse_scenarios("I can't help with that.")
+    assert scenarios == []
+    assert diagnostics == ["No JSON array found in response"]
+
+def test_incremental_parser_yields_elements_across_chunks():
+    parser = IncrementalJSONArrayParser()
+    text = 'Sure:\n```json\n[{"a": "x,]}"}, [1, [2]], "s\\"", null, 3]\n```'
+    elements = []
+    for start in range(0, len(text), 3):
+        elements.extend(parser.feed(text[start:start + 3]))
+    parser.close()
+    assert elements == [{"a": "x,]}"}, [1, [2]], 's"', None, 3]
+    assert parser.finished
+    assert parser.errors == []
+
+def test_incremental_parser_records_invalid_elements():
+    parser = IncrementalJSONArrayParser()
+    elements = list(parser.feed("[1, {bad}, 2]"))
+    assert elements == [1, 2]
+    assert parser.errors and parser.errors[0].startswith("Element 1: invalid JSON")
+
+def test_scenario_stream_yields_scenarios_as_they_complete(run):
+    seen = []
+
+    async def chunks():
+        text = f'[{json.dumps(SCENARIO)}, {{"type": "bogus"}}, {json.dumps(SCENARIO)}, {{"type": "NEG'
+        for start in range(0, len(text), 10):
+            seen.append(start)
+            yield text[start:start + 10]
+
+    async def consume():
+        stream = ScenarioStream(chunks())
+        received = []
+        async for scenario in stream:
+            # The first scenario arrives before the rest of the response is read
+            received.append((scenario["type"], len(seen)))
+        return received, stream.diagnostics
+
+    received, diagnostics = run(consume())
+    assert [scenario_type for scenario_type, _ in received] == ["POSITIVE", "POSITIVE"]
+    assert received[0][1] < received[1][1]
+    assert diagnostics[0].startswith("Scenario 1: ")
+    assert diagnostics[-1] == "Response array was not terminated; kept the complete entries"
\ No newline at end of file
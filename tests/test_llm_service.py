@@ -0,0 +1,42 @@
+import asyncio
+from app.core.config import settings
+from app.services.llm_service import llm_service
+
+async def _ticks_while(call) -> int:
+    """Count how often the event loop got to run another task while `call` was pending."""
+    ticks = 0
+    task = asyncio.ensure_future(call)
+    while not task.done():
+        ticks += 1
+        await asyncio.sleep(0.005)
+    await task
+    return ticks
+
+def test_generate_content_async_returns_the_model_answer(run, llm):
+    llm.reply = "hello"
+    assert run(llm_service.generate_content_async("say hello")) == "hello"
+    assert llm.prompts == ["say hello"]
+
+def test_native_async_call_leaves_the_loop_free(run, llm):
+    llm.delay = 0.1
+    assert run(_ticks_while(llm_service.generate_content_async("slow"))) >= 5
+
+def test_thread_fallback_leaves_the_loop_free(run, llm, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_USE_NATIVE_ASYNC", False)
+    llm.delay = 0.1
+    llm.reply = "from a thread"
+    assert run(_ticks_while(llm_service.generate_content_async("slow"))) >= 5
+    assert llm.prompts == ["slow"]
+
+def test_concurrent_calls_are_bounded_by_max_concurrency(run, llm):
+    llm.delay = 0.02
+    calls = settings.LLM_MAX_CONCURRENCY * 3
+
+    async def fan_out():
+        return await asyncio.gather(*(
+            llm_service.generate_content_async(f"prompt {index}") for index in range(calls)
+        ))
+
+    assert len(run(fan_out())) == calls
+    assert llm.calls == calls
+    assert llm.max_in_flight == settings.LLM_MAX_CONCURRENCY
\ No newline at end of file
@@ -0,0 +1,84 @@
+import threading
+import pytest
+from loguru import logger as loguru_logger
+from app.core.config import settings
+from app.services.llm_service import llm_service
+from app.utils.logger import QueuedSink, get_logger, truncate_payload
+
+@pytest.fixture
+def captured():
+    """Records logged through the app loggers."""
+    messages = []
+    handler = loguru_logger.add(lambda message: messages.append(message.record), level="DEBUG", format="{message}")
+    yield messages
+    loguru_logger.remove(handler)
+
+def test_prompt_and_response_are_sampled_together(run, llm, captured, monkeypatch):
+    monkeypatch.setattr(settings, "LOG_LLM_PAYLOAD_SAMPLE_RATE", 0.5)
+    llm.reply = "answer"
+    for index in range(60):
+        run(llm_service.generate_content_async(f"prompt {index}", bypass_cache=True))
+
+    payloads = [record["message"] for record in captured if record["extra"].get("llm") and "chars):" in record["message"]]
+    prompts = [message for message in payloads if message.startswith("Prompt")]
+    responses = [message for message in payloads if message.startswith("Response")]
+    assert 0 < len(prompts) < 60
+    assert len(prompts) == len(responses)
+    # Each sampled prompt is directly followed by its own response
+    assert all(first.startswith("Prompt") and second.startswith("Response") for first, second in zip(payloads[::2], payloads[1::2]))
+
+def test_payloads_are_not_logged_at_a_zero_rate(run, llm, captured, monkeypatch):
+    monkeypatch.setattr(settings, "LOG_LLM_PAYLOAD_SAMPLE_RATE", 0.0)
+    run(llm_service.generate_content_async("quiet"))
+    assert not any("chars):" in record["message"] for record in captured)
+
+def test_truncate_payload(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_LLM_PAYLOAD_MAX_CHARS", 5)
+    assert truncate_payload("short") == "short"
+    assert truncate_payload("longer text") == "longe... [6 more chars]"
+
+def test_messages_with_braces_are_logged_verbatim(captured):
+    log = get_logger("tests")
+    log.warning("Not found: /pets/{petId} {'a': 1}", extra={"endpoint": "/pets"})
+    record = captured[-1]
+    assert record["message"] == "Not found: /pets/{petId} {'a': 1}"
+    assert record["extra"]["endpoint"] == "/pets" and record["extra"]["name"] == "tests"
+
+class SlowWriter:
+    """Stands in for the writer-thread logger; blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.messages = []
+
+    def patch(self, patcher):
+        return self
+
+    def bind(self, **kwargs):
+        return self
+
+    def log(self, level, message):
+        self.release.wait(5)
+        self.messages.append(message)
+
+    def warning(self, message, *args):
+        self.messages.append(message.format(*args))
+
+def test_queued_sink_writes_in_the_background_and_drops_when_full():
+    writer = SlowWriter()
+    sink = QueuedSink(writer, max_records=2)
+    handler = loguru_logger.add(sink, format="{message}", filter=lambda record: "queued_test" in record["extra"])
+    try:
+        for index in range(10):
+            loguru_logger.bind(queued_test=True).info(f"record {index}")
+    finally:
+        loguru_logger.remove(handler)
+    assert sink.dropped > 0
+    assert sink.enqueued + sink.dropped == 10
+
+    writer.release.set()
+    sink.stop()
+    assert writer.messages[0] == "record 0"
+    assert len(writer.messages) == sink.enqueued + 1
+    assert writer.messages[-1] == f"Log queue full: dropped {sink.dropped} record(s)"
+    assert sink.stats()["written"] == sink.enqueued
\ No newline at end of file
@@ -0,0 +1,68 @@
+import pytest
+from app.core.config import settings
+from app.utils.metrics import ERRORS, LLM_CACHE, LLM_TOKENS, Counter, Histogram, current_route, stage
+
+ROUTE = f"{settings.API_V1_STR}/playground/generate-scenarios"
+
+def sample(text: str, prefix: str) -> float:
+    """The value of the first exposition line starting with `prefix`."""
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"No sample {prefix}")
+
+def test_counter_series_are_rendered_per_label_set():
+    counter = Counter("test_things_total", "Things", ("kind",))
+    counter.inc(kind="a")
+    counter.inc(2, kind='quote"d')
+    assert counter.value(kind="a") == 1
+    assert counter.render() == [
+        "# HELP test_things_total Things",
+        "# TYPE test_things_total counter",
+        'test_things_total{kind="a"} 1.0',
+        'test_things_total{kind="quote\\"d"} 2.0'
+    ]
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Durations", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+    assert histogram.render()[2:] == [
+        'test_seconds_bucket{le="0.1"} 1',
+        'test_seconds_bucket{le="1.0"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        "test_seconds_sum 6.05",
+        "test_seconds_count 4"
+    ]
+
+def test_stage_counts_errors_for_the_current_route():
+    token = current_route.set("/test")
+    try:
+        with pytest.raises(ValueError):
+            with stage("parse"):
+                raise ValueError("bad")
+    finally:
+        current_route.reset(token)
+    assert ERRORS.value(route="/test", stage="parse") == 1
+
+def test_requests_are_timed_per_route_and_stage(run, llm, api):
+    llm.reply = '[{"type": "POSITIVE", "description": "d", "input": "i", "expected_output": "o"}]'
+    prompt_tokens = LLM_TOKENS.value(route=ROUTE, kind="prompt")
+    misses = LLM_CACHE.value(route=ROUTE, result="miss")
+    body = {"endpoints": [{"endpoint": "/metrics-test", "method": "GET", "description": "d", "scenario_types": ["POSITIVE"]}]}
+
+    assert run(api.post(ROUTE, json=body)).status_code == 200
+    assert run(api.post(ROUTE, json={"endpoints": "nope"})).status_code == 422
+    response = run(api.get("/metrics"))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert sample(text, f'http_request_duration_seconds_count{{route="{ROUTE}",method="POST",status="200"}}') >= 1
+    assert sample(text, f'http_request_duration_seconds_count{{route="{ROUTE}",method="POST",status="422"}}') >= 1
+    for name in ("validation", "serialization", "llm_wait", "llm_queue", "json_parse", "prompt_build"):
+        assert sample(text, f'stage_duration_seconds_count{{route="{ROUTE}",stage="{name}"}}') >= 1
+    assert LLM_TOKENS.value(route=ROUTE, kind="prompt") > prompt_tokens
+    assert LLM_CACHE.value(route=ROUTE, result="miss") == misses + 1
+    assert sample(text, f'scenarios_generated_total{{route="{ROUTE}",scenario_type="POSITIVE",source="llm"}}') >= 1
+    assert "llm_queue_depth 0.0" in text
\ No newline at end of file
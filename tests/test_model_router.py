@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from app.core.config import settings
+from app.services.llm_service import llm_service
+from app.services.model_router import ModelRouter, model_router
+from app.services.pytest_service import pytest_service
+
+VALID = "import requests\n\ndef test_list():\n    assert requests.get"
+INVALID = "def test_list():\n    assert missing_name == 1\n"
+PYTEST_ARGS = {"endpoint": "/pets", "method": "GET", "base_url": "http://pets.test", "headers": {}}
+
+@pytest.fixture
+def tiers(monkeypatch):
+    """Route through two tiers for the test."""
+    monkeypatch.setattr(model_router, "tiers", ["lite", "pro"])
+    monkeypatch.setattr(model_router, "outcomes", {
+        model: {"accepted": 0, "escalated": 0, "rejected": 0, "error": 0} for model in ("lite", "pro")
+    })
+    return model_router
+
+def replies(*answers):
+    """A reply function returning `answers` in turn."""
+    remaining = list(answers)
+    return lambda prompt: remaining.pop(0)
+
+def test_pytest_starts_at_its_own_tier(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MODEL_TIERS", ["lite", "flash", "pro"])
+    router = ModelRouter()
+    assert router.route("scenarios") == ["lite", "flash", "pro"]
+    monkeypatch.setattr(settings, "LLM_PYTEST_TIER", -1)
+    assert router.route("pytest") == ["pro"]
+    monkeypatch.setattr(settings, "LLM_PYTEST_TIER", 1)
+    assert router.route("pytest") == ["flash", "pro"]
+    monkeypatch.setattr(settings, "LLM_PYTEST_TIER", 10)
+    assert router.route("pytest") == ["pro"]
+
+def test_slow_calls_are_hedged_and_the_first_answer_wins(run, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_SAMPLES", 3)
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_DELAY_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "LLM_HEDGE_MAX_RATIO", 1.0)
+    router = ModelRouter()
+    for _ in range(3):
+        router.latency.observe("lite", 0.01)
+    delays = [1.0, 0.0]
+    admitted = []
+
+    async def attempt():
+        await asyncio.sleep(delays.pop(0))
+        return "answer"
+
+    async def admit():
+        admitted.append(True)
+
+    assert run(router.call("lite", attempt, admit)) == "answer"
+    assert (router.hedged, router.backup_wins, len(admitted)) == (1, 1, 1)
+
+def test_hedging_is_capped(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_SAMPLES", 1)
+    monkeypatch.setattr(settings, "LLM_HEDGE_MAX_RATIO", 0.1)
+    router = ModelRouter()
+    router.latency.observe("lite", 0.5)
+    router.calls, router.hedged = 10, 0
+    assert router.hedge_delay("lite") == 0.5
+    router.hedged = 1
+    assert router.hedge_delay("lite") is None
+
+def test_unusable_answers_escalate_to_the_next_tier(run, llm, tiers):
+    llm.reply = replies("not json", '[{"type": "POSITIVE", "description": "d", "input": "i", "expected_output": "o"}]')
+    scenarios = run(llm_service.generate_test_scenarios("/pets", "GET", "List pets", ["POSITIVE"]))
+    assert len(scenarios) == 1
+    assert tiers.outcomes["lite"]["escalated"] == 1 and tiers.outcomes["pro"]["accepted"] == 1
+
+def test_invalid_pytest_escalates_after_repair(run, llm, tiers, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PYTEST_TIER", 0)
+    llm.reply = replies(INVALID, INVALID, VALID)
+    code, validation = run(pytest_service.generate(**PYTEST_ARGS))
+    assert validation.valid and code == VALID
+    assert llm.calls == 3
+    assert tiers.outcomes["lite"]["escalated"] == 1 and tiers.outcomes["pro"]["accepted"] == 1
+
+def test_pytest_still_invalid_after_repair_is_not_cached(run, llm, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_ESCALATE_ON_INVALID", False)
+    llm.reply = INVALID
+    _, validation = run(pytest_service.generate(**PYTEST_ARGS))
+    assert not validation.valid
+    assert llm.calls == 2  # The file, then the repair
+
+    llm.reply = replies(VALID)
+    code, validation = run(pytest_service.generate(**PYTEST_ARGS))
+    assert validation.valid and code == VALID
+    assert llm.calls == 3
+    # The valid file is kept
+    run(pytest_service.generate(**PYTEST_ARGS))
+    assert llm.calls == 3
\ No newline at end of file
@@ -0,0 +1,65 @@
+import asyncio
+import json
+from app.core.config import settings
+from app.schemas.playground import EndpointRequest
+from app.services import scenario_service
+from app.services.scenario_service import ScenarioBatch
+
+ROUTE = f"{settings.API_V1_STR}/playground/generate-scenarios/stream"
+SCENARIOS = '[{"type": "SECURITY", "description": "d", "input": "i", "expected_output": "o"}]'
+
+def endpoints(count: int) -> list:
+    return [
+        {"endpoint": f"/items/{index}", "method": "GET", "description": "Reads an item", "scenario_types": ["SECURITY"]}
+        for index in range(count)
+    ]
+
+def lines(response) -> list:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_results_stream_one_line_per_endpoint_then_done(run, llm, api, monkeypatch):
+    monkeypatch.setattr(settings, "SCENARIO_PACK_ENABLED", False)
+    llm.reply = SCENARIOS
+    count = settings.MAX_BATCH_SIZE * 3
+    response = run(api.post(ROUTE, json={"endpoints": endpoints(count)}))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = lines(response)
+    assert records[-1] == {"done": True, "count": count, "llm_calls": count}
+    assert sorted(record["index"] for record in records[:-1]) == list(range(count))
+    for record in records[:-1]:
+        assert record["result"]["endpoint"] == f"/items/{record['index']}"
+        assert len(record["result"]["scenarios"]) == 1
+
+def test_a_failure_part_way_ends_with_an_error_line(run, llm, api, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("estimator down")
+
+    monkeypatch.setattr(scenario_service, "estimate_scenario_tokens", broken)
+    response = run(api.post(ROUTE, json={"endpoints": endpoints(2)}))
+    assert response.status_code == 200
+    assert lines(response) == [{"error": "Failed to generate test scenarios: estimator down"}]
+
+def test_a_stalled_reader_stops_generation(run, llm, monkeypatch):
+    monkeypatch.setattr(settings, "SCENARIO_PACK_ENABLED", False)
+    llm.reply = SCENARIOS
+    requests = [EndpointRequest(**endpoint) for endpoint in endpoints(40)]
+
+    async def scenario():
+        batch = ScenarioBatch(requests, concurrency=2).__aiter__()
+        await batch.__anext__()
+        await asyncio.sleep(0.05)
+        stalled_calls = llm.calls
+        rest = [item async for item in batch]
+        return stalled_calls, len(rest) + 1
+
+    stalled_calls, total = run(scenario())
+    # Only the buffered results and the ones workers hold are generated ahead of the reader
+    assert stalled_calls <= 10
+    assert total == 40
+    assert llm.calls == 40
+
+def test_stream_requests_are_capped_at_the_job_size(run, llm, api, monkeypatch):
+    response = run(api.post(ROUTE, json={"endpoints": endpoints(settings.MAX_JOB_SIZE + 1)}))
+    assert response.status_code == 422
\ No newline at end of file
@@ -0,0 +1,127 @@
+import copy
+import pytest
+from app.core.config import settings
+from app.schemas.playground import ScenarioType
+from app.services.openapi_parser import OpenAPIParser
+
+TYPES = [ScenarioType.POSITIVE]
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Shop"},
+    "servers": [{"url": "https://shop.example.com/v1/"}],
+    "paths": {
+        "/users": {
+            "post": {
+                "operationId": "createUser",
+                "summary": "Create a user",
+                "parameters": [{"$ref": "#/components/parameters/Tenant"}],
+                "requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/User"}}}},
+                "responses": {
+                    "400": {"description": "bad"},
+                    "201": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/User"}}}}
+                }
+            }
+        },
+        "/nodes/{id}": {
+            "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}],
+            "get": {"responses": {"200": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Node"}}}}}},
+            "x-internal": {"description": "not an operation"}
+        }
+    },
+    "components": {
+        "parameters": {
+            "Tenant": {"name": "X-Tenant", "in": "header", "required": True, "schema": {"type": "string", "example": "acme"}}
+        },
+        "schemas": {
+            "User": {
+                "type": "object",
+                "required": ["email"],
+                "properties": {
+                    "email": {"type": "string", "format": "email"},
+                    "age": {"type": "integer", "minimum": 18},
+                    "role": {"type": "string", "enum": ["admin", "member"]}
+                }
+            },
+            "Node": {
+                "type": "object",
+                "properties": {"name": {"type": "string"}, "children": {"type": "array", "items": {"$ref": "#/components/schemas/Node"}}}
+            }
+        }
+    }
+}
+
+def test_operations_are_expanded_in_document_order():
+    operations = OpenAPIParser(SPEC).operations(TYPES)
+
+    assert [op.operation_id for op in operations] == ["createUser", "GET /nodes/{id}"]
+    create, node = operations
+    assert create.endpoint.description == "Create a user"
+    assert create.endpoint.request_schema["properties"]["email"] == {"type": "string", "format": "email"}
+    assert create.api_details.base_url == "https://shop.example.com/v1"
+    assert create.api_details.headers == {"Content-Type": "application/json", "X-Tenant": "acme"}
+    assert create.api_details.request_body == {"email": "user@example.com", "age": 18, "role": "admin"}
+    assert create.api_details.success_status_code == 201
+    assert '"name":"X-Tenant"' in create.context and "Request schema:" in create.context
+    assert node.endpoint.description == "GET /nodes/{id}"
+    assert '"name":"id","in":"path"' in node.context
+
+def test_recursive_schemas_terminate():
+    node = OpenAPIParser(SPEC).operations(TYPES)[1]
+    assert node.api_details.example_response == {"name": "string", "children": [{"name": "string", "children": [None]}]}
+    assert '"children":{"type":"array","items":{"$ref":"Node"}}' in node.context
+
+def test_swagger2_body_parameters_and_host():
+    spec = {
+        "swagger": "2.0",
+        "host": "api.example.com",
+        "basePath": "/v2",
+        "schemes": ["http"],
+        "paths": {
+            "/pets": {
+                "post": {
+                    "parameters": [{"in": "body", "name": "pet", "schema": {"$ref": "#/definitions/Pet"}}],
+                    "responses": {"200": {"schema": {"type": "array", "items": {"$ref": "#/definitions/Pet"}}}}
+                }
+            }
+        },
+        "definitions": {"Pet": {"type": "object", "properties": {"name": {"type": "string", "example": "Rex"}}}}
+    }
+    operation = OpenAPIParser(spec).operations(TYPES)[0]
+    assert operation.api_details.base_url == "http://api.example.com/v2"
+    assert operation.api_details.request_body == {"name": "Rex"}
+    assert operation.api_details.example_response == {"items": [{"name": "Rex"}]}
+
+def test_json_pointers_can_index_arrays():
+    spec = copy.deepcopy(SPEC)
+    spec["paths"]["/copy"] = {"get": {"parameters": [{"$ref": "#/paths/~1nodes~1{id}/parameters/0"}], "responses": {}}}
+    operation = OpenAPIParser(spec).operations(TYPES)[-1]
+    assert '"name":"id"' in operation.context
+
+@pytest.mark.parametrize("ref", [
+    "#/components/parameters/Missing",
+    "#/components/schemas/User/required/7",
+    "#/components/schemas/User/type/length",
+    "https://example.com/schemas.json#/User"
+])
+def test_unresolvable_refs_are_value_errors(ref):
+    spec = copy.deepcopy(SPEC)
+    spec["paths"]["/users"]["post"]["parameters"] = [{"$ref": ref}]
+    parser = OpenAPIParser(spec)
+    with pytest.raises(ValueError, match="ref"):
+        parser.operations(TYPES)
+    # Still unresolvable the second time, not an empty placeholder
+    with pytest.raises(ValueError):
+        parser.operations(TYPES)
+
+def test_documents_that_are_not_specs_are_rejected():
+    with pytest.raises(ValueError):
+        OpenAPIParser({"info": {"title": "x"}})
+
+def test_a_bad_ref_is_a_400_from_the_api(run, llm, api):
+    spec = copy.deepcopy(SPEC)
+    spec["paths"]["/users"]["post"]["parameters"] = [{"$ref": "#/components/parameters/Missing"}]
+    response = run(api.post(f"{settings.API_V1_STR}/playground/generate-from-spec", json={"spec": spec}))
+    assert response.status_code == 400
+    assert "Unresolvable $ref #/components/parameters/Missing" in response.json()["detail"]
+    assert llm.calls == 0
\ No newline at end of file
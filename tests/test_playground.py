@@ -0,0 +1,48 @@
+import json
+from app.core.config import settings
+
+URL = f"{settings.API_V1_STR}/playground/generate-scenarios"
+
+def scenarios_for(prompt: str) -> str:
+    """Answer a single-endpoint scenario prompt; endpoints under /broken get unusable output."""
+    if "Endpoint: /broken" in prompt:
+        return "I can't help with that."
+    return json.dumps([
+        {"type": "POSITIVE", "description": "works", "input": "{}", "expected_output": "200"}
+    ])
+
+def endpoint(path: str) -> dict:
+    return {"endpoint": path, "method": "GET", "description": f"Reads {path}", "scenario_types": ["POSITIVE"]}
+
+def test_batch_endpoints_run_concurrently(run, llm, api, monkeypatch):
+    monkeypatch.setattr(settings, "SCENARIO_PACK_ENABLED", False)
+    llm.reply = scenarios_for
+    llm.delay = 0.05
+    paths = [f"/items/{index}" for index in range(settings.MAX_BATCH_SIZE)]
+
+    response = run(api.post(URL, json={"endpoints": [endpoint(path) for path in paths]}))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["endpoint"] for result in body["results"]] == paths
+    assert body["llm_calls"] == len(paths)
+    assert llm.max_in_flight == min(settings.BATCH_CONCURRENCY, len(paths))
+
+def test_a_failing_endpoint_does_not_fail_the_batch(run, llm, api, monkeypatch):
+    monkeypatch.setattr(settings, "SCENARIO_PACK_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_ESCALATE_ON_INVALID", False)
+    llm.reply = scenarios_for
+
+    response = run(api.post(URL, json={"endpoints": [endpoint("/ok"), endpoint("/broken"), endpoint("/fine")]}))
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["endpoint"] for result in results] == ["/ok", "/broken", "/fine"]
+    assert results[0]["error"] is None and len(results[0]["scenarios"]) == 1
+    assert results[1]["scenarios"] == [] and "no valid scenarios" in results[1]["error"]
+    assert results[2]["error"] is None
+
+def test_batches_over_the_limit_are_rejected(run, llm, api):
+    endpoints = [endpoint(f"/items/{index}") for index in range(settings.MAX_BATCH_SIZE + 1)]
+    assert run(api.post(URL, json={"endpoints": endpoints})).status_code == 422
+    assert llm.calls == 0
\ No newline at end of file
@@ -0,0 +1,53 @@
+import json
+from app.core.config import settings
+from app.services.llm_service import llm_service
+from app.services.prompt_budget import compact_json, fit_sections, json_skeleton, sample_json
+from app.services.scheduler import estimate_tokens
+
+LARGE = {"items": [{"id": index, "name": f"user-{index}", "bio": "x" * 500} for index in range(200)], "total": 200}
+
+def test_json_skeleton_keeps_only_the_shape():
+    value = {"id": 7, "ok": True, "score": 1.5, "tags": ["a", "b"], "empty": [], "parent": None}
+    assert json_skeleton(value) == {
+        "id": "integer",
+        "ok": "boolean",
+        "score": "number",
+        "tags": ["string"],
+        "empty": [],
+        "parent": "null"
+    }
+
+def test_sample_json_shortens_arrays_and_strings():
+    sampled = sample_json({"list": list(range(10)), "text": "abcdefghij"}, max_items=3, max_string_chars=4)
+    assert sampled == {"list": [0, 1, 2, "... 7 more items"], "text": "abcd... (6 more chars)"}
+
+def test_compact_json_keeps_small_values_whole():
+    value = {"id": 1}
+    assert compact_json(value, 100) == (json.dumps(value, indent=2), "full")
+
+def test_compact_json_degrades_step_by_step():
+    strategies = []
+    for budget in (30_000, 27_000, 500, 20, 3):
+        text, strategy = compact_json(LARGE, budget)
+        strategies.append(strategy)
+        assert estimate_tokens(text) <= budget
+    assert strategies == ["full", "minified", "sampled", "skeleton", "truncated"]
+
+def test_fit_sections_compacts_the_largest_section_first():
+    headers = {"Authorization": "Bearer token", "Content-Type": "application/json"}
+    rendered, report = fit_sections({"headers": headers, "example": LARGE, "body": None}, 1000)
+    assert rendered["headers"] == json.dumps(headers, indent=2)
+    assert rendered["body"] == "None"
+    assert report["strategies"] == {"headers": "full", "example": "sampled"}
+    assert report["compacted_tokens"] <= 1000 < report["original_tokens"]
+    assert sum(estimate_tokens(rendered[name]) for name in ("headers", "example")) <= 1000
+
+def test_pytest_prompts_with_huge_examples_stay_within_budget(monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_MAX_TOKENS", 2000)
+    huge = {"items": [{"id": index, "bio": "y" * 2000} for index in range(1000)]}
+    prompt = llm_service._build_pytest_prompt(
+        "/users", "GET", "http://localhost", {"Accept": "application/json"}, None, 200, huge
+    )
+    assert estimate_tokens(prompt) <= 2000
+    assert "Endpoint: /users" in prompt and "Request Body: None" in prompt
+    assert '"Accept": "application/json"' in prompt
\ No newline at end of file
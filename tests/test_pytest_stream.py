@@ -0,0 +1,65 @@
+import json
+from typing import List, Tuple
+from app.core.config import settings
+
+URL = f"{settings.API_V1_STR}/chatbot/generate-pytest/stream"
+
+CODE = '''import pytest
+
+def test_one():
+    assert 1 + 1 == 2
+
+@pytest.mark.negative
+def test_two():
+    assert "a".upper() != "a"
+'''
+
+REQUEST = {
+    "intent_data": {"intent": "generate_tests", "endpoint": "/users", "method": "GET", "requires_details": False},
+    "api_details": {"base_url": "http://localhost:8000"}
+}
+
+def events(body: str) -> List[Tuple[str, dict]]:
+    """Parse server-sent event frames into (event, data) pairs."""
+    parsed = []
+    for frame in body.strip().split("\n\n"):
+        event, data = frame.split("\n")
+        parsed.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return parsed
+
+def test_code_is_streamed_in_chunks_then_validated(run, llm, api):
+    llm.reply = CODE
+    response = run(api.post(URL, json=REQUEST))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = events(response.text)
+    chunks = [data["text"] for event, data in frames if event == "chunk"]
+    assert len(chunks) > 1
+    assert "".join(chunks) == CODE
+    event, done = frames[-1]
+    assert event == "done"
+    assert done["filename"] == "test_users.py"
+    assert done["test_count"] == 2
+    assert done["validation"]["valid"]
+    assert "code" not in done
+
+def test_a_cached_answer_is_sent_as_one_chunk(run, llm, api):
+    llm.reply = CODE
+    run(api.post(URL, json=REQUEST))
+    frames = events(run(api.post(URL, json=REQUEST)).text)
+
+    assert [event for event, _ in frames] == ["chunk", "done"]
+    assert frames[0][1]["text"] == CODE
+    assert llm.calls == 1
+
+def test_locally_fixed_code_is_returned_on_done(run, llm, api):
+    llm.reply = f"```python\n{CODE}```"
+    event, done = events(run(api.post(URL, json=REQUEST)).text)[-1]
+    assert event == "done"
+    assert done["code"] == CODE.strip()
+
+def test_upstream_failures_become_an_error_event(run, llm, api):
+    llm.errors.append(ValueError("bad request"))
+    frames = events(run(api.post(URL, json=REQUEST)).text)
+    assert frames == [("error", {"detail": "Failed to generate pytest code: bad request"})]
\ No newline at end of file
@@ -0,0 +1,106 @@
+import ast
+from app.core.config import settings
+from app.utils.pytest_utils import read_base_url_from_env, share_http_session, validate_pytest
+
+FILE = '''import pytest
+import requests
+
+@pytest.fixture
+def base_url():
+    return "http://localhost:8000"
+
+def test_list(base_url):
+    response = requests.get(f"{base_url}/users")
+    assert response.status_code == 200
+
+def test_create(base_url):
+    response = requests.post(f"{base_url}/users", json={"name": "a"})
+    assert response.status_code == 201
+'''
+
+def test_validate_pytest_strips_fences_and_prose():
+    code, validation = validate_pytest(f"Here is the test file:\n```python\n{FILE}```\nLet me know if you need more.")
+    assert code.startswith("import ")
+    assert "```" not in code and "Let me know" not in code
+    assert validation.valid
+    assert validation.test_count == 2
+    assert "Removed markdown code fences" in validation.fixes
+
+def test_validate_pytest_removes_leading_prose():
+    code, validation = validate_pytest("Sure! Below are the tests.\n\nimport pytest\n\ndef test_a():\n    assert True\n")
+    assert code == "import pytest\n\ndef test_a():\n    assert True"
+    assert validation.fixes == ["Removed 2 line(s) of text before the code"]
+
+def test_validate_pytest_drops_a_truncated_tail():
+    truncated = 'import pytest\n\ndef test_one():\n    assert True\n\n@pytest.mark.negative\ndef test_two():\n    r = requests.get("http://x/users"\n'
+    code, validation = validate_pytest(truncated)
+    assert "test_two" not in code and "@pytest.mark.negative" not in code
+    assert validation.valid
+    assert validation.test_count == 1
+    assert "Dropped unparsable code from line 6 on" in validation.fixes
+
+def test_validate_pytest_adds_missing_imports():
+    code, validation = validate_pytest('def test_a():\n    assert json.loads("1") == 1\n')
+    assert code.startswith("import json\n")
+    assert validation.fixes == ["Added missing imports: json"]
+
+def test_validate_pytest_reports_what_it_cannot_fix():
+    code, validation = validate_pytest("def test_a(token):\n    assert helper(token)\n")
+    assert not validation.valid
+    assert validation.issues == ["Undefined name: helper", "Undefined fixture: token"]
+
+    _, validation = validate_pytest("def test_a(\n")
+    assert not validation.valid
+    assert validation.issues[0].startswith("Syntax error on line 1")
+
+def test_validate_pytest_routes_requests_through_the_session(monkeypatch):
+    monkeypatch.setattr(settings, "PYTEST_SHARED_SESSION", True)
+    code, validation = validate_pytest(FILE)
+    assert "requests.get(" not in code and "requests.post(" not in code
+    assert 'http_session.get(f"{base_url}/users")' in code
+    assert "def test_list(http_session, base_url):" in code
+    assert "http_session" in validation.fixtures
+    assert "os.environ.get('API_BASE_URL', 'http://localhost:8000')" in code
+    assert validation.valid
+    ast.parse(code)
+
+def test_validate_pytest_keeps_requests_calls_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "PYTEST_SHARED_SESSION", False)
+    code, _ = validate_pytest(FILE)
+    assert "requests.get(" in code and "http_session" not in code
+
+def test_share_http_session_adds_the_parameter_after_self():
+    code = (
+        "import requests\n\n"
+        "class TestUsers:\n"
+        "    def test_get(self):\n"
+        "        assert requests.get('http://x').ok\n"
+    )
+    rewritten, fixes = share_http_session(code)
+    assert "    def test_get(self, http_session):" in rewritten
+    assert "http_session.get('http://x')" in rewritten
+    assert '@pytest.fixture(scope="session")\ndef http_session():' in rewritten
+    assert len(fixes) == 1
+
+def test_share_http_session_reuses_an_existing_fixture():
+    code = (
+        "import pytest\nimport requests\n\n"
+        "@pytest.fixture(scope='session')\ndef http_session():\n    return requests.Session()\n\n"
+        "def test_get(http_session):\n    assert requests.get('http://x').ok\n"
+    )
+    rewritten, _ = share_http_session(code)
+    assert rewritten.count("def http_session") == 1
+    assert "def test_get(http_session):" in rewritten
+    assert "http_session.get('http://x')" in rewritten
+
+def test_share_http_session_leaves_other_uses_of_the_name():
+    code = "import requests\n\nhttp_session = None\n\ndef test_get():\n    assert requests.get('http://x').ok\n"
+    assert share_http_session(code) == (code, [])
+
+def test_read_base_url_from_env_only_touches_literal_fixtures():
+    code, changed = read_base_url_from_env('@pytest.fixture\ndef base_url():\n    """Target."""\n    return "http://a"\n')
+    assert changed
+    assert "return os.environ.get('API_BASE_URL', 'http://a')" in code
+
+    computed = '@pytest.fixture\ndef base_url():\n    return HOST + "/v1"\n'
+    assert read_base_url_from_env(computed) == (computed, False)
\ No newline at end of file
@@ -0,0 +1,88 @@
+import pytest
+from app.core.config import settings
+# Aliased so pytest doesn't try to collect the schema as a test class
+from app.schemas.runner import Distribution, RunRequest, TestFile as SourceFile
+from app.services.test_runner import PytestRunner, _safe_filename
+
+ROUTE = f"{settings.API_V1_STR}/runner/run"
+
+MIXED = '''import os
+import pytest
+
+def test_passes(base_url):
+    assert base_url == "http://target.test"
+
+def test_fails():
+    assert 1 == 2
+
+@pytest.mark.skip(reason="not today")
+def test_skipped():
+    pass
+
+@pytest.mark.parametrize("value", [1, 2])
+def test_param(value):
+    assert value
+
+def test_env_is_allowlisted():
+    assert os.environ["API_BASE_URL"] == "http://target.test"
+    assert "GEMINI_API_KEY" not in os.environ
+'''
+
+def test_the_runner_is_disabled_by_default(run, api):
+    body = {"base_url": "http://target.test", "files": [{"filename": "a.py", "code": "def test_a(): pass"}]}
+    response = run(api.post(ROUTE, json=body))
+    assert response.status_code == 403
+
+def test_tests_run_across_workers_and_report_in_source_order(run, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "secret")
+    request = RunRequest(
+        base_url="http://target.test",
+        files=[
+            SourceFile(filename="mixed.py", code=MIXED),
+            SourceFile(filename="test_broken.py", code="def test_x(:\n    pass")
+        ],
+        workers=3
+    )
+    response = run(PytestRunner().run(request))
+
+    outcomes = {result.nodeid: result.outcome.value for result in response.results if result.file == "test_mixed.py"}
+    assert outcomes == {
+        "test_mixed.py::test_passes": "passed",
+        "test_mixed.py::test_fails": "failed",
+        "test_mixed.py::test_skipped": "skipped",
+        "test_mixed.py::test_param[1]": "passed",
+        "test_mixed.py::test_param[2]": "passed",
+        "test_mixed.py::test_env_is_allowlisted": "passed"
+    }
+    # A file that doesn't parse is reported as a collection error
+    assert [result.outcome.value for result in response.results if result.file == "test_broken.py"] == ["error"]
+    assert [result.nodeid for result in response.results][:2] == ["test_mixed.py::test_passes", "test_mixed.py::test_fails"]
+    assert (response.total, response.passed, response.failed, response.skipped, response.errors) == (7, 4, 1, 1, 1)
+    assert response.workers == 3 and not response.timed_out
+    assert "assert 1 == 2" in next(result.message for result in response.results if result.name == "test_fails")
+
+def test_unfinished_tests_are_reported_when_the_run_times_out(run, monkeypatch):
+    slow = "import time\n\ndef test_slow():\n    time.sleep(30)\n"
+    request = RunRequest(base_url="http://target.test", files=[SourceFile(filename="test_slow.py", code=slow)], timeout_seconds=1)
+    response = run(PytestRunner().run(request))
+    assert response.timed_out
+    assert [(result.nodeid, result.outcome.value, result.message) for result in response.results] == [
+        ("test_slow.py::test_slow", "error", "Run timed out")
+    ]
+
+def test_sharding():
+    files = {"test_a.py": ["a1", "a2", "a3"], "test_b.py": ["b1"], "test_c.py": ["c1", "c2"]}
+    assert PytestRunner._shard(files, 4, Distribution.TEST) == [["a1", "a2"], ["a3", "b1"], ["c1"], ["c2"]]
+    assert PytestRunner._shard(files, 2, Distribution.FILE) == [["a1", "a2", "a3"], ["c1", "c2", "b1"]]
+    assert PytestRunner._shard({"test_a.py": ["a1"]}, 4, Distribution.TEST) == [["a1"]]
+
+def test_filenames_are_made_safe_and_unique():
+    taken = {"test_users.py": []}
+    assert _safe_filename("../../etc/users.py", taken) == "test_users_2.py"
+    assert _safe_filename("my tests!.py", {}) == "test_my_tests.py"
+    assert _safe_filename("...", {}) == "test_generated.py"
+
+@pytest.mark.parametrize("workers", [0, settings.TEST_RUNNER_WORKERS + 1])
+def test_worker_counts_are_bounded(workers):
+    with pytest.raises(ValueError):
+        RunRequest(base_url="http://target.test", files=[SourceFile(filename="a.py", code="x")], workers=workers)
\ No newline at end of file
@@ -0,0 +1,82 @@
+import json
+import re
+import pytest
+from app.core.config import settings
+from app.schemas.playground import EndpointRequest
+from app.services.scenario_service import ScenarioBatch, generate_scenarios_packed
+
+_IDS_RE = re.compile(r"^\[(op\d+)\]$", re.MULTILINE)
+
+def scenario(scenario_type: str = "SECURITY") -> dict:
+    return {"type": scenario_type, "description": "d", "input": "i", "expected_output": "o"}
+
+def answer(prompt: str, skip: tuple = ()) -> str:
+    """Answer packed prompts per operation id and single prompts with a list."""
+    ids = _IDS_RE.findall(prompt)
+    if ids:
+        return json.dumps({op_id: [scenario()] for op_id in ids if op_id not in skip})
+    return json.dumps([scenario()])
+
+def requests(count: int, **fields) -> list:
+    return [
+        EndpointRequest(endpoint=f"/items/{index}", method="GET", description="Reads an item", scenario_types=["SECURITY"], **fields)
+        for index in range(count)
+    ]
+
+@pytest.fixture(autouse=True)
+def packing(monkeypatch):
+    monkeypatch.setattr(settings, "SCENARIO_PACK_ENABLED", True)
+    monkeypatch.setattr(settings, "SCENARIO_PACK_MAX_ENDPOINTS", 2)
+    monkeypatch.setattr(settings, "SCENARIO_PACK_MAX_TOKENS", 8000)
+
+def test_endpoints_are_packed_up_to_the_endpoint_limit(run, llm):
+    llm.reply = answer
+    responses, llm_calls = run(generate_scenarios_packed(requests(5)))
+    assert llm_calls == llm.calls == 3
+    assert [response.endpoint for response in responses] == [f"/items/{index}" for index in range(5)]
+    assert all(len(response.scenarios) == 1 and response.error is None for response in responses)
+    assert sum(bool(_IDS_RE.findall(prompt)) for prompt in llm.prompts) == 2
+
+def test_the_token_budget_limits_a_pack(run, llm, monkeypatch):
+    monkeypatch.setattr(settings, "SCENARIO_PACK_MAX_TOKENS", 400)
+    llm.reply = answer
+    _, llm_calls = run(generate_scenarios_packed(requests(3)))
+    assert llm_calls == 3
+    assert not any(_IDS_RE.findall(prompt) for prompt in llm.prompts)
+
+def test_endpoints_missing_from_a_packed_answer_fall_back_to_their_own_call(run, llm):
+    llm.reply = lambda prompt: answer(prompt, skip=("op0",))
+    responses, llm_calls = run(generate_scenarios_packed(requests(2)))
+    assert llm_calls == llm.calls == 2
+    assert all(len(response.scenarios) == 1 for response in responses)
+    assert "/items/0" in llm.prompts[1] and "/items/1" not in llm.prompts[1]
+
+def test_an_unparseable_packed_answer_falls_back_for_every_endpoint(run, llm):
+    llm.reply = lambda prompt: "not json" if _IDS_RE.findall(prompt) else answer(prompt)
+    responses, llm_calls = run(generate_scenarios_packed(requests(2), bypass_cache=True))
+    assert llm_calls == 3
+    assert all(len(response.scenarios) == 1 for response in responses)
+
+def test_locally_generated_endpoints_need_no_llm_call(run, llm):
+    local = [
+        EndpointRequest(endpoint="/users", method="POST", description="Creates a user",
+                        scenario_types=["POSITIVE"], request_body={"name": "Ada"})
+    ]
+    responses, llm_calls = run(generate_scenarios_packed(local))
+    assert llm_calls == llm.calls == 0
+    assert responses[0].scenarios and responses[0].scenarios[0].type.value == "POSITIVE"
+
+def test_batches_yield_in_completion_order_with_their_index(run, llm):
+    llm.reply = answer
+
+    async def collect():
+        return [index async for index, _ in ScenarioBatch(requests(6), concurrency=2)]
+
+    assert sorted(run(collect())) == list(range(6))
+
+def test_the_batch_route_reports_llm_calls(run, llm, api):
+    llm.reply = answer
+    body = {"endpoints": [request.model_dump(mode="json") for request in requests(4)]}
+    response = run(api.post(f"{settings.API_V1_STR}/playground/generate-scenarios", json=body))
+    assert response.status_code == 200
+    assert response.json()["llm_calls"] == 2
\ No newline at end of file
@@ -0,0 +1,123 @@
+import asyncio
+import time
+import pytest
+from google.api_core import exceptions as google_exceptions
+from app.core.config import settings
+from app.services.llm_service import llm_service
+from app.services.scheduler import CircuitBreaker, LLMScheduler, LLMUnavailableError, TokenBucket, llm_scheduler
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BACKOFF_BASE_SECONDS", 0.001)
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 2)
+    monkeypatch.setattr(settings, "LLM_CIRCUIT_FAILURE_THRESHOLD", 3)
+    return LLMScheduler()
+
+def failing(errors):
+    """A call factory raising each of `errors` in turn, then returning "ok"."""
+    attempts = []
+
+    async def call():
+        attempts.append(len(attempts))
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    return call, attempts
+
+def test_circuit_opens_after_consecutive_failures_and_probes_once():
+    circuit = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    circuit.record_failure()
+    assert circuit.state == CircuitBreaker.CLOSED
+    circuit.record_failure()
+    assert circuit.state == CircuitBreaker.OPEN and not circuit.allow()
+
+    time.sleep(0.06)
+    assert circuit.state == CircuitBreaker.HALF_OPEN
+    assert circuit.allow() and not circuit.allow()
+    circuit.cancel_trial()
+    assert circuit.allow()
+    circuit.record_failure()
+    assert circuit.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    assert circuit.allow()
+    circuit.record_success()
+    assert circuit.state == CircuitBreaker.CLOSED and circuit.failures == 0
+
+def test_token_bucket_waits_for_refill(run):
+    bucket = TokenBucket(rate_per_minute=600, capacity=1)
+
+    async def take_two():
+        started = time.monotonic()
+        await bucket.acquire()
+        await bucket.acquire()
+        return time.monotonic() - started
+
+    assert 0.08 <= run(take_two()) < 0.5
+
+def test_retryable_errors_are_retried(run, scheduler):
+    call, attempts = failing([google_exceptions.ServiceUnavailable("busy")])
+    assert run(scheduler.run(call, 10)) == "ok"
+    assert len(attempts) == 2
+    assert scheduler.retries == 1
+    assert scheduler.circuit.failures == 0
+
+def test_retries_stop_at_the_limit(run, scheduler):
+    call, attempts = failing([google_exceptions.TooManyRequests("slow down") for _ in range(5)])
+    with pytest.raises(LLMUnavailableError, match="after 3 attempt"):
+        run(scheduler.run(call, 10))
+    assert len(attempts) == 3
+    assert scheduler.circuit.state == CircuitBreaker.OPEN
+
+    call, attempts = failing([])
+    with pytest.raises(LLMUnavailableError, match="circuit breaker is open"):
+        run(scheduler.run(call, 10))
+    assert attempts == []
+
+def test_other_errors_fail_fast_without_tripping_the_circuit(run, scheduler):
+    call, attempts = failing([ValueError("bad prompt")])
+    with pytest.raises(ValueError):
+        run(scheduler.run(call, 10))
+    assert len(attempts) == 1
+    assert scheduler.circuit.failures == 0
+
+def test_the_deadline_bounds_slow_attempts(run, scheduler):
+    async def slow():
+        await asyncio.sleep(1)
+
+    started = time.monotonic()
+    with pytest.raises(LLMUnavailableError):
+        run(scheduler.run(slow, 10, deadline_seconds=0.05))
+    assert time.monotonic() - started < 0.5
+    # Cut short by the caller's deadline, not an upstream failure
+    assert scheduler.circuit.failures == 0
+
+def test_a_slow_stream_reader_does_not_hold_a_slot(run, llm, monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "slots", asyncio.Semaphore(1))
+    llm.reply = "x" * 100
+
+    async def scenario():
+        stream = llm_service.stream_content("stream me")
+        first = await stream.__anext__()
+        # The model has finished, though the reader has taken one chunk only
+        await asyncio.sleep(0.01)
+        other = await asyncio.wait_for(llm_service.generate_content_async("other"), 1)
+        rest = [chunk async for chunk in stream]
+        return first + "".join(rest), other
+
+    streamed, other = run(scenario())
+    assert streamed == "x" * 100
+    assert other == "x" * 100
+    assert run(llm_service.generate_content_async("stream me")) == streamed
+    assert llm.calls == 2
+
+def test_stream_errors_reach_the_reader(run, llm):
+    llm.errors.append(google_exceptions.ServiceUnavailable("down"))
+
+    async def consume():
+        return [chunk async for chunk in llm_service.stream_content("fails")]
+
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        run(consume())
+    assert llm_scheduler.circuit.failures == 1
\ No newline at end of file
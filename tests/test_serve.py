@@ -0,0 +1,105 @@
+import asyncio
+import os
+import sqlite3
+import sys
+import time
+from types import SimpleNamespace
+import pytest
+from app import serve
+from app.core.config import settings
+from app.schemas.jobs import JobRequest
+from app.services.job_manager import JobManager
+from app.services.job_store import SQLiteJobStore
+from app.services.scheduler import SharedTokenBucket, TokenBucket, create_bucket
+
+def test_shared_buckets_draw_from_one_quota(run, tmp_path):
+    # Two buckets on one file stand in for two worker processes
+    first = SharedTokenBucket("requests", tmp_path / "ratelimit.db", rate_per_minute=60, capacity=2)
+    second = SharedTokenBucket("requests", tmp_path / "ratelimit.db", rate_per_minute=60, capacity=2)
+
+    async def scenario():
+        await first.acquire()
+        await second.acquire()
+        started = time.monotonic()
+        await first.acquire()
+        return time.monotonic() - started, await second.available()
+
+    waited, left = run(scenario())
+    # Both tokens were spent, so the third waits for a refill at one per second
+    assert waited >= 0.5
+    assert left < 1
+
+def test_memory_buckets_split_the_quota_across_workers(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.setattr(settings, "WORKERS", 4)
+    bucket = create_bucket("requests", 600)
+    assert isinstance(bucket, TokenBucket)
+    assert bucket.rate == pytest.approx(600 / 4 / 60)
+
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_DB_PATH", tmp_path / "ratelimit.db")
+    assert isinstance(create_bucket("requests", 600), SharedTokenBucket)
+
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_BACKEND", "redis")
+    with pytest.raises(ValueError, match="LLM_RATE_LIMIT_BACKEND"):
+        create_bucket("requests", 600)
+
+def test_stores_default_to_memory_outside_the_launcher():
+    defaults = type(settings).model_fields
+    for key in ("JOB_STORE_BACKEND", "FINGERPRINT_STORE_BACKEND", "SESSION_STORE_BACKEND", "LLM_RATE_LIMIT_BACKEND"):
+        assert defaults[key].default == "memory"
+        assert serve.SHARED_STATE_DEFAULTS[key] == "sqlite"
+
+def test_the_launcher_shares_state_unless_overridden(monkeypatch):
+    calls = []
+    monkeypatch.setitem(sys.modules, "uvicorn", SimpleNamespace(run=lambda app, **kwargs: calls.append((app, kwargs))))
+    for key in serve.SHARED_STATE_DEFAULTS:
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("JOB_STORE_BACKEND", "memory")
+    monkeypatch.setenv("WORKERS", "1")
+
+    serve.main(["--workers", "3", "--port", "9000"])
+
+    assert calls == [("app.main:app", {"host": "127.0.0.1", "port": 9000, "workers": 3, "log_level": "info"})]
+    assert os.environ["WORKERS"] == "3"
+    assert os.environ["JOB_STORE_BACKEND"] == "memory"
+    assert os.environ["SESSION_STORE_BACKEND"] == "sqlite"
+    assert os.environ["CACHE_DB_PATH"] == "data/cache.db"
+
+def test_a_job_is_taken_over_when_its_worker_stops_renewing(run, llm, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "JOB_LEASE_SECONDS", 0.1)
+    llm.reply = '[{"type": "POSITIVE", "description": "d", "input": "i", "expected_output": "o"}]'
+    llm.delay = 0.05
+    crashed = JobManager(SQLiteJobStore(tmp_path / "jobs.db"))
+    survivor = JobManager(SQLiteJobStore(tmp_path / "jobs.db"))
+    endpoints = [{"endpoint": f"/items/{index}", "method": "GET", "description": "d"} for index in range(3)]
+
+    async def scenario():
+        job_id = crashed.submit(JobRequest(endpoints=endpoints))
+        await survivor.start()
+        # The owner dies without releasing its lease
+        crashed._tasks.pop(job_id).cancel()
+        for _ in range(100):
+            if survivor.get_job(job_id)["status"] == "COMPLETED":
+                break
+            await asyncio.sleep(0.02)
+        await survivor.stop()
+        return job_id
+
+    job = survivor.get_job(run(scenario()))
+    assert (job["status"], job["completed"]) == ("COMPLETED", 3)
+
+def test_older_job_databases_gain_lease_columns(tmp_path):
+    db = sqlite3.connect(str(tmp_path / "jobs.db"))
+    db.execute(
+        "CREATE TABLE jobs (job_id TEXT PRIMARY KEY, status TEXT NOT NULL, total INTEGER NOT NULL, "
+        "completed INTEGER NOT NULL DEFAULT 0, failed INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, "
+        "updated_at REAL NOT NULL, options TEXT NOT NULL)"
+    )
+    db.execute("INSERT INTO jobs VALUES ('old', 'PENDING', 0, 0, 0, 0, 0, '{}')")
+    db.commit()
+    db.close()
+
+    store = SQLiteJobStore(tmp_path / "jobs.db")
+    assert store.unfinished_jobs() == ["old"]
+    assert store.claim_job("old", "worker", 30)
\ No newline at end of file
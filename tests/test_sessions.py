@@ -0,0 +1,87 @@
+import time
+import pytest
+from app.core.config import settings
+from app.services.session_manager import SessionManager
+from app.services.session_store import InMemorySessionStore, SQLiteSessionStore
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(max_sessions: int = 10, ttl_seconds: int = 60):
+        if request.param == "memory":
+            return InMemorySessionStore(max_sessions, ttl_seconds)
+        return SQLiteSessionStore(tmp_path / "sessions.db", max_sessions, ttl_seconds)
+    return make
+
+def session(session_id: str, updated_at: float = None) -> dict:
+    return {"session_id": session_id, "updated_at": updated_at or time.time(), "turns": [], "summary": [], "context": {}}
+
+def test_least_recently_used_sessions_are_evicted(make_store):
+    store = make_store(max_sessions=2)
+    now = time.time()
+    store.save(session("a", now))
+    store.save(session("b", now + 1))
+    store.save(session("a", now + 2))
+    store.save(session("c", now + 3))
+    assert store.get("b") is None
+    assert store.get("a")["session_id"] == "a"
+    assert store.count() == 2
+    assert store.stats()["evictions"] == 1
+
+def test_idle_sessions_expire(make_store):
+    store = make_store(ttl_seconds=60)
+    store.save(session("old", time.time() - 120))
+    assert store.get("old") is None
+    assert store.count() == 0
+    store.delete("missing")
+
+def test_sqlite_stores_sharing_a_file_respect_one_limit(tmp_path):
+    # Stands in for two worker processes sharing the database
+    first = SQLiteSessionStore(tmp_path / "sessions.db", 3, 60)
+    second = SQLiteSessionStore(tmp_path / "sessions.db", 3, 60)
+    now = time.time()
+    for index in range(4):
+        (first if index % 2 else second).save(session(f"s{index}", now + index))
+    assert first.count() == second.count() == 3
+    assert second.get("s0") is None
+    first.save(session("s4", now + 4))
+    assert second.count() == 3
+    assert first.get("s1") is None
+
+def test_sqlite_saves_purge_expired_sessions(tmp_path):
+    store = SQLiteSessionStore(tmp_path / "sessions.db", 10, 60)
+    store.save(session("stale", time.time() - 120))
+    store.save(session("fresh"))
+    assert store.count() == 1
+    assert store.stats()["expirations"] >= 1
+    # Sessions survive a restart
+    assert SQLiteSessionStore(tmp_path / "sessions.db", 10, 60).get("fresh")["session_id"] == "fresh"
+
+def test_old_turns_are_folded_into_a_bounded_summary(monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_MAX_TURNS", 2)
+    monkeypatch.setattr(settings, "SESSION_DIGEST_CHARS", 5)
+    monkeypatch.setattr(settings, "SESSION_SUMMARY_MAX_CHARS", 30)
+    manager = SessionManager(InMemorySessionStore(10, 60))
+    current = manager.get_or_create()
+    manager.add_turn(current, "user", "test GET /pets", {"endpoint": "/pets", "method": None})
+    for index in range(6):
+        manager.add_turn(current, "assistant", f"reply number {index}")
+
+    assert [turn["content"] for turn in current["turns"]] == ["reply number 4", "reply number 5"]
+    assert sum(len(line) for line in current["summary"]) <= 30
+    assert current["summary"][-1] == "assistant: reply..."
+    assert current["context"] == {"endpoint": "/pets"}
+    context = manager.prompt_context(current)
+    assert context.startswith("Known details: endpoint=/pets")
+    assert context.endswith("assistant: reply number 5")
+    assert manager.get_or_create(current["session_id"]) is current
+
+def test_chat_returns_a_session_id_for_follow_ups(run, llm, api):
+    llm.reply = '{"intent": "general_question", "endpoint": null, "method": null, "requires_details": false}'
+    first = run(api.post(f"{settings.API_V1_STR}/chatbot/chat", json={"message": "hello"}))
+    assert first.status_code == 200
+    session_id = first.json()["session_id"]
+    assert session_id
+
+    second = run(api.post(f"{settings.API_V1_STR}/chatbot/chat", json={"message": "again", "session_id": session_id}))
+    assert second.json()["session_id"] == session_id
+    assert "user: hello" in llm.prompts[-1]
\ No newline at end of file